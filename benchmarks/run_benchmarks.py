@@ -0,0 +1,337 @@
+"""
+Benchmarks: Hot Paths of the Load Balancer
+
+Measures throughput (ops/sec) and per-call latency percentiles of:
+1. LoadBalancer.assign_task
+2. LoadBalancer.rebalance_loads
+3. SystemMonitor.get_system_state
+4. Processor._update_load
+
+for a range of processor counts and per-processor queue depths. Every
+case runs several times and reports the median, so one noisy run does
+not decide the result. Runs headless (no Tk), writes the results as JSON
+and can compare them with a saved baseline, reporting every case that
+got slower.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # full matrix
+    python benchmarks/run_benchmarks.py --quick              # small matrix
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --baseline baseline.json --tolerance 0.2
+    python benchmarks/run_benchmarks.py --baseline baseline.json --check-p99
+
+Exits with status 1 if a regression beyond the tolerance is found.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.processor import Processor
+from core.monitor import SystemMonitor
+from core.load_balancer import LoadBalancer, Task
+from core.histogram import LatencyHistogram
+
+
+PROCESSOR_COUNTS = (4, 64, 1024, 10000)
+QUICK_PROCESSOR_COUNTS = (4, 64, 1024)
+QUEUE_DEPTHS = (0, 4, 8)  # Tasks waiting per processor (max_queue_size is 10)
+
+
+def build_system(processor_count: int, queue_depth: int):
+    """
+    Create processors, monitor and load balancer with every queue at queue_depth
+    
+    Returns:
+        Tuple (processors, monitor, load_balancer)
+    """
+    processors = [Processor(i) for i in range(processor_count)]
+    monitor = SystemMonitor(processors)
+    load_balancer = LoadBalancer(processors, monitor)
+    task_id = 0
+    for processor in processors:
+        processor.add_tasks([Task(task_id + i) for i in range(queue_depth)])
+        task_id += queue_depth
+    return processors, monitor, load_balancer
+
+
+def measure(operation: Callable, setup: Optional[Callable] = None,
+            min_time=0.2, max_iterations=100000, min_iterations=5) -> Dict:
+    """
+    Time an operation call by call
+    
+    Args:
+        operation: Function to time (called with setup's return value, if any)
+        setup: Untimed preparation run before every call
+        min_time: Stop after this much timed work (seconds)...
+        max_iterations: ...or after this many calls
+        min_iterations: Always make at least this many calls
+    
+    Returns:
+        Dictionary with iterations, ops_per_sec and latency percentiles (seconds)
+    """
+    histogram = LatencyHistogram(min_value=1e-8, max_value=100.0)
+    clock = time.perf_counter
+    timed = 0.0
+    iterations = 0
+    
+    gc.collect()
+    gc.disable()
+    try:
+        while iterations < min_iterations or (timed < min_time and iterations < max_iterations):
+            argument = setup() if setup is not None else None
+            start = clock()
+            if setup is not None:
+                operation(argument)
+            else:
+                operation()
+            elapsed = clock() - start
+            histogram.record(elapsed)
+            timed += elapsed
+            iterations += 1
+    finally:
+        gc.enable()
+    
+    return {
+        'iterations': iterations,
+        'ops_per_sec': iterations / timed if timed > 0 else 0.0,
+        'latency': histogram.get_summary()
+    }
+
+
+def bench_assign_task(processor_count: int, queue_depth: int, min_time: float) -> Dict:
+    """Place one task; the task is taken back out untimed so depths stay put"""
+    processors, monitor, load_balancer = build_system(processor_count, queue_depth)
+    
+    def operation(task):
+        if load_balancer.assign_task(task):
+            task.assigned_processor.get_next_task()
+    
+    return measure(operation, setup=lambda: Task(-1), min_time=min_time)
+
+
+def bench_rebalance_loads(processor_count: int, queue_depth: int, min_time: float) -> Dict:
+    """Rebalance a system where half the processors are busy and full, half hold queue_depth tasks"""
+    processors, monitor, load_balancer = build_system(processor_count, queue_depth)
+    full = processors[:processor_count // 2]
+    
+    def setup():
+        for processor in processors:
+            with processor.lock:
+                processor.is_processing = False
+                processor.current_task = None
+                processor.drain_tasks()
+        for processor in full:
+            processor.add_tasks([Task(i) for i in range(processor.max_queue_size)])
+            processor.start_task()
+        for processor in processors[processor_count // 2:]:
+            processor.add_tasks([Task(i) for i in range(queue_depth)])
+    
+    def operation(_):
+        # Migrations print a line each; that output is part of the cost but not of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_balancer.rebalance_loads()
+    
+    # A single call can take seconds on the largest systems
+    return measure(operation, setup=setup, min_time=min_time, max_iterations=200, min_iterations=1)
+
+
+def bench_get_system_state(processor_count: int, queue_depth: int, min_time: float) -> Dict:
+    """Read the system-wide metrics"""
+    processors, monitor, load_balancer = build_system(processor_count, queue_depth)
+    return measure(monitor.get_system_state, min_time=min_time)
+
+
+def bench_update_load(processor_count: int, queue_depth: int, min_time: float) -> Dict:
+    """Recompute one processor's load, including the monitor's listener work"""
+    processors, monitor, load_balancer = build_system(processor_count, queue_depth)
+    processor = processors[len(processors) // 2]
+    
+    def operation():
+        with processor.lock:
+            processor._update_load()
+    
+    return measure(operation, min_time=min_time)
+
+
+BENCHMARKS = {
+    'assign_task': bench_assign_task,
+    'rebalance_loads': bench_rebalance_loads,
+    'get_system_state': bench_get_system_state,
+    'update_load': bench_update_load,
+}
+
+
+def run_repeated(benchmark: Callable, processor_count: int, queue_depth: int,
+                 min_time: float, repeats: int) -> Dict:
+    """
+    Run one benchmark case several times and keep the median of every figure
+    
+    Args:
+        benchmark: Function from BENCHMARKS
+        processor_count: Number of processors
+        queue_depth: Tasks waiting per processor
+        min_time: Seconds of timed work per run
+        repeats: Number of runs (each builds a fresh system)
+    
+    Returns:
+        Dictionary shaped like measure()'s, with median ops_per_sec and
+        median latency figures, plus the number of repeats
+    """
+    runs = [benchmark(processor_count, queue_depth, min_time) for _ in range(max(1, repeats))]
+    return {
+        'iterations': sum(run['iterations'] for run in runs),
+        'ops_per_sec': statistics.median(run['ops_per_sec'] for run in runs),
+        'latency': {field: statistics.median(run['latency'][field] for run in runs)
+                    for field in runs[0]['latency']},
+        'repeats': len(runs)
+    }
+
+
+def run_benchmarks(names: List[str], processor_counts, queue_depths, min_time=0.2,
+                   repeats=3) -> Dict:
+    """
+    Run every benchmark over the processor count / queue depth matrix
+    
+    Args:
+        names: Benchmarks to run (keys of BENCHMARKS)
+        processor_counts: Processor counts to test
+        queue_depths: Queue depths to test
+        min_time: Seconds of timed work per run
+        repeats: Runs per case; the median of them is reported
+    
+    Returns:
+        Dictionary with 'metadata' and a 'results' list
+    """
+    results = []
+    for name in names:
+        for processor_count in processor_counts:
+            for queue_depth in queue_depths:
+                result = run_repeated(BENCHMARKS[name], processor_count, queue_depth, min_time, repeats)
+                result.update({'benchmark': name, 'processors': processor_count,
+                               'queue_depth': queue_depth})
+                results.append(result)
+                print(f"{name:<18} processors={processor_count:<6} depth={queue_depth:<3} "
+                      f"{result['ops_per_sec']:>12,.0f} ops/s   "
+                      f"p50={result['latency']['p50'] * 1e6:>10.1f}us   "
+                      f"p99={result['latency']['p99'] * 1e6:>10.1f}us")
+    
+    return {
+        'metadata': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.time(),
+            'min_time': min_time,
+            'repeats': repeats
+        },
+        'results': results
+    }
+
+
+def compare_results(current: Dict, baseline: Dict, tolerance=0.2, min_delta=2e-6,
+                    check_p99=False) -> List[str]:
+    """
+    Find cases that got slower than the baseline
+    
+    A case regresses when its time per call (1 / median ops/sec) grows by
+    more than the tolerance and by more than min_delta. The absolute floor
+    keeps sub-microsecond operations, whose timings jitter by a large
+    share between identical runs, from being flagged. p99 latency is
+    noisier still, so it is only compared when check_p99 is set, under the
+    same two conditions. Cases missing from the baseline are skipped.
+    
+    Args:
+        current: Results from run_benchmarks
+        baseline: Earlier results from run_benchmarks
+        tolerance: Allowed relative change (0.2 = 20%)
+        min_delta: Smallest slowdown per call that counts (seconds)
+        check_p99: Also flag p99 latency growth
+    
+    Returns:
+        List of human-readable regression descriptions
+    """
+    def slower(value, old_value):
+        return value - old_value > max(old_value * tolerance, min_delta)
+    
+    def key(result):
+        return result['benchmark'], result['processors'], result['queue_depth']
+    
+    previous = {key(result): result for result in baseline.get('results', [])}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        case = "{} processors={} depth={}".format(*key(result))
+        
+        if result['ops_per_sec'] > 0 and old['ops_per_sec'] > 0:
+            per_call, old_per_call = 1.0 / result['ops_per_sec'], 1.0 / old['ops_per_sec']
+            if slower(per_call, old_per_call):
+                regressions.append(f"{case}: {result['ops_per_sec']:,.0f} ops/s "
+                                   f"(baseline {old['ops_per_sec']:,.0f})")
+        if check_p99:
+            p99, old_p99 = result['latency']['p99'], old['latency']['p99']
+            if old_p99 > 0 and slower(p99, old_p99):
+                regressions.append(f"{case}: p99 {p99 * 1e6:.1f}us (baseline {old_p99 * 1e6:.1f}us)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the load balancer hot paths")
+    parser.add_argument('--quick', action='store_true',
+                        help="Skip the 10k processor cases")
+    parser.add_argument('--benchmarks', nargs='+', choices=sorted(BENCHMARKS),
+                        default=list(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument('--processors', nargs='+', type=int,
+                        help="Processor counts (overrides --quick)")
+    parser.add_argument('--depths', nargs='+', type=int, default=list(QUEUE_DEPTHS),
+                        help="Queue depths per processor")
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="Seconds of timed work per run")
+    parser.add_argument('--repeats', type=int, default=3,
+                        help="Runs per case; the median is reported")
+    parser.add_argument('--output', help="Write results to this JSON file")
+    parser.add_argument('--baseline', help="Compare against this JSON results file")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="Allowed relative slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument('--min-delta-us', type=float, default=2.0,
+                        help="Ignore slowdowns smaller than this per call (microseconds)")
+    parser.add_argument('--check-p99', action='store_true',
+                        help="Also flag p99 latency growth (noisy; off by default)")
+    args = parser.parse_args()
+    
+    processor_counts = args.processors or (QUICK_PROCESSOR_COUNTS if args.quick else PROCESSOR_COUNTS)
+    results = run_benchmarks(args.benchmarks, processor_counts, args.depths, args.min_time,
+                             args.repeats)
+    
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.tolerance,
+                                      args.min_delta_us * 1e-6, args.check_p99)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
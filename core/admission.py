@@ -0,0 +1,151 @@
+"""
+Admission Queue Module
+Bounded central queue that holds tasks while every processor queue is full
+"""
+
+import time
+from collections import deque
+from threading import Condition, Lock
+from typing import List, Tuple
+
+
+class AdmissionQueue:
+    """
+    Bounded FIFO of tasks waiting for processor capacity
+    
+    Instead of dropping a task when every processor queue is full, the
+    load balancer parks it here. Processors drain the queue as they free
+    capacity, and submitters are slowed down (backpressure) once the
+    queue itself is full.
+    
+    Tracks how long tasks wait here, so bursts show up as measurable
+    queueing delay instead of lost work.
+    """
+    
+    def __init__(self, maxsize=100, clock=time.time):
+        """
+        Initialize admission queue
+        
+        Args:
+            maxsize: Maximum number of waiting tasks
+            clock: Time source for queueing delay (the simulator passes its virtual clock)
+        """
+        self.maxsize = maxsize
+        self.clock = clock
+        self._queue = deque()  # (task, enqueued_at) pairs
+        self._lock = Lock()
+        self._not_full = Condition(self._lock)  # Signalled when tasks are drained
+        
+        # Statistics
+        self.total_enqueued = 0
+        self.total_dequeued = 0
+        self.total_rejected = 0  # Full on try_put or timed out on put
+        self.total_wait_time = 0.0
+        self.max_wait_time = 0.0
+    
+    def __len__(self):
+        return len(self._queue)
+    
+    def try_put(self, task) -> bool:
+        """
+        Queue a task without blocking
+        
+        Args:
+            task: Task to queue
+        
+        Returns:
+            True if queued, False if the queue is full
+        """
+        with self._lock:
+            if len(self._queue) >= self.maxsize:
+                self.total_rejected += 1
+                return False
+            self._append(task)
+            return True
+    
+    def put(self, task, timeout=None) -> bool:
+        """
+        Queue a task, waiting for space if the queue is full
+        
+        Args:
+            task: Task to queue
+            timeout: Maximum seconds to wait (None waits forever)
+        
+        Returns:
+            True if queued, False if the timeout expired first
+        """
+        with self._not_full:
+            if not self._not_full.wait_for(lambda: len(self._queue) < self.maxsize, timeout):
+                self.total_rejected += 1
+                return False
+            self._append(task)
+            return True
+    
+    def _append(self, task):
+        """Add a task at the tail (lock held)"""
+        now = self.clock()
+        if task.enqueued_at is None:
+            task.enqueued_at = now  # Time spent here counts as queue wait
+        self._queue.append((task, now))
+        self.total_enqueued += 1
+    
+    def pop_batch(self, max_count) -> List[Tuple[object, float]]:
+        """
+        Remove up to max_count tasks from the head
+        
+        Args:
+            max_count: Maximum number of tasks to remove
+        
+        Returns:
+            List of (task, enqueued_at) pairs, oldest first
+        """
+        with self._lock:
+            count = min(max_count, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+    
+    def push_front(self, entries: List[Tuple[object, float]]):
+        """
+        Return popped entries to the head, keeping their original order
+        
+        Args:
+            entries: (task, enqueued_at) pairs from pop_batch that could not be placed
+        """
+        with self._lock:
+            self._queue.extendleft(reversed(entries))
+    
+    def record_admitted(self, entries: List[Tuple[object, float]]):
+        """
+        Account for entries that were handed to processors and wake blocked submitters
+        
+        Args:
+            entries: (task, enqueued_at) pairs that left the queue for good
+        """
+        if not entries:
+            return
+        now = self.clock()
+        with self._not_full:
+            for _, enqueued_at in entries:
+                wait = now - enqueued_at
+                self.total_wait_time += wait
+                if wait > self.max_wait_time:
+                    self.max_wait_time = wait
+            self.total_dequeued += len(entries)
+            self._not_full.notify(len(entries))
+    
+    def get_statistics(self) -> dict:
+        """
+        Get admission queue statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        with self._lock:
+            average_wait = (self.total_wait_time / self.total_dequeued
+                            if self.total_dequeued > 0 else 0.0)
+            return {
+                'overflow_depth': len(self._queue),
+                'overflow_enqueued': self.total_enqueued,
+                'overflow_rejected': self.total_rejected,
+                'average_queueing_delay': average_wait,
+                'max_queueing_delay': self.max_wait_time
+            }
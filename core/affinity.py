@@ -0,0 +1,200 @@
+"""
+Affinity Module
+Core-pinned worker threads and measured per-core CPU utilization
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from .processor import Processor
+from .load_models import MeasuredLoadModel
+from .workers import WorkerPool
+
+
+class CoreUtilizationSampler:
+    """
+    Measures per-core CPU utilization from /proc/stat
+    
+    Every sample compares each core's busy and total time (in jiffies)
+    with the previous sample, so utilization covers everything that ran
+    on the core in between: this program's workers, other processes and
+    other tenants of the machine. Idle and iowait time count as idle.
+    
+    A background thread samples every interval seconds and then calls
+    the registered listeners (e.g. to refresh processor loads).
+    """
+    
+    def __init__(self, interval=1.0, path="/proc/stat"):
+        """
+        Initialize sampler
+        
+        Args:
+            interval: Seconds between samples
+            path: Kernel statistics file (Linux)
+        """
+        self.interval = interval
+        self.path = path
+        self.utilization: Dict[int, float] = {}  # Core -> busy % over the last interval
+        self._previous = self.read()
+        self._listeners = []
+        self._stop = threading.Event()
+        self.thread = None
+    
+    def read(self) -> Dict[int, Tuple[int, int]]:
+        """
+        Read cumulative per-core times
+        
+        Returns:
+            Dictionary mapping core number to (busy jiffies, total jiffies)
+        """
+        cores = {}
+        with open(self.path) as stat:
+            for line in stat:
+                if not line.startswith("cpu"):
+                    break  # Per-core lines come first
+                name, *fields = line.split()
+                if name == "cpu":
+                    continue  # Aggregate over all cores
+                # user nice system idle iowait irq softirq steal (guest time is
+                # already counted in user and nice)
+                values = [int(value) for value in fields[:8]]
+                total = sum(values)
+                idle = values[3] + (values[4] if len(values) > 4 else 0)
+                cores[int(name[3:])] = (total - idle, total)
+        return cores
+    
+    def sample(self) -> Dict[int, float]:
+        """
+        Take a sample and notify listeners
+        
+        Returns:
+            Dictionary mapping core number to utilization (%) since the previous sample
+        """
+        current = self.read()
+        utilization = {}
+        for core, (busy, total) in current.items():
+            previous = self._previous.get(core)
+            if previous is None or total <= previous[1]:
+                utilization[core] = self.utilization.get(core, 0.0)  # No time has passed
+                continue
+            share = (busy - previous[0]) / (total - previous[1])
+            utilization[core] = min(max(share * 100.0, 0.0), 100.0)
+        self._previous = current
+        self.utilization = utilization  # Swapped whole, so readers need no lock
+        
+        for callback in self._listeners:
+            callback(self)
+        return utilization
+    
+    def get_utilization(self, core: int) -> float:
+        """Get a core's utilization (%) over the last sample interval"""
+        return self.utilization.get(core, 0.0)
+    
+    def add_listener(self, callback):
+        """
+        Register a callback to run after every sample
+        
+        Args:
+            callback: Function called as callback(sampler)
+        """
+        self._listeners.append(callback)
+    
+    def start(self):
+        """Start sampling in a background thread"""
+        if self.thread is not None:
+            return
+        self._stop.clear()
+        self.thread = threading.Thread(target=self._run, daemon=True, name="core-sampler")
+        self.thread.start()
+    
+    def stop(self):
+        """Stop the background thread"""
+        self._stop.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+
+class PinnedWorkerPool(WorkerPool):
+    """
+    WorkerPool whose worker threads are pinned to dedicated cores
+    
+    Each processor's worker thread is bound to one core with
+    os.sched_setaffinity (Linux), so a processor corresponds to a
+    physical core. With a CoreUtilizationSampler, every processor's load
+    model is wrapped in a MeasuredLoadModel for its core and loads are
+    refreshed after each sample, so the monitor and balancer see real
+    CPU contention, including work from other processes on the machine.
+    
+    Simulated tasks sleep rather than compute, so they barely show up
+    in measured utilization; task callables (in the worker thread or in
+    a ProcessExecutionBackend pinned to the same cores) do.
+    """
+    
+    def __init__(self, processors: List[Processor], load_balancer, processing_time=0.5,
+                 steal_interval=0.05, cores: Optional[List[int]] = None,
+                 sampler: Optional[CoreUtilizationSampler] = None, measured_weight=0.5):
+        """
+        Initialize pinned worker pool
+        
+        Args:
+            processors: Processors to run
+            load_balancer: Load balancer (for overflow draining and stealing)
+            processing_time: Processing time for simulated tasks (seconds)
+            steal_interval: How often an idle worker retries stealing (seconds)
+            cores: Core for each processor (default: the cores this process
+                   may run on, assigned in order and reused if there are fewer)
+            sampler: Utilization sampler whose measurements feed processor loads
+                     (None keeps the processors' load models unchanged)
+            measured_weight: Share of the load taken from measured utilization
+        """
+        if not hasattr(os, "sched_setaffinity"):
+            raise RuntimeError("Pinning workers to cores requires os.sched_setaffinity (Linux)")
+        super().__init__(processors, load_balancer, processing_time, steal_interval)
+        if cores is None:
+            available = sorted(os.sched_getaffinity(0))
+            cores = [available[i % len(available)] for i in range(len(processors))]
+        if len(cores) != len(processors):
+            raise ValueError("cores needs one entry per processor")
+        self.cores = list(cores)
+        self._core_of = {id(p): core for p, core in zip(processors, self.cores)}
+        
+        self.sampler = sampler
+        if sampler is not None:
+            for processor, core in zip(processors, self.cores):
+                with processor.lock:
+                    processor.load_model = MeasuredLoadModel(sampler, core, processor.load_model,
+                                                             measured_weight)
+                    processor._update_load()
+            sampler.add_listener(self._refresh_loads)
+    
+    def start(self):
+        """Start the pinned workers (and the sampler)"""
+        super().start()
+        if self.sampler is not None:
+            self.sampler.start()
+    
+    def stop(self, timeout=None):
+        """
+        Stop the sampler and the workers
+        
+        Args:
+            timeout: Maximum seconds to wait for each thread
+        """
+        if self.sampler is not None:
+            self.sampler.stop()
+        super().stop(timeout)
+    
+    def _run(self, processor: Processor):
+        """Pin the calling thread to the processor's core, then run the worker loop"""
+        os.sched_setaffinity(0, {self._core_of[id(processor)]})  # 0 = calling thread
+        super()._run(processor)
+    
+    def _refresh_loads(self, sampler: CoreUtilizationSampler):
+        """Sampler listener - recompute every load with the new measurements"""
+        for processor in self.processors:
+            processor._update_load()
@@ -0,0 +1,110 @@
+"""
+Async Load Balancer Module
+asyncio front-end that lets coroutines submit tasks and await their results
+"""
+
+import asyncio
+from .load_balancer import LoadBalancer, Task
+
+
+class AsyncLoadBalancer:
+    """
+    asyncio wrapper around LoadBalancer
+    
+    - await submit(task) places the task (waiting without blocking the
+      event loop while the system is full) and returns a future
+    - The future resolves with task.result when a processor completes it,
+      or raises the task's error if its callable failed
+    
+    Completion is reported through Task done callbacks, which hop back
+    onto the event loop with call_soon_threadsafe, so no thread is tied
+    up per pending request. Tasks are processed by whatever drives the
+    processors (typically a WorkerPool, or the simulator).
+    """
+    
+    def __init__(self, load_balancer: LoadBalancer, retry_interval=0.05):
+        """
+        Initialize async front-end
+        
+        Args:
+            load_balancer: Load balancer that places the tasks
+            retry_interval: Longest wait (seconds) before retrying a rejected
+                            submission when no completion has been seen
+        """
+        self.load_balancer = load_balancer
+        self.retry_interval = retry_interval
+        self._capacity_freed = None  # asyncio.Event, created on the running loop
+        
+        # Statistics
+        self.total_submitted = 0
+        self.total_completed = 0
+    
+    async def submit(self, task: Task) -> asyncio.Future:
+        """
+        Submit a task and get a future for its result
+        
+        If every processor (and the overflow queue, if any) is full, this
+        waits until a task completes and retries, so submitters are
+        slowed down instead of losing work.
+        
+        Args:
+            task: Task to submit
+        
+        Returns:
+            Future that resolves with the task's result
+        """
+        loop = asyncio.get_running_loop()
+        if self._capacity_freed is None:
+            self._capacity_freed = asyncio.Event()
+        
+        future = loop.create_future()
+        task.add_done_callback(
+            lambda done_task: loop.call_soon_threadsafe(self._resolve, future, done_task))
+        
+        while not self.load_balancer.try_submit(task):
+            self._capacity_freed.clear()
+            try:
+                await asyncio.wait_for(self._capacity_freed.wait(), self.retry_interval)
+            except asyncio.TimeoutError:
+                pass  # Capacity may have freed without a completion (e.g. rebalancing)
+        
+        self.total_submitted += 1
+        return future
+    
+    async def run(self, task: Task):
+        """
+        Submit a task and wait for its result
+        
+        Args:
+            task: Task to run
+        
+        Returns:
+            The task's result
+        """
+        future = await self.submit(task)
+        return await future
+    
+    def _resolve(self, future: asyncio.Future, task: Task):
+        """Complete a future on the event loop and wake waiting submitters"""
+        self.total_completed += 1
+        if future.done():
+            pass  # Cancelled by the caller
+        elif task.error is not None:
+            future.set_exception(task.error)
+        else:
+            future.set_result(task.result)
+        if self._capacity_freed is not None:
+            self._capacity_freed.set()
+    
+    def get_statistics(self) -> dict:
+        """
+        Get async front-end statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'async_submitted': self.total_submitted,
+            'async_completed': self.total_completed,
+            'async_pending': self.total_submitted - self.total_completed
+        }
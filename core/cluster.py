@@ -0,0 +1,809 @@
+"""
+Cluster Module
+Runs processors in agent processes (or on other hosts) behind a coordinator
+"""
+
+import argparse
+import itertools
+import os
+import pickle
+import queue
+import socket
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from . import cluster_protocol as protocol
+from .load_balancer import Task
+from .load_models import create_load_model
+from .processor import Processor
+from .shared_state import SharedStateTable
+
+
+class RemoteProcessor(Processor):
+    """
+    Coordinator-side proxy for a processor hosted by an agent
+    
+    The proxy is a Processor, so SystemMonitor, LoadBalancer, the
+    policies and the migration planner use it unchanged. Its queue is a
+    mirror of the agent's queue:
+    - add_task/add_tasks queue tasks in the mirror and pipeline them to
+      the agent in one DISPATCH frame, without waiting for a reply
+    - STARTED and COMPLETED events from the agent move tasks out of the
+      mirror and complete them here, so load, latency histograms,
+      completion listeners and task callbacks behave as for local processors
+    - steal_tasks/drain_tasks ask the agent to REVOKE the tasks first and
+      only hand over the ones it had not started, so a migrated task
+      never runs twice. The round trip runs without the proxy lock, so
+      callers must not hold it either (remote is True for that reason)
+    
+    Tasks run on the agent, so proxies are not given to a WorkerPool.
+    """
+    
+    def __init__(self, processor_id, connection, index, max_queue_size=10, speed=1.0,
+                 load_model=None, default_task_cost=0.5):
+        """
+        Initialize proxy
+        
+        Args:
+            processor_id: Unique identifier in the cluster
+            connection: AgentConnection of the hosting agent
+            index: Processor index on that agent
+            max_queue_size: The agent processor's capacity
+            speed: The agent processor's speed
+            load_model: How load is computed from the mirrored state
+            default_task_cost: The agent processor's default task cost
+        """
+        super().__init__(processor_id, max_queue_size, speed, load_model, default_task_cost)
+        self.connection = connection
+        self.index = index
+        self.online = True
+        self.remote = True
+        self.remote_state = {}  # Latest heartbeat values reported by the agent
+        self.last_heartbeat = None
+    
+    def add_task(self, task):
+        return self.add_tasks([task]) == 1
+    
+    def add_tasks(self, tasks):
+        with self.lock:
+            if not self.online:
+                return 0
+            count = super().add_tasks(tasks)
+            if count:
+                self.connection.dispatch(self, tasks[:count])
+            return count
+    
+    def get_next_task(self):
+        tasks = self.drain_tasks(1)
+        return tasks[0] if tasks else None
+    
+    def drain_tasks(self, max_count=None):
+        with self.lock:
+            count = len(self.task_queue) if max_count is None else min(max_count, len(self.task_queue))
+            candidates = list(itertools.islice(self.task_queue, count))
+        return self._revoke(candidates)
+    
+    def steal_tasks(self, max_count):
+        with self.lock:
+            count = min(max_count, len(self.task_queue))
+            candidates = list(itertools.islice(reversed(self.task_queue), count))
+        candidates.reverse()
+        return self._revoke(candidates)
+    
+    def _revoke(self, tasks):
+        """
+        Take tasks back from the agent and out of the mirror
+        
+        Waits for the agent's answer (up to the connection's revoke_timeout)
+        without holding the proxy lock, so events for this proxy and
+        placement on it carry on meanwhile. Tasks the agent started in the
+        meantime are not returned and stay in the mirror until STARTED arrives.
+        """
+        if not tasks or not self.online:
+            return []
+        revoked = self.connection.revoke(self, tasks)
+        return self.remove_tasks(revoked)
+    
+    def start_task(self):
+        """Tasks are started by the agent, never by the coordinator"""
+        return None
+    
+    def _update_load(self):
+        with self.lock:
+            if not self.online:
+                self.current_load = 100.0  # Keep placement away from a lost agent
+                for callback in self._load_listeners:
+                    callback(self)
+                return
+            super()._update_load()
+    
+    def _on_started(self, task):
+        """Mirror a task starting on the agent"""
+        with self.lock:
+            if self.task_queue and self.task_queue[0] is task:
+                self.task_queue.popleft()
+            elif task in self.task_queue:
+                self.task_queue.remove(task)
+            else:
+                return  # Taken back while the event was in flight
+            self._remove_work((task,))
+            task.started_at = self.clock()
+            self.is_processing = True
+            self.current_task = task
+            self._running_cost = self.task_cost(task)
+            self._update_load()
+    
+    def _on_completed(self, task, processing_time, result, error):
+        """Mirror a task finishing on the agent"""
+        with self.lock:
+            if self.current_task is not task and task in self.task_queue:
+                self.remove_tasks([task])  # Finished before its start was mirrored
+            # Leaves a different running task alone
+            self.finish_task(processing_time, result=result, error=error, task=task)
+    
+    def _on_heartbeat(self, load, queue_length, is_processing, tasks_completed, processing_time):
+        """Record the agent's own view of this processor"""
+        with self.lock:
+            self.last_heartbeat = self.clock()
+            self.remote_state = {
+                'load': load,
+                'queue_length': queue_length,
+                'is_processing': bool(is_processing),
+                'tasks_completed': tasks_completed,
+                'processing_time': processing_time
+            }
+    
+    def _on_disconnect(self):
+        """
+        Mark the proxy offline and take back everything it held
+        
+        Returns:
+            Tasks that were queued on or running at the lost agent
+        """
+        with self.lock:
+            self.online = False
+            lost = list(self.task_queue)
+            if self.current_task is not None:
+                lost.append(self.current_task)
+            self.task_queue.clear()
+            self.queued_work = 0.0
+            self.current_task = None
+            self.is_processing = False
+            self._running_cost = 0.0
+            self._update_load()
+            return lost
+    
+    def get_metrics(self):
+        metrics = super().get_metrics()
+        metrics['online'] = self.online
+        return metrics
+
+
+class AgentConnection:
+    """
+    Coordinator end of one agent's connection
+    
+    A receiver thread reads frames and answers REVOKE replies directly,
+    without taking processor locks, so a migration that holds proxy
+    locks while it waits for a reply cannot deadlock with event
+    handling. Every other frame goes to an event thread, which applies
+    it to the proxies. If no frame arrives for heartbeat_timeout
+    seconds the agent is considered lost.
+    
+    With a shared state table, the proxies' rows are either written by
+    the agent itself (publishes, for agents on this host) or mirrored
+    from the proxies like local processors.
+    """
+    
+    def __init__(self, sock: socket.socket, stream, hello, first_processor_id,
+                 load_model='outstanding_work', heartbeat_timeout=2.0, revoke_timeout=1.0,
+                 state_table: Optional[SharedStateTable] = None, publishes=False):
+        """
+        Initialize connection
+        
+        Args:
+            sock: Connected socket
+            stream: Buffered reader over sock (the HELLO frame already read)
+            hello: Decoded HELLO payload
+            first_processor_id: Cluster processor_id of the agent's first processor
+            load_model: Load model name for the proxies
+            heartbeat_timeout: Seconds of silence before the agent is considered lost
+            revoke_timeout: Seconds to wait for a REVOKE reply before giving up on the agent
+            state_table: Shared state table holding a row per cluster processor_id
+            publishes: Whether the agent writes its rows of state_table itself
+        """
+        self.sock = sock
+        self.stream = stream
+        self.address = sock.getpeername()
+        self.heartbeat_timeout = heartbeat_timeout
+        self.revoke_timeout = revoke_timeout
+        self.send_lock = threading.Lock()
+        self.state_lock = threading.Lock()  # Guards the wire id maps and pending requests
+        self.connected = True
+        
+        self.processors = [
+            RemoteProcessor(first_processor_id + index, self, index, max_queue_size, speed,
+                            create_load_model(load_model), default_task_cost)
+            for index, (max_queue_size, speed, default_task_cost) in enumerate(hello)
+        ]
+        self.state_table = state_table
+        self.publishes = publishes
+        if state_table is not None:
+            for processor in self.processors:
+                if publishes:
+                    state_table.bind(processor)
+                else:
+                    state_table.attach(processor)
+        
+        self._wire_ids = itertools.count(1)
+        self._tasks: Dict[int, Tuple[RemoteProcessor, Task]] = {}  # Wire id -> (proxy, task)
+        self._task_wire_ids: Dict[int, int] = {}  # id(task) -> wire id
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[int, list] = {}  # Request id -> [event, revoked wire ids]
+        self._events = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._receive, daemon=True, name=f"agent-{self.address}-receive"),
+            threading.Thread(target=self._apply, daemon=True, name=f"agent-{self.address}-events")
+        ]
+    
+    def start(self):
+        """Start the receiver and event threads"""
+        for thread in self._threads:
+            thread.start()
+    
+    def send(self, message_type: int, payload: bytes = b"") -> bool:
+        """
+        Send one frame
+        
+        Returns:
+            False if the connection is gone
+        """
+        try:
+            with self.send_lock:
+                self.sock.sendall(protocol.frame(message_type, payload))
+            return True
+        except OSError:
+            self.close()
+            return False
+    
+    def dispatch(self, processor: RemoteProcessor, tasks: List[Task]):
+        """Pipeline a batch of tasks to one of the agent's processors"""
+        entries = []
+        with self.state_lock:
+            for task in tasks:
+                wire_id = next(self._wire_ids)
+                self._tasks[wire_id] = (processor, task)
+                self._task_wire_ids[id(task)] = wire_id
+                entries.append((processor.index, wire_id, task))
+        self.send(protocol.DISPATCH, protocol.encode_dispatch(entries))
+    
+    def revoke(self, processor: RemoteProcessor, tasks: List[Task]) -> List[Task]:
+        """
+        Ask the agent to give back queued tasks and wait for its answer
+        
+        Args:
+            processor: Proxy the tasks are queued on
+            tasks: Candidate tasks
+        
+        Returns:
+            The tasks the agent removed (those it had not started)
+        """
+        request_id = next(self._request_ids)
+        pending = [threading.Event(), []]
+        with self.state_lock:
+            wire_ids = [self._task_wire_ids[id(task)] for task in tasks if id(task) in self._task_wire_ids]
+            self._pending[request_id] = pending
+        if not self.send(protocol.REVOKE, protocol.encode_revoke(request_id, processor.index, wire_ids)):
+            return []
+        if not pending[0].wait(self.revoke_timeout):
+            # The agent may still revoke the tasks later, so it can no longer be trusted
+            self.close()
+            return []
+        revoked = []
+        with self.state_lock:
+            for wire_id in pending[1]:
+                entry = self._tasks.pop(wire_id, None)
+                if entry is not None:
+                    del self._task_wire_ids[id(entry[1])]
+                    revoked.append(entry[1])
+        return revoked
+    
+    def _receive(self):
+        """Receiver thread: route frames, answering REVOKE replies directly"""
+        try:
+            while True:
+                message = protocol.read_frame(self.stream)
+                if message is None:
+                    break
+                message_type, payload = message
+                if message_type == protocol.REVOKED:
+                    request_id, wire_ids = protocol.decode_revoked(payload)
+                    with self.state_lock:
+                        pending = self._pending.pop(request_id, None)
+                    if pending is not None:
+                        pending[1] = wire_ids
+                        pending[0].set()
+                else:
+                    self._events.put(message)
+        except (OSError, ValueError):
+            pass
+        self._events.put(None)
+    
+    def _apply(self):
+        """Event thread: apply heartbeats and task events to the proxies"""
+        while self.connected:
+            try:
+                message = self._events.get(timeout=self.heartbeat_timeout)
+            except queue.Empty:
+                break  # No heartbeat in time: the agent is lost
+            if message is None:
+                break
+            message_type, payload = message
+            if message_type == protocol.HEARTBEAT:
+                _, rows = protocol.decode_heartbeat(payload)
+                for index, *state in rows:
+                    self.processors[index]._on_heartbeat(*state)
+            elif message_type == protocol.STARTED:
+                with self.state_lock:
+                    started = [self._tasks.get(wire_id) for wire_id in protocol.decode_ids(payload)]
+                for processor, task in filter(None, started):
+                    processor._on_started(task)
+            elif message_type == protocol.COMPLETED:
+                for wire_id, processing_time, failed, body in protocol.decode_completed(payload):
+                    with self.state_lock:
+                        entry = self._tasks.pop(wire_id, None)
+                        if entry is not None:
+                            del self._task_wire_ids[id(entry[1])]
+                    if entry is None:
+                        continue
+                    value = pickle.loads(body) if body else None
+                    processor, task = entry
+                    if failed:
+                        processor._on_completed(task, processing_time, None, value)
+                    else:
+                        processor._on_completed(task, processing_time, value, None)
+        self.close()
+    
+    def close(self):
+        """Drop the connection and fail every task the agent still held"""
+        with self.state_lock:
+            if not self.connected:
+                return
+            self.connected = False
+            pending, self._pending = self._pending, {}
+            self._tasks.clear()
+            self._task_wire_ids.clear()
+        for event, _ in pending.values():
+            event.set()  # Waiting revokes get an empty answer
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        
+        lost = []
+        for processor in self.processors:
+            lost.extend(processor._on_disconnect())
+            if self.publishes:
+                # The agent no longer writes this row; show the processor as lost
+                with processor.lock:
+                    self.state_table.write(processor)
+        error = ConnectionError(f"Agent {self.address} disconnected")
+        for task in lost:
+            task.set_exception(error)
+
+
+class ClusterCoordinator:
+    """
+    Accepts processor agents and exposes them as RemoteProcessor proxies
+    
+    Agents connect to the coordinator (so they can join from any host)
+    and announce their processors in a HELLO frame; each becomes a
+    RemoteProcessor with the next free processor_id. Build SystemMonitor
+    and LoadBalancer on the proxies once the expected agents have joined:
+        
+        coordinator = ClusterCoordinator(port=9000)
+        coordinator.start()
+        coordinator.launch_local_agents(4)        # or start agents on other hosts
+        processors = coordinator.wait_for_agents(4)
+        monitor = SystemMonitor(processors)
+        load_balancer = LoadBalancer(processors, monitor)
+    
+    Task callables, arguments and results travel pickled, so the
+    coordinator and agents must trust each other and the network.
+    
+    With a SharedStateTable, agents launched on this host write their
+    processors' rows straight into shared memory, so a SystemMonitor
+    given the table sees their state without waiting for heartbeats;
+    rows of agents on other hosts are mirrored from the proxies.
+    """
+    
+    def __init__(self, host='127.0.0.1', port=0, load_model='outstanding_work',
+                 heartbeat_timeout=2.0, revoke_timeout=1.0,
+                 state_table: Optional[SharedStateTable] = None):
+        """
+        Initialize coordinator
+        
+        Args:
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one; see address)
+            load_model: Load model name used by the proxies
+            heartbeat_timeout: Seconds of silence before an agent is considered lost
+            revoke_timeout: Seconds to wait for an agent to answer a REVOKE
+            state_table: Shared state table with a row for every processor
+                         that may join (rows are cluster processor_ids)
+        """
+        self.host = host
+        self.port = port
+        self.load_model = load_model
+        self.heartbeat_timeout = heartbeat_timeout
+        self.revoke_timeout = revoke_timeout
+        self.state_table = state_table
+        self.connections: List[AgentConnection] = []
+        self.agent_processes: List[subprocess.Popen] = []
+        self.joined = threading.Condition()
+        self.server = None
+        self._accept_thread = None
+    
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, port) agents connect to"""
+        return self.server.getsockname()[:2]
+    
+    @property
+    def processors(self) -> List[RemoteProcessor]:
+        """Proxies of every processor that has joined, in processor_id order"""
+        with self.joined:
+            return [processor for connection in self.connections for processor in connection.processors]
+    
+    def start(self):
+        """Start listening for agents"""
+        if self.server is not None:
+            return
+        self.server = socket.create_server((self.host, self.port))
+        self._accept_thread = threading.Thread(target=self._accept, daemon=True, name="cluster-accept")
+        self._accept_thread.start()
+    
+    def _accept(self):
+        """Accept thread: register agents as they connect"""
+        while True:
+            try:
+                sock, _ = self.server.accept()
+            except OSError:
+                return  # Server closed
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            stream = sock.makefile('rb')
+            try:
+                message = protocol.read_frame(stream)
+                if message is None or message[0] != protocol.HELLO:
+                    raise ValueError("Expected HELLO")
+                hello, table_name = protocol.decode_hello(message[1])
+                with self.joined:
+                    first_processor_id = sum(len(c.processors) for c in self.connections)
+                    if (self.state_table is not None
+                            and first_processor_id + len(hello) > len(self.state_table.processors)):
+                        raise ValueError("No free rows left in the shared state table")
+                    sock.sendall(protocol.frame(protocol.WELCOME, protocol.encode_welcome(first_processor_id)))
+            except (OSError, ValueError) as error:
+                print(f"[CLUSTER] Rejected agent: {error}")
+                sock.close()
+                continue
+            
+            with self.joined:
+                publishes = self.state_table is not None and table_name == self.state_table.name
+                connection = AgentConnection(sock, stream, hello, first_processor_id, self.load_model,
+                                             self.heartbeat_timeout, self.revoke_timeout,
+                                             self.state_table, publishes)
+                self.connections.append(connection)
+                connection.start()
+                self.joined.notify_all()
+    
+    def wait_for_agents(self, count: int, timeout: Optional[float] = None) -> List[RemoteProcessor]:
+        """
+        Block until count agents have joined
+        
+        Args:
+            count: Number of agents to wait for
+            timeout: Maximum seconds to wait (None waits forever)
+        
+        Returns:
+            Proxies of every processor that has joined
+        """
+        with self.joined:
+            if not self.joined.wait_for(lambda: len(self.connections) >= count, timeout):
+                raise TimeoutError(f"Only {len(self.connections)} of {count} agents joined")
+        return self.processors
+    
+    def launch_local_agents(self, count: int, processors_per_agent=1, speed=1.0,
+                            max_queue_size=10, processing_time=0.5) -> List[subprocess.Popen]:
+        """
+        Start agents as child processes on this host (one per core spreads
+        simulated and CPU-bound work across cores)
+        
+        Args:
+            count: Number of agent processes
+            processors_per_agent: Processors hosted by each agent
+            speed: Speed of every agent processor
+            max_queue_size: Capacity of every agent processor
+            processing_time: Processing time for simulated tasks (seconds)
+        
+        Returns:
+            The agent processes (also stopped by shutdown)
+        """
+        host, port = self.address
+        command = [sys.executable, '-m', 'core.cluster', '--connect', f"{host}:{port}",
+                   '--processors', str(processors_per_agent), '--speed', str(speed),
+                   '--max-queue-size', str(max_queue_size), '--processing-time', str(processing_time)]
+        if self.state_table is not None:
+            command += ['--state-table', self.state_table.name]
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        processes = [subprocess.Popen(command, cwd=root) for _ in range(count)]
+        self.agent_processes.extend(processes)
+        return processes
+    
+    def shutdown(self, timeout=5.0):
+        """
+        Stop the agents and the listener
+        
+        Args:
+            timeout: Maximum seconds to wait for each local agent process
+        """
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        with self.joined:
+            connections = list(self.connections)
+        for connection in connections:
+            connection.send(protocol.SHUTDOWN)
+            connection.close()
+        for process in self.agent_processes:
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        self.agent_processes = []
+
+
+class ProcessorAgent:
+    """
+    Hosts real processors in this process on behalf of a coordinator
+    
+    - DISPATCH frames are queued on the local processors, which run them
+      on one worker thread each (process_task, so task callables run here)
+    - REVOKE frames remove tasks that have not started and are answered
+      immediately
+    - A sender thread batches task starts, completions and a heartbeat
+      with every processor's state into one write, at most every
+      heartbeat_interval when idle and as soon as events are waiting
+      otherwise. Starts and completions keep the order they happened
+      in (consecutive events of one kind share a frame), so the
+      coordinator never sees a task start before the previous one ends
+    - With a shared state table on this host, every processor's row is
+      also written on each load change, so the coordinator's monitor
+      reads it directly
+    """
+    
+    def __init__(self, address: Tuple[str, int], processors: List[Processor],
+                 processing_time=0.5, heartbeat_interval=0.1, state_table: Optional[str] = None):
+        """
+        Initialize agent
+        
+        Args:
+            address: Coordinator (host, port)
+            processors: Processors to host; their list index is their index on the wire
+            processing_time: Processing time for simulated tasks (seconds)
+            heartbeat_interval: Seconds between heartbeats
+            state_table: Name of the coordinator's SharedStateTable to publish to
+        """
+        self.address = address
+        self.processors = processors
+        self.processing_time = processing_time
+        self.heartbeat_interval = heartbeat_interval
+        self.state_table_name = state_table
+        self.state_table: Optional[SharedStateTable] = None
+        self.first_processor_id = None  # Row of the first processor, from WELCOME
+        self.running = False
+        self.sock = None
+        self.send_lock = threading.Lock()
+        self.tasks: Dict[int, Task] = {}  # Wire id -> queued or running task
+        self.tasks_lock = threading.Lock()
+        self.pending = threading.Condition()  # Guards the event batch below
+        self._events: List[Tuple[int, object]] = []  # (STARTED, wire id) or (COMPLETED, record), in order
+        self._running_task = {}  # Index -> task last reported as started
+        for index, processor in enumerate(processors):
+            processor.add_load_listener(lambda p, index=index: self._on_load_update(index, p))
+    
+    def run(self):
+        """Connect, serve until the coordinator says SHUTDOWN or goes away, then stop"""
+        self.sock = socket.create_connection(self.address)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        stream = self.sock.makefile('rb')
+        if self.state_table_name:
+            try:
+                self.state_table = SharedStateTable.open(self.state_table_name)
+            except (OSError, ValueError) as error:
+                print(f"[AGENT] Not publishing to state table {self.state_table_name}: {error}")
+        hello = [(p.max_queue_size, p.speed, p.default_task_cost) for p in self.processors]
+        table_name = self.state_table.name if self.state_table is not None else ""
+        self._send(protocol.frame(protocol.HELLO, protocol.encode_hello(hello, table_name)))
+        message = protocol.read_frame(stream)
+        if message is None or message[0] != protocol.WELCOME:
+            self._close_state_table()
+            self.sock.close()
+            raise ConnectionError(f"Coordinator {self.address} rejected the agent")
+        self.first_processor_id = protocol.decode_welcome(message[1])
+        if self.state_table is not None:
+            for index, processor in enumerate(self.processors):
+                with processor.lock:
+                    self._publish(self.state_table, index, processor)
+        
+        self.running = True
+        threads = [threading.Thread(target=self._work, args=(processor,), daemon=True)
+                   for processor in self.processors]
+        threads.append(threading.Thread(target=self._send_events, daemon=True))
+        for thread in threads:
+            thread.start()
+        
+        try:
+            while self.running:
+                message = protocol.read_frame(stream)
+                if message is None or message[0] == protocol.SHUTDOWN:
+                    break
+                message_type, payload = message
+                if message_type == protocol.DISPATCH:
+                    self._queue_tasks(payload)
+                elif message_type == protocol.REVOKE:
+                    request_id, index, wire_ids = protocol.decode_revoke(payload)
+                    with self.tasks_lock:
+                        tasks = [self.tasks[w] for w in wire_ids if w in self.tasks]
+                    revoked = self.processors[index].remove_tasks(tasks)
+                    with self.tasks_lock:
+                        for task in revoked:
+                            del self.tasks[task.task_id]
+                    self._send(protocol.frame(protocol.REVOKED, protocol.encode_revoked(
+                        request_id, [task.task_id for task in revoked])))
+        except OSError:
+            pass
+        finally:
+            self.running = False
+            for processor in self.processors:
+                processor.wake_workers()
+            with self.pending:
+                self.pending.notify_all()
+            for thread in threads:
+                thread.join(1.0)
+            self._close_state_table()
+            self.sock.close()
+    
+    def _close_state_table(self):
+        """Stop publishing and release the shared state table"""
+        table, self.state_table = self.state_table, None
+        if table is None:
+            return
+        for processor in self.processors:
+            with processor.lock:
+                pass  # Listeners run under the lock, so none still holds the table
+        table.close()
+    
+    def _queue_tasks(self, payload: bytes):
+        """Queue a DISPATCH batch, one add_tasks call per processor"""
+        batches: Dict[int, List[Task]] = {}
+        for index, wire_id, service_time, estimated_cost, call in protocol.decode_dispatch(payload):
+            func, args, kwargs = call if call is not None else (None, (), None)
+            # The wire id doubles as the task id on this side
+            task = Task(wire_id, func, args, kwargs, service_time=service_time, estimated_cost=estimated_cost)
+            task.add_done_callback(self._on_done)
+            batches.setdefault(index, []).append(task)
+        with self.tasks_lock:
+            for tasks in batches.values():
+                for task in tasks:
+                    self.tasks[task.task_id] = task
+        for index, tasks in batches.items():
+            # The coordinator's mirror never holds fewer tasks than this queue,
+            # so the batch always fits
+            self.processors[index].add_tasks(tasks)
+    
+    def _work(self, processor: Processor):
+        """Worker thread for one processor"""
+        while self.running:
+            if processor.process_task(self.processing_time) is None:
+                processor.wait_for_work(self.heartbeat_interval)
+    
+    def _on_load_update(self, index: int, processor: Processor):
+        """Load listener: publish the processor's row and report a task the moment it starts"""
+        table = self.state_table
+        if table is not None:
+            self._publish(table, index, processor)
+        task = processor.current_task
+        if task is not None and self._running_task.get(index) is not task:
+            self._running_task[index] = task
+            with self.pending:
+                self._events.append((protocol.STARTED, task.task_id))
+                self.pending.notify()
+    
+    def _publish(self, table: SharedStateTable, index: int, processor: Processor):
+        """Write a processor's state to its row of the shared state table (lock held)"""
+        table.write_row(self.first_processor_id + index, processor.current_load,
+                                   len(processor.task_queue), processor.is_processing,
+                                   processor.total_tasks_completed, processor.total_processing_time)
+    
+    def _on_done(self, task: Task):
+        """Task done callback: report the result"""
+        if task.func is None:
+            body = b""
+        else:
+            try:
+                body = pickle.dumps(task.error if task.error is not None else task.result)
+            except Exception as error:
+                body = pickle.dumps(RuntimeError(f"Unpicklable result of task: {error}"))
+        processing_time = (task.finished_at - task.started_at) if task.started_at is not None else 0.0
+        with self.tasks_lock:
+            self.tasks.pop(task.task_id, None)
+        with self.pending:
+            self._events.append((protocol.COMPLETED, (task.task_id, processing_time, task.error is not None, body)))
+            self.pending.notify()
+    
+    def _send_events(self):
+        """Sender thread: batch events and heartbeats into single writes"""
+        next_heartbeat = 0.0
+        while self.running:
+            with self.pending:
+                if not self._events:
+                    self.pending.wait(max(next_heartbeat - time.monotonic(), 0.0))
+                events, self._events = self._events, []
+            
+            frames = []
+            for message_type, run in itertools.groupby(events, key=lambda event: event[0]):
+                records = [record for _, record in run]
+                if message_type == protocol.STARTED:
+                    frames.append(protocol.frame(protocol.STARTED, protocol.encode_ids(records)))
+                else:
+                    frames.append(protocol.frame(protocol.COMPLETED, protocol.encode_completed(records)))
+            now = time.monotonic()
+            if now >= next_heartbeat:
+                next_heartbeat = now + self.heartbeat_interval
+                rows = []
+                for index, processor in enumerate(self.processors):
+                    with processor.lock:
+                        rows.append((index, processor.current_load, len(processor.task_queue),
+                                     processor.is_processing, processor.total_tasks_completed,
+                                     processor.total_processing_time))
+                frames.append(protocol.frame(protocol.HEARTBEAT, protocol.encode_heartbeat(time.time(), rows)))
+            if frames and not self._send(b"".join(frames)):
+                break
+    
+    def _send(self, data: bytes) -> bool:
+        """Write pre-framed bytes; False once the coordinator is gone"""
+        try:
+            with self.send_lock:
+                self.sock.sendall(data)
+            return True
+        except OSError:
+            self.running = False
+            return False
+
+
+def main():
+    """Run a processor agent: python -m core.cluster --connect HOST:PORT"""
+    parser = argparse.ArgumentParser(description="Run processors for a cluster coordinator")
+    parser.add_argument('--connect', required=True, help="Coordinator address (HOST:PORT)")
+    parser.add_argument('--processors', type=int, default=1, help="Processors hosted by this agent")
+    parser.add_argument('--speed', type=float, default=1.0, help="Speed of every processor")
+    parser.add_argument('--max-queue-size', type=int, default=10, help="Capacity of every processor")
+    parser.add_argument('--processing-time', type=float, default=0.5,
+                        help="Processing time for simulated tasks (seconds)")
+    parser.add_argument('--heartbeat-interval', type=float, default=0.1,
+                        help="Seconds between heartbeats")
+    parser.add_argument('--state-table', help="Shared state table to publish processor state to")
+    args = parser.parse_args()
+    
+    host, port = args.connect.rsplit(':', 1)
+    processors = [Processor(index, args.max_queue_size, args.speed) for index in range(args.processors)]
+    ProcessorAgent((host, int(port)), processors, args.processing_time, args.heartbeat_interval,
+                   args.state_table).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Cluster Protocol Module
+Compact binary framing for coordinator <-> processor agent traffic
+"""
+
+import math
+import pickle
+import struct
+from typing import List, Optional, Tuple
+
+# Every message is a frame: type (u8) + payload length (u32) + payload.
+# All integers and floats are little-endian; None floats travel as NaN.
+FRAME_HEADER = struct.Struct("<BI")
+
+# Message types
+HELLO = 1       # agent -> coordinator: processors hosted by the agent
+DISPATCH = 2    # coordinator -> agent: batch of tasks to queue (no reply)
+REVOKE = 3      # coordinator -> agent: take queued tasks back (migration)
+REVOKED = 4     # agent -> coordinator: tasks that were still queued and were removed
+HEARTBEAT = 5   # agent -> coordinator: state of every hosted processor
+STARTED = 6     # agent -> coordinator: tasks that started running
+COMPLETED = 7   # agent -> coordinator: tasks that finished
+SHUTDOWN = 8    # coordinator -> agent: stop
+WELCOME = 9     # coordinator -> agent: cluster processor_id of the agent's first processor
+
+MAGIC = b"LBCL"
+VERSION = 2
+
+_HELLO = struct.Struct("<4sHH")             # magic, version, processor count
+_HELLO_PROCESSOR = struct.Struct("<Idd")    # max_queue_size, speed, default_task_cost
+_NAME = struct.Struct("<H")                 # length of a UTF-8 string that follows
+_COUNT = struct.Struct("<I")
+_DISPATCH_TASK = struct.Struct("<HQddI")    # index, wire id, service_time, estimated_cost, callable bytes
+_REVOKE = struct.Struct("<IHI")             # request id, index, wire id count
+_REVOKED = struct.Struct("<II")             # request id, wire id count
+_HEARTBEAT = struct.Struct("<dH")           # agent timestamp, processor count
+_HEARTBEAT_ROW = struct.Struct("<HdIBQd")   # index, load, queue length, is_processing,
+                                            # tasks completed, processing time
+_COMPLETED_TASK = struct.Struct("<QdBI")    # wire id, processing time, failed, result bytes
+
+
+def frame(message_type: int, payload: bytes = b"") -> bytes:
+    """Wrap a payload in a frame header"""
+    return FRAME_HEADER.pack(message_type, len(payload)) + payload
+
+
+def read_frame(stream) -> Optional[Tuple[int, bytes]]:
+    """
+    Read one frame from a buffered binary stream (e.g. socket.makefile('rb'))
+    
+    Returns:
+        (message type, payload), or None once the peer has closed the connection
+    """
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    message_type, length = FRAME_HEADER.unpack(header)
+    payload = stream.read(length) if length else b""
+    if len(payload) < length:
+        return None
+    return message_type, payload
+
+
+def _float(value: Optional[float]) -> float:
+    return math.nan if value is None else value
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+
+def encode_ids(wire_ids: List[int]) -> bytes:
+    """Pack a list of wire ids (STARTED payload)"""
+    return _COUNT.pack(len(wire_ids)) + struct.pack(f"<{len(wire_ids)}Q", *wire_ids)
+
+
+def decode_ids(payload: bytes, offset: int = 0) -> List[int]:
+    """Unpack a list of wire ids written by encode_ids"""
+    (count,) = _COUNT.unpack_from(payload, offset)
+    return list(struct.unpack_from(f"<{count}Q", payload, offset + _COUNT.size))
+
+
+def encode_hello(processors: List[Tuple[int, float, float]], state_table: str = "") -> bytes:
+    """
+    Pack the processors an agent hosts
+    
+    Args:
+        processors: (max_queue_size, speed, default_task_cost) per processor
+        state_table: Name of the shared state table the agent publishes
+                     its rows to ("" if none)
+    """
+    name = state_table.encode("utf-8")
+    parts = [_HELLO.pack(MAGIC, VERSION, len(processors))]
+    parts.extend(_HELLO_PROCESSOR.pack(*processor) for processor in processors)
+    parts.append(_NAME.pack(len(name)) + name)
+    return b"".join(parts)
+
+
+def decode_hello(payload: bytes) -> Tuple[List[Tuple[int, float, float]], str]:
+    """Unpack a HELLO payload into (processors, state table name), checking the protocol version"""
+    magic, version, count = _HELLO.unpack_from(payload)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Unsupported cluster protocol: {magic!r} version {version}")
+    processors = [_HELLO_PROCESSOR.unpack_from(payload, _HELLO.size + i * _HELLO_PROCESSOR.size)
+                  for i in range(count)]
+    offset = _HELLO.size + count * _HELLO_PROCESSOR.size
+    (length,) = _NAME.unpack_from(payload, offset)
+    offset += _NAME.size
+    return processors, payload[offset:offset + length].decode("utf-8")
+
+
+def encode_welcome(first_processor_id: int) -> bytes:
+    """Pack the reply to a HELLO"""
+    return _COUNT.pack(first_processor_id)
+
+
+def decode_welcome(payload: bytes) -> int:
+    """Unpack a WELCOME payload into the agent's first processor_id"""
+    return _COUNT.unpack(payload)[0]
+
+
+def encode_dispatch(entries) -> bytes:
+    """
+    Pack a batch of tasks
+    
+    Args:
+        entries: (processor index, wire id, task) triples; a task's callable,
+                 args and kwargs are pickled only if it has a callable
+    """
+    parts = [_COUNT.pack(len(entries))]
+    for index, wire_id, task in entries:
+        body = pickle.dumps((task.func, task.args, task.kwargs)) if task.func is not None else b""
+        parts.append(_DISPATCH_TASK.pack(index, wire_id, _float(task.service_time),
+                                         _float(task.estimated_cost), len(body)))
+        parts.append(body)
+    return b"".join(parts)
+
+
+def decode_dispatch(payload: bytes) -> List[Tuple]:
+    """
+    Unpack a DISPATCH payload
+    
+    Returns:
+        (index, wire id, service_time, estimated_cost, (func, args, kwargs) or None) tuples
+    """
+    (count,) = _COUNT.unpack_from(payload)
+    offset = _COUNT.size
+    entries = []
+    for _ in range(count):
+        index, wire_id, service_time, estimated_cost, length = _DISPATCH_TASK.unpack_from(payload, offset)
+        offset += _DISPATCH_TASK.size
+        call = pickle.loads(payload[offset:offset + length]) if length else None
+        offset += length
+        entries.append((index, wire_id, _optional(service_time), _optional(estimated_cost), call))
+    return entries
+
+
+def encode_revoke(request_id: int, index: int, wire_ids: List[int]) -> bytes:
+    """Pack a request to take tasks back from one processor"""
+    return _REVOKE.pack(request_id, index, len(wire_ids)) + struct.pack(f"<{len(wire_ids)}Q", *wire_ids)
+
+
+def decode_revoke(payload: bytes) -> Tuple[int, int, List[int]]:
+    """Unpack a REVOKE payload into (request id, index, wire ids)"""
+    request_id, index, count = _REVOKE.unpack_from(payload)
+    return request_id, index, list(struct.unpack_from(f"<{count}Q", payload, _REVOKE.size))
+
+
+def encode_revoked(request_id: int, wire_ids: List[int]) -> bytes:
+    """Pack the reply to a REVOKE"""
+    return _REVOKED.pack(request_id, len(wire_ids)) + struct.pack(f"<{len(wire_ids)}Q", *wire_ids)
+
+
+def decode_revoked(payload: bytes) -> Tuple[int, List[int]]:
+    """Unpack a REVOKED payload into (request id, wire ids)"""
+    request_id, count = _REVOKED.unpack_from(payload)
+    return request_id, list(struct.unpack_from(f"<{count}Q", payload, _REVOKED.size))
+
+
+def encode_heartbeat(timestamp: float, rows: List[Tuple]) -> bytes:
+    """
+    Pack the state of every processor on an agent
+    
+    Args:
+        timestamp: Agent clock
+        rows: (index, load, queue length, is_processing, tasks completed,
+              processing time) per processor
+    """
+    parts = [_HEARTBEAT.pack(timestamp, len(rows))]
+    parts.extend(_HEARTBEAT_ROW.pack(*row) for row in rows)
+    return b"".join(parts)
+
+
+def decode_heartbeat(payload: bytes) -> Tuple[float, List[Tuple]]:
+    """Unpack a HEARTBEAT payload into (timestamp, rows)"""
+    timestamp, count = _HEARTBEAT.unpack_from(payload)
+    return timestamp, [_HEARTBEAT_ROW.unpack_from(payload, _HEARTBEAT.size + i * _HEARTBEAT_ROW.size)
+                       for i in range(count)]
+
+
+def encode_completed(records: List[Tuple[int, float, bool, bytes]]) -> bytes:
+    """
+    Pack finished tasks
+    
+    Args:
+        records: (wire id, processing time, failed, pickled result or
+                 exception, empty for simulated tasks) per task
+    """
+    parts = [_COUNT.pack(len(records))]
+    for wire_id, processing_time, failed, body in records:
+        parts.append(_COMPLETED_TASK.pack(wire_id, processing_time, failed, len(body)))
+        parts.append(body)
+    return b"".join(parts)
+
+
+def decode_completed(payload: bytes) -> List[Tuple[int, float, bool, bytes]]:
+    """Unpack a COMPLETED payload into (wire id, processing time, failed, body) tuples"""
+    (count,) = _COUNT.unpack_from(payload)
+    offset = _COUNT.size
+    records = []
+    for _ in range(count):
+        wire_id, processing_time, failed, length = _COMPLETED_TASK.unpack_from(payload, offset)
+        offset += _COMPLETED_TASK.size
+        records.append((wire_id, processing_time, bool(failed), payload[offset:offset + length]))
+        offset += length
+    return records
@@ -0,0 +1,208 @@
+"""
+Domains Module
+Groups processors into domains (sockets, NUMA nodes, hosts) for two-level balancing
+"""
+
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Union
+from .processor import Processor
+from .monitor import SystemMonitor
+from .load_index import IndexedHeap
+from .migration import MigrationPlanner
+
+
+class ProcessorDomain:
+    """
+    A group of processors that is balanced as a unit
+    
+    Each domain has its own SystemMonitor, so its average load, load
+    index and threshold counts are kept current incrementally, just like
+    the system-wide ones, and its own MigrationPlanner for moves that
+    stay inside the domain. Domain monitors keep no metrics history or
+    latency histograms; the system-wide monitor has those.
+    """
+    
+    def __init__(self, domain_id: int, name: str, processors: List[Processor],
+                 rebalance_threshold=0.3):
+        """
+        Initialize domain
+        
+        Args:
+            domain_id: Index of the domain
+            name: Display name (e.g. "socket0")
+            processors: Processors in this domain
+            rebalance_threshold: Load spread (0.3 = 30%) that triggers
+                                 rebalancing inside the domain
+        """
+        self.domain_id = domain_id
+        self.name = name
+        self.processors = processors
+        self.monitor = SystemMonitor(processors, rebalance_threshold,
+                                     track_history=False, track_latency=False)
+        self.planner = MigrationPlanner(processors, self.monitor)
+    
+    def get_average_load(self) -> float:
+        """Average load of the domain's processors (O(1))"""
+        return self.monitor.get_average_load()
+    
+    def __str__(self):
+        return f"Domain {self.name}: {len(self.processors)} processors, Load={self.get_average_load():.1f}%"
+
+
+class ProcessorDomains:
+    """
+    Two-level view of the processors: domains, then processors in a domain
+    
+    Placement picks the least loaded domain from a heap of domain
+    average loads, then the least loaded processor from that domain's
+    load index, so it costs two index lookups however many processors
+    there are.
+    
+    Rebalancing is local first:
+    - Inside every imbalanced domain, move tasks from its overloaded to
+      its underloaded processors
+    - Only when the average loads of the most and least loaded domains
+      differ by more than cross_domain_threshold, move tasks from the
+      busiest processors of the hot domain to the idlest processors of
+      the cold one (one domain pair per call)
+    """
+    
+    def __init__(self, groups: Union[Dict[str, List[Processor]], Sequence[List[Processor]]],
+                 cross_domain_threshold=30.0, rebalance_threshold=0.3):
+        """
+        Initialize domains
+        
+        Args:
+            groups: Processors per domain, as {name: processors} or a list of lists
+            cross_domain_threshold: Difference between the highest and lowest
+                                    domain average load (%) above which tasks
+                                    may cross domains
+            rebalance_threshold: Load spread that triggers rebalancing inside a domain
+        """
+        if not isinstance(groups, dict):
+            groups = {f"domain{i}": list(group) for i, group in enumerate(groups)}
+        self.domains = [ProcessorDomain(i, name, list(processors), rebalance_threshold)
+                        for i, (name, processors) in enumerate(groups.items())]
+        self.processors = [p for domain in self.domains for p in domain.processors]
+        self.cross_domain_threshold = cross_domain_threshold
+        self._domain_of = {id(p): domain for domain in self.domains for p in domain.processors}
+        
+        # Cross-domain moves are planned over all processors, with explicit sources and targets
+        self.cross_planner = MigrationPlanner(self.processors, None)
+        
+        # Statistics
+        self.intra_domain_migrations = 0
+        self.cross_domain_migrations = 0
+        
+        # Min/max heaps of domain average loads
+        self.lock = Lock()
+        self._min_heap = IndexedHeap()
+        self._max_heap = IndexedHeap()
+        self._loads = {}  # domain_id -> last indexed average load
+        for domain in self.domains:
+            load = domain.get_average_load()
+            self._loads[domain.domain_id] = load
+            self._min_heap.push(domain.domain_id, (load, domain.domain_id))
+            self._max_heap.push(domain.domain_id, (-load, domain.domain_id))
+            # Registered after the domain monitor's listener, so its average is already updated
+            for processor in domain.processors:
+                processor.add_load_listener(lambda p, domain=domain: self._on_load_update(domain))
+    
+    @classmethod
+    def partition(cls, processors: List[Processor], domain_size: int, **kwargs) -> 'ProcessorDomains':
+        """
+        Split processors into domains of consecutive processors
+        
+        Args:
+            processors: All processors
+            domain_size: Processors per domain (the last domain may be smaller)
+            **kwargs: Passed to ProcessorDomains
+        
+        Returns:
+            New ProcessorDomains
+        """
+        if domain_size <= 0:
+            raise ValueError("domain_size must be positive")
+        return cls([processors[i:i + domain_size] for i in range(0, len(processors), domain_size)],
+                   **kwargs)
+    
+    def _on_load_update(self, domain: ProcessorDomain):
+        """Processor load listener - re-indexes the processor's domain"""
+        load = domain.get_average_load()
+        with self.lock:
+            if self._loads[domain.domain_id] == load:
+                return
+            self._loads[domain.domain_id] = load
+            self._min_heap.update(domain.domain_id, (load, domain.domain_id))
+            self._max_heap.update(domain.domain_id, (-load, domain.domain_id))
+    
+    def domain_of(self, processor: Processor) -> ProcessorDomain:
+        """Get the domain a processor belongs to"""
+        return self._domain_of[id(processor)]
+    
+    def get_least_loaded_domain(self) -> Optional[ProcessorDomain]:
+        """Get the domain with the lowest average load (O(1))"""
+        with self.lock:
+            domain_id = self._min_heap.peek()
+        return None if domain_id is None else self.domains[domain_id]
+    
+    def get_most_loaded_domain(self) -> Optional[ProcessorDomain]:
+        """Get the domain with the highest average load (O(1))"""
+        with self.lock:
+            domain_id = self._max_heap.peek()
+        return None if domain_id is None else self.domains[domain_id]
+    
+    def get_domain_loads(self) -> Dict[str, float]:
+        """
+        Snapshot of every domain's average load
+        
+        Returns:
+            Dictionary mapping domain name to average load (%)
+        """
+        with self.lock:
+            return {domain.name: self._loads[domain.domain_id] for domain in self.domains}
+    
+    def rebalance(self) -> int:
+        """
+        Rebalance inside domains, then across domains if their loads diverge
+        
+        Returns:
+            Number of tasks migrated
+        """
+        migrated = 0
+        for domain in self.domains:
+            monitor, planner = domain.monitor, domain.planner
+            if (monitor.detect_imbalance()
+                    and monitor.count_overloaded(planner.overload_threshold) > 0
+                    and monitor.count_underloaded(planner.underload_threshold) > 0):
+                migrated += planner.execute(planner.plan())
+        self.intra_domain_migrations += migrated
+        
+        hot = self.get_most_loaded_domain()
+        cold = self.get_least_loaded_domain()
+        if hot is None or hot is cold:
+            return migrated
+        hot_load, cold_load = hot.get_average_load(), cold.get_average_load()
+        if hot_load - cold_load <= self.cross_domain_threshold:
+            return migrated
+        
+        # Processors above the midpoint give work to processors below it
+        midpoint = (hot_load + cold_load) / 2
+        sources = hot.monitor.get_overloaded_processors(midpoint)
+        targets = cold.monitor.get_underloaded_processors(midpoint)
+        moved = self.cross_planner.execute(self.cross_planner.plan(sources, targets))
+        self.cross_domain_migrations += moved
+        return migrated + moved
+    
+    def get_statistics(self) -> Dict:
+        """
+        Get domain statistics
+        
+        Returns:
+            Dictionary with domain count and intra/cross-domain migration counts
+        """
+        return {
+            'domain_count': len(self.domains),
+            'intra_domain_migrations': self.intra_domain_migrations,
+            'cross_domain_migrations': self.cross_domain_migrations
+        }
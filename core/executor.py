@@ -0,0 +1,83 @@
+"""
+Execution Backend Module
+Runs task callables in real worker processes, one per processor
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+from .processor import Processor
+
+
+class ProcessExecutionBackend:
+    """
+    Maps every Processor to a dedicated worker process
+    
+    Each processor gets a single-worker ProcessPoolExecutor, so tasks it
+    runs execute in their own OS process and CPU-bound callables run in
+    parallel across cores instead of contending for the GIL.
+    
+    Placement is unchanged: tasks still wait in the processor queues of
+    this process, so the LoadBalancer (and rebalance_loads migrations)
+    keep deciding which worker runs what. Only when a processor starts a
+    task is its callable shipped to that processor's worker.
+    
+    Task callables and their arguments must be picklable.
+    
+    With cores, each worker process is pinned to its processor's core
+    (os.sched_setaffinity, Linux), matching a PinnedWorkerPool.
+    """
+    
+    def __init__(self, processors: List[Processor], start_method=None,
+                 cores: Optional[List[int]] = None):
+        """
+        Initialize execution backend
+        
+        Args:
+            processors: Processors to attach worker processes to
+            start_method: multiprocessing start method ("fork", "spawn", ...)
+                          or None for the platform default
+            cores: Core to pin each processor's worker process to (None: no pinning)
+        """
+        self.processors = processors
+        self.context = multiprocessing.get_context(start_method) if start_method else None
+        if cores is not None and len(cores) != len(processors):
+            raise ValueError("cores needs one entry per processor")
+        self.cores = cores
+        self.started = False
+    
+    def start(self):
+        """Start one worker process per processor and attach it"""
+        if self.started:
+            return
+        for position, processor in enumerate(self.processors):
+            initializer, initargs = None, ()
+            if self.cores is not None:
+                initializer, initargs = os.sched_setaffinity, (0, {self.cores[position]})
+            executor = ProcessPoolExecutor(max_workers=1, mp_context=self.context,
+                                           initializer=initializer, initargs=initargs)
+            with processor.lock:
+                processor.executor = executor
+        self.started = True
+    
+    def shutdown(self, wait=True):
+        """
+        Detach and stop the worker processes
+        
+        Args:
+            wait: Wait for running tasks to finish
+        """
+        for processor in self.processors:
+            with processor.lock:
+                executor, processor.executor = processor.executor, None
+            if executor is not None:
+                executor.shutdown(wait=wait)
+        self.started = False
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
@@ -0,0 +1,290 @@
+"""
+Metrics Exporter Module
+Serves balancer and processor metrics over HTTP in OpenMetrics text format
+"""
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+from .monitor import SystemMonitor
+
+# (family name, type, help, [(sample suffix, labels, value)])
+MetricFamily = Tuple[str, str, str, List[Tuple[str, Dict[str, str], float]]]
+
+
+class MetricsExporter:
+    """
+    HTTP endpoint for Prometheus / OpenMetrics scrapers
+    
+    A background thread collects a snapshot every refresh_interval
+    seconds and renders it once; scrapes are answered from that cached
+    text, so scraping costs the same however often it happens and never
+    touches processor locks. Collection itself reads the monitor's
+    running aggregates and processor counters without taking processor
+    locks either.
+    
+    Exported metrics (prefix "loadbalancer" by default):
+    - System state: average/min/max load, load spread, queued tasks
+    - Per processor (label processor): load, queue length, busy flag,
+      speed, queued work, completed tasks, processing time
+    - Balancer: assigned tasks, rebalances, migrations, plus work
+      stealing, overflow queue and domain counters when enabled
+    - Latency summaries (p50/p90/p99/p99.9) for queue wait, service
+      time and end-to-end latency
+    
+    Clients that accept application/openmetrics-text get OpenMetrics
+    1.0.0; others get the Prometheus 0.0.4 text format.
+    """
+    
+    OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+    PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+    
+    # Optional LoadBalancer.get_statistics keys -> (metric, type, help)
+    BALANCER_EXTRAS = {
+        'steal_attempts': ('steal_attempts', 'counter', "Work stealing attempts"),
+        'successful_steals': ('successful_steals', 'counter', "Work stealing attempts that moved tasks"),
+        'tasks_stolen': ('tasks_stolen', 'counter', "Tasks moved by work stealing"),
+        'overflow_depth': ('overflow_queued_tasks', 'gauge', "Tasks waiting in the overflow queue"),
+        'overflow_enqueued': ('overflow_enqueued_tasks', 'counter', "Tasks that entered the overflow queue"),
+        'overflow_rejected': ('overflow_rejected_tasks', 'counter', "Tasks rejected by a full overflow queue"),
+        'average_queueing_delay': ('overflow_average_delay_seconds', 'gauge',
+                                   "Average time tasks spent in the overflow queue"),
+        'max_queueing_delay': ('overflow_max_delay_seconds', 'gauge',
+                               "Longest time a task spent in the overflow queue"),
+        'domain_count': ('domains', 'gauge', "Number of processor domains"),
+        'intra_domain_migrations': ('intra_domain_migrations', 'counter', "Tasks migrated inside a domain"),
+        'cross_domain_migrations': ('cross_domain_migrations', 'counter', "Tasks migrated across domains"),
+    }
+    
+    # Monitor latency summaries -> (metric, help)
+    LATENCY_SUMMARIES = {
+        'queue_wait': ('task_queue_wait_seconds', "Time tasks waited in a processor queue"),
+        'service_time': ('task_service_time_seconds', "Time tasks spent running"),
+        'end_to_end': ('task_latency_seconds', "Time from enqueue to completion"),
+    }
+    
+    def __init__(self, monitor: SystemMonitor, load_balancer=None, host='127.0.0.1', port=9100,
+                 refresh_interval=1.0, prefix='loadbalancer'):
+        """
+        Initialize exporter
+        
+        Args:
+            monitor: System monitor (system state, loads, latency histograms)
+            load_balancer: Load balancer for balancer statistics (optional)
+            host: Interface to listen on ("0.0.0.0" to accept remote scrapers)
+            port: Port to listen on (0 picks a free one; see address)
+            refresh_interval: Seconds between snapshots
+            prefix: Prefix of every metric name
+        """
+        self.monitor = monitor
+        self.load_balancer = load_balancer
+        self.host = host
+        self.port = port
+        self.refresh_interval = refresh_interval
+        self.prefix = prefix
+        self._snapshot = (b"", b"")  # (OpenMetrics, Prometheus text), swapped whole
+        self._stop = threading.Event()
+        self.server = None
+        self._threads = []
+    
+    @property
+    def address(self) -> Tuple[str, int]:
+        """(host, port) the endpoint listens on"""
+        return self.server.server_address[:2]
+    
+    def collect(self) -> List[MetricFamily]:
+        """
+        Gather the current metrics
+        
+        Returns:
+            List of metric families
+        """
+        state = self.monitor.get_system_state()
+        families = [
+            self._gauge('average_load_percent', "Average processor load", state['average_load']),
+            self._gauge('max_load_percent', "Highest processor load", state['max_load']),
+            self._gauge('min_load_percent', "Lowest processor load", state['min_load']),
+            self._gauge('load_spread_percent', "Highest minus lowest processor load", state['load_variance']),
+            self._gauge('queued_tasks', "Tasks queued on all processors", state['total_queue_length']),
+            self._gauge('processors', "Number of processors", state['processor_count']),
+            self._gauge('rebalance_threshold_ratio', "Load spread that triggers rebalancing",
+                        self.monitor.rebalance_threshold),
+        ]
+        
+        # Loads and queue lengths from the monitor's aggregates; the rest are
+        # plain attribute reads, so no processor lock is taken
+        processors = self.monitor.processors
+        loads = self.monitor.get_loads()
+        queue_lengths = self.monitor.get_queue_lengths()
+        labels = [{'processor': str(p.processor_id)} for p in processors]
+        families.extend([
+            self._per_processor('processor_load_percent', 'gauge', "Processor load", labels, loads),
+            self._per_processor('processor_queue_length', 'gauge', "Tasks queued on the processor",
+                                labels, queue_lengths),
+            self._per_processor('processor_busy', 'gauge', "1 while the processor runs a task",
+                                labels, [int(p.is_processing) for p in processors]),
+            self._per_processor('processor_speed', 'gauge', "Relative processor speed",
+                                labels, [p.speed for p in processors]),
+            self._per_processor('processor_queued_work_seconds', 'gauge',
+                                "Estimated cost of the queued tasks (seconds at speed 1.0)",
+                                labels, [p.queued_work for p in processors]),
+            self._per_processor('processor_tasks_completed', 'counter', "Tasks completed by the processor",
+                                labels, [p.total_tasks_completed for p in processors]),
+            self._per_processor('processor_processing_time_seconds', 'counter',
+                                "Time the processor spent running tasks",
+                                labels, [p.total_processing_time for p in processors]),
+        ])
+        
+        if self.load_balancer is not None:
+            stats = self.load_balancer.get_statistics()
+            families.extend([
+                self._counter('tasks_assigned', "Tasks assigned to processors", stats['total_tasks_assigned']),
+                self._counter('rebalances', "Rebalancing rounds that migrated tasks", stats['rebalance_count']),
+                self._counter('migrations', "Tasks migrated by rebalancing", stats['migration_count']),
+                (self._name('policy_info'), 'gauge', "Scheduling policy in use",
+                 [('', {'policy': stats['policy']}, 1)]),
+            ])
+            for key, (name, metric_type, help_text) in self.BALANCER_EXTRAS.items():
+                if key in stats:
+                    families.append((self._name(name), metric_type, help_text,
+                                     [('_total' if metric_type == 'counter' else '', {}, stats[key])]))
+        
+        latency = self.monitor.get_latency_stats()
+        for key, (name, help_text) in self.LATENCY_SUMMARIES.items():
+            summary = latency[key]
+            samples = [('', {'quantile': quantile}, summary[field])
+                       for quantile, field in (('0.5', 'p50'), ('0.9', 'p90'), ('0.99', 'p99'), ('0.999', 'p999'))]
+            samples.append(('_count', {}, summary['count']))
+            samples.append(('_sum', {}, summary['mean'] * summary['count']))
+            families.append((self._name(name), 'summary', help_text, samples))
+        return families
+    
+    def render(self, families: List[MetricFamily], openmetrics=True) -> bytes:
+        """
+        Render metric families as exposition text
+        
+        Args:
+            families: Output of collect()
+            openmetrics: OpenMetrics 1.0.0 if True, else Prometheus 0.0.4 text
+        
+        Returns:
+            UTF-8 encoded exposition
+        """
+        lines = []
+        for name, metric_type, help_text, samples in families:
+            # Prometheus text names counter families after their _total sample
+            family = name if openmetrics or metric_type != 'counter' else name + '_total'
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} {metric_type}")
+            for suffix, labels, value in samples:
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        if openmetrics:
+            lines.append("# EOF")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+    
+    def refresh(self):
+        """Collect and render a new snapshot"""
+        families = self.collect()
+        self._snapshot = (self.render(families, openmetrics=True), self.render(families, openmetrics=False))
+    
+    def get_snapshot(self, openmetrics=True) -> bytes:
+        """Get the cached exposition text"""
+        return self._snapshot[0 if openmetrics else 1]
+    
+    def start(self):
+        """
+        Take the first snapshot and start the refresh and HTTP threads
+        
+        Raises:
+            OSError: The address could not be bound (e.g. the port is taken)
+        """
+        if self.server is not None:
+            return
+        self.refresh()
+        self._stop.clear()
+        self.server = ThreadingHTTPServer((self.host, self.port), _handler_for(self))
+        self.server.daemon_threads = True
+        self._threads = [
+            threading.Thread(target=self._refresh_loop, daemon=True, name="metrics-refresh"),
+            threading.Thread(target=self.server.serve_forever, daemon=True, name="metrics-http"),
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def stop(self):
+        """Stop serving"""
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+    
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+    
+    def _name(self, name: str) -> str:
+        return f"{self.prefix}_{name}"
+    
+    def _gauge(self, name: str, help_text: str, value) -> MetricFamily:
+        return self._name(name), 'gauge', help_text, [('', {}, value)]
+    
+    def _counter(self, name: str, help_text: str, value) -> MetricFamily:
+        return self._name(name), 'counter', help_text, [('_total', {}, value)]
+    
+    def _per_processor(self, name: str, metric_type: str, help_text: str,
+                       labels: List[Dict[str, str]], values: List) -> MetricFamily:
+        suffix = '_total' if metric_type == 'counter' else ''
+        return self._name(name), metric_type, help_text, [(suffix, l, v) for l, v in zip(labels, values)]
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value) -> str:
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, int):
+        return str(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _handler_for(exporter: MetricsExporter):
+    """Request handler class bound to an exporter"""
+    
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                self.send_error(404)
+                return
+            openmetrics = 'application/openmetrics-text' in self.headers.get('Accept', '')
+            body = exporter.get_snapshot(openmetrics)
+            self.send_response(200)
+            self.send_header('Content-Type', exporter.OPENMETRICS_CONTENT_TYPE if openmetrics
+                             else exporter.PROMETHEUS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def log_message(self, format, *args):
+            pass  # Scrapes are too frequent to log
+    
+    return MetricsHandler
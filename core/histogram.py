@@ -0,0 +1,125 @@
+"""
+Histogram Module
+Constant-memory, log-bucketed latency histograms
+"""
+
+import math
+from typing import Dict
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram for latency values (seconds)
+    
+    Every power of two between min_value and max_value is split into
+    sub_buckets equal-ratio buckets, so memory is fixed no matter how
+    many values are recorded and any percentile is reported within a
+    relative error of about 2 ** (1 / sub_buckets) - 1 (~4.4% with 16).
+    
+    Values below min_value land in the first bucket, values above
+    max_value in the last; exact min, max and mean are kept separately.
+    """
+    
+    PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+    
+    def __init__(self, min_value=1e-6, max_value=1e4, sub_buckets=16):
+        """
+        Initialize histogram
+        
+        Args:
+            min_value: Smallest value resolved (seconds)
+            max_value: Largest value resolved (seconds)
+            sub_buckets: Buckets per power of two (precision)
+        """
+        self.min_value = min_value
+        self.max_value = max_value
+        self.sub_buckets = sub_buckets
+        self._scale = sub_buckets / math.log(2)  # log(v / min) -> bucket offset
+        self._bucket_count = int(math.ceil(math.log2(max_value / min_value) * sub_buckets)) + 2
+        self.counts = [0] * self._bucket_count
+        
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+    
+    def record(self, value: float):
+        """
+        Record one value
+        
+        Args:
+            value: Latency in seconds (negative values are clamped to 0)
+        """
+        if value <= self.min_value:
+            index = 0
+            value = max(value, 0.0)
+        else:
+            index = min(int(math.log(value / self.min_value) * self._scale) + 1,
+                        self._bucket_count - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+    
+    def merge(self, other: 'LatencyHistogram'):
+        """
+        Add another histogram's values into this one
+        
+        Args:
+            other: Histogram with the same bucket layout
+        """
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def _bucket_value(self, index: int) -> float:
+        """Representative value of a bucket (geometric midpoint, clamped to min/max)"""
+        if index == 0:
+            return self.min
+        value = self.min_value * math.exp((index - 0.5) / self._scale)
+        return min(max(value, self.min), self.max)
+    
+    def percentile(self, percent: float) -> float:
+        """
+        Get the value below which the given percentage of values fall
+        
+        Args:
+            percent: Percentile in [0, 100], e.g. 99.9
+        
+        Returns:
+            Estimated value in seconds (0.0 if nothing was recorded)
+        """
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(self.count * percent / 100.0)))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self._bucket_value(index)
+        return self.max
+    
+    def get_summary(self) -> Dict:
+        """
+        Get count, mean, min, max and the standard percentiles
+        
+        Returns:
+            Dictionary with keys count, mean, min, max, p50, p90, p99, p999
+        """
+        summary = {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max
+        }
+        for percent in self.PERCENTILES:
+            key = 'p' + f"{percent:g}".replace('.', '')
+            summary[key] = self.percentile(percent)
+        return summary
@@ -3,27 +3,128 @@ Load Balancer Module
 Implements the core load balancing algorithm
 """
 
-from typing import List, Optional
+import heapq
+from threading import Lock
+from typing import Iterable, List, Optional, Tuple
 from .processor import Processor
 from .monitor import SystemMonitor
+from .policies import SchedulingPolicy, LeastLoadedPolicy, HierarchicalPolicy
+from .domains import ProcessorDomains
+from .admission import AdmissionQueue
+from .migration import MigrationPlanner
 
 
 class Task:
     """
     Represents a task to be processed
     
-    A task is a unit of work that needs to be executed by a processor
+    A task is a unit of work that needs to be executed by a processor.
+    It optionally carries a callable to run; tasks without one are
+    simulated by the processor. Callers can register callbacks that run
+    once the task completes.
     """
     
-    def __init__(self, task_id):
+    # Shared by all tasks - completion is rare enough that one lock is cheaper
+    # than a lock per task
+    _completion_lock = Lock()
+    
+    def __init__(self, task_id, func=None, args=(), kwargs=None, service_time=None,
+                 estimated_cost=None):
         """
         Initialize a task
         
         Args:
             task_id: Unique identifier for this task
+            func: Callable to execute (must be picklable for process execution)
+            args: Positional arguments for func
+            kwargs: Keyword arguments for func
+            service_time: How long a simulated task takes (seconds), e.g. from
+                          a workload generator or trace; None uses the
+                          processor's default
+            estimated_cost: Expected cost (seconds at speed 1.0) used for load
+                            and placement; defaults to service_time
         """
         self.task_id = task_id
+        self.func = func
+        self.args = tuple(args)
+        self.kwargs = kwargs or {}
+        self.service_time = service_time
+        self.estimated_cost = estimated_cost
         self.assigned_processor = None  # Will be set when assigned
+        
+        # Lifecycle timestamps (processor clock), used for latency tracing
+        self.enqueued_at = None  # First queued (overflow queue or processor)
+        self.started_at = None
+        self.finished_at = None
+        self.migrated_at = None  # Last moved between processors
+        self.migration_count = 0
+        
+        self.result = None  # Set when the task completes
+        self.error = None  # Exception raised by func, if any
+        self.done = False
+        self._done_callbacks = []
+    
+    def record_migration(self, timestamp):
+        """
+        Note that the task was moved to another processor
+        
+        Args:
+            timestamp: Time of the move
+        """
+        self.migrated_at = timestamp
+        self.migration_count += 1
+    
+    def execute(self):
+        """
+        Run the task's callable in the current process
+        
+        Returns:
+            Whatever func returns
+        """
+        return self.func(*self.args, **self.kwargs)
+    
+    def add_done_callback(self, callback):
+        """
+        Run a callback when the task completes
+        
+        The callback runs on the thread that completes the task, or
+        immediately if the task is already done.
+        
+        Args:
+            callback: Function called as callback(task)
+        """
+        with Task._completion_lock:
+            if not self.done:
+                self._done_callbacks.append(callback)
+                return
+        callback(self)
+    
+    def set_result(self, result):
+        """
+        Mark the task as completed and run its done callbacks
+        
+        Args:
+            result: Value produced by the task
+        """
+        self._complete(result, None)
+    
+    def set_exception(self, error):
+        """
+        Mark the task as failed and run its done callbacks
+        
+        Args:
+            error: Exception raised while executing the task
+        """
+        self._complete(None, error)
+    
+    def _complete(self, result, error):
+        with Task._completion_lock:
+            self.result = result
+            self.error = error
+            self.done = True
+            callbacks, self._done_callbacks = self._done_callbacks, []
+        for callback in callbacks:
+            callback(self)
     
     def __str__(self):
         return f"Task {self.task_id}"
@@ -33,21 +134,46 @@ class LoadBalancer:
     """
     Dynamic load balancer that distributes tasks across processors
     
-    Algorithm: "Least Loaded First"
-    - Always assigns new tasks to the processor with minimum load
+    Algorithm: "Least Loaded First" by default
+    - Assigns new tasks to the processor chosen by the scheduling policy
+      (the processor with minimum load unless another policy is given)
     - Periodically rebalances by moving tasks from overloaded to underloaded processors
     """
     
-    def __init__(self, processors: List[Processor], monitor: SystemMonitor):
+    def __init__(self, processors: List[Processor], monitor: SystemMonitor,
+                 rebalance_on_assign=False, work_stealer=None,
+                 policy: Optional[SchedulingPolicy] = None, overflow_queue_size=0,
+                 domains: Optional[ProcessorDomains] = None):
         """
         Initialize load balancer
         
         Args:
             processors: List of all available processors
             monitor: System monitor for tracking processor states
+            rebalance_on_assign: Check for imbalance after every assignment
+                                 instead of waiting for the periodic poll
+            work_stealer: Optional WorkStealer that idle processors use
+                          to pull work from busy peers
+            policy: Scheduling policy for new tasks (default: LeastLoadedPolicy)
+            overflow_queue_size: Capacity of the central admission queue used
+                                 by submit/try_submit when every processor is
+                                 full (0 disables it)
+            domains: Processor domains for two-level balancing; rebalancing
+                     then stays inside domains unless their loads diverge,
+                     and the default policy becomes HierarchicalPolicy
         """
         self.processors = processors
         self.monitor = monitor
+        self.rebalance_on_assign = rebalance_on_assign
+        self.work_stealer = work_stealer
+        self.domains = domains
+        if policy is None:
+            policy = HierarchicalPolicy(domains) if domains is not None else LeastLoadedPolicy()
+        self.policy = policy
+        self.policy.bind(processors, monitor)
+        self.overflow = AdmissionQueue(overflow_queue_size) if overflow_queue_size > 0 else None
+        self.migration_planner = MigrationPlanner(processors, monitor)
+        self.verbose = True  # Print a line per rebalance (the simulator turns this off)
         
         # Statistics
         self.total_tasks_assigned = 0
@@ -58,8 +184,8 @@ class LoadBalancer:
         """
         Assign a task to the most suitable processor
         
-        Uses "Least Loaded First" strategy:
-        1. Find processor with minimum load
+        1. Ask the scheduling policy for a target processor
+           ("Least Loaded First" by default)
         2. Assign task to that processor
         
         Args:
@@ -68,17 +194,227 @@ class LoadBalancer:
         Returns:
             True if task was assigned, False otherwise
         """
-        # Find processor with least load
-        least_loaded = self.monitor.get_least_loaded_processor()
+        # Let the policy pick the target processor
+        target = self.policy.select(task)
+        if target is None:
+            return False
         
         # Try to add task to that processor
-        if least_loaded.add_task(task):
-            task.assigned_processor = least_loaded
+        if target.add_task(task):
+            task.assigned_processor = target
             self.total_tasks_assigned += 1
+            if self.rebalance_on_assign:
+                self.rebalance_loads()  # Imbalance detection is O(1)
             return True
         
         return False
     
+    def try_submit(self, task: Task) -> bool:
+        """
+        Submit a task without blocking
+        
+        Places the task on a processor, or parks it in the admission
+        queue if every processor is full. Tasks already waiting there go
+        first, so a new task never overtakes them.
+        
+        Args:
+            task: Task to submit
+            
+        Returns:
+            True if the task was placed or queued, False if it was rejected
+        """
+        if self.overflow is None:
+            return self.assign_task(task)
+        if len(self.overflow) == 0 and self.assign_task(task):
+            return True
+        queued = self.overflow.try_put(task)
+        self.drain_overflow()  # Capacity may have freed up meanwhile
+        return queued
+    
+    def submit(self, task: Task, timeout: Optional[float] = None) -> bool:
+        """
+        Submit a task, blocking while the admission queue is full
+        
+        Args:
+            task: Task to submit
+            timeout: Maximum seconds to wait for admission (None waits forever)
+            
+        Returns:
+            True if the task was placed or queued, False on timeout
+        """
+        if self.overflow is None:
+            return self.assign_task(task)
+        if len(self.overflow) == 0 and self.assign_task(task):
+            return True
+        queued = self.overflow.put(task, timeout)
+        self.drain_overflow()
+        return queued
+    
+    def drain_overflow(self) -> List[Tuple[Task, Processor]]:
+        """
+        Move waiting tasks from the admission queue onto processors
+        
+        Called by whatever drives the processors (simulator, workers)
+        whenever a processor takes a task off its queue and frees a slot.
+        Stops at the first task that cannot be placed, keeping FIFO order.
+        
+        Returns:
+            List of (task, processor) placements made
+        """
+        if self.overflow is None or len(self.overflow) == 0:
+            return []
+        
+        placements = []
+        admitted = []
+        while True:
+            batch = self.overflow.pop_batch(max(1, len(self.processors)))
+            if not batch:
+                break
+            for index, entry in enumerate(batch):
+                task = entry[0]
+                if not self.assign_task(task):
+                    self.overflow.push_front(batch[index:])
+                    self.overflow.record_admitted(admitted)
+                    return placements
+                placements.append((task, task.assigned_processor))
+                admitted.append(entry)
+        
+        self.overflow.record_admitted(admitted)
+        return placements
+    
+    def assign_tasks(self, tasks: Iterable[Task]) -> Tuple[List[Tuple[Task, Processor]], List[Task]]:
+        """
+        Assign a batch of tasks in one pass using water-filling
+        
+        Takes a single snapshot of every processor's expected completion
+        time, free slots and the time one more task of this batch adds
+        there, raises a common "water level" (a completion time) until the
+        batch fits, so the processors that finish first are topped up
+        first and a 2x faster processor ends up with about twice the
+        tasks, then enqueues each processor's share with a single
+        add_tasks call.
+        
+        Args:
+            tasks: Tasks to assign
+            
+        Returns:
+            Tuple (placements, rejected) where placements is a list of
+            (task, processor) pairs and rejected lists tasks that did not fit
+        """
+        tasks = list(tasks)
+        if not tasks:
+            return [], []
+        
+        # Average cost of the batch; tasks without an estimate cost each
+        # processor its own default_task_cost
+        explicit_cost = 0.0
+        unestimated = 0
+        for task in tasks:
+            if task.estimated_cost is not None:
+                explicit_cost += task.estimated_cost
+            elif task.service_time is not None:
+                explicit_cost += task.service_time
+            else:
+                unestimated += 1
+        
+        completion_times, slot_times, free_slots = [], [], []
+        for processor in self.processors:
+            with processor.lock:
+                completion_times.append(processor.get_expected_completion_time())
+                cost = (explicit_cost + unestimated * processor.default_task_cost) / len(tasks)
+                slot_times.append(cost / processor.speed)
+                free_slots.append(max(0, processor.max_queue_size - len(processor.task_queue)))
+        shares = self._water_fill(completion_times, slot_times, free_slots, len(tasks))
+        
+        placements = []
+        rejected = []
+        next_task = 0
+        for processor, share in zip(self.processors, shares):
+            if share == 0:
+                continue
+            chunk = tasks[next_task:next_task + share]
+            next_task += share
+            added = processor.add_tasks(chunk)
+            for task in chunk[:added]:
+                task.assigned_processor = processor
+                placements.append((task, processor))
+            rejected.extend(chunk[added:])  # Queue filled up since the snapshot
+        rejected.extend(tasks[next_task:])
+        
+        self.total_tasks_assigned += len(placements)
+        if placements and self.rebalance_on_assign:
+            self.rebalance_loads()
+        return placements, rejected
+    
+    def _water_fill(self, completion_times: List[float], slot_times: List[float],
+                    free_slots: List[int], count: int) -> List[int]:
+        """
+        Compute how many of count new tasks each processor should get
+        
+        The level is a completion time: filling processor i to level L
+        gives it min(floor((L - completion_i) / slot_i), free_i) new tasks.
+        Finds the highest L whose fill uses at most count tasks, then hands
+        out the remainder one at a time to the processor whose next slot
+        completes earliest.
+        
+        Args:
+            completion_times: Expected completion time per processor (seconds)
+            slot_times: Time one more task adds on each processor (seconds)
+            free_slots: Free queue slots per processor
+            count: Number of tasks to place
+            
+        Returns:
+            Number of tasks for each processor, in list order
+        """
+        def shares_at(level):
+            # Small epsilon so levels that land exactly on a slot boundary count it
+            return [min(max(0, int((level - done) / slot + 1e-9)), free) if slot > 0
+                    else (free if level >= done else 0)
+                    for done, slot, free in zip(completion_times, slot_times, free_slots)]
+        
+        # Binary search for the highest level that does not overflow the batch
+        if not completion_times:
+            return []
+        low = min(completion_times)
+        high = max(done + free * slot
+                   for done, slot, free in zip(completion_times, slot_times, free_slots))
+        for _ in range(60):
+            mid = (low + high) / 2
+            if sum(shares_at(mid)) <= count:
+                low = mid
+            else:
+                high = mid
+        
+        shares = shares_at(low)
+        remainder = count - sum(shares)
+        # Next slot of each processor that has room, earliest completion first
+        candidates = [(done + (share + 1) * slot, i)
+                      for i, (done, slot, free, share)
+                      in enumerate(zip(completion_times, slot_times, free_slots, shares))
+                      if share < free]
+        heapq.heapify(candidates)
+        while remainder > 0 and candidates:
+            _, i = heapq.heappop(candidates)
+            shares[i] += 1
+            remainder -= 1
+            if shares[i] < free_slots[i]:
+                heapq.heappush(candidates, (completion_times[i] + (shares[i] + 1) * slot_times[i], i))
+        return shares
+    
+    def steal_for(self, processor: Processor) -> int:
+        """
+        Let an idle processor steal work from a busy peer
+        
+        Args:
+            processor: Processor that ran out of work
+            
+        Returns:
+            Number of tasks stolen (0 if work stealing is disabled)
+        """
+        if self.work_stealer is None:
+            return 0
+        return self.work_stealer.steal(processor)
+    
     def rebalance_loads(self):
         """
         Rebalance loads by migrating tasks from overloaded to underloaded processors
@@ -86,54 +422,34 @@ class LoadBalancer:
         Process:
         1. Identify overloaded processors (>70% load)
         2. Identify underloaded processors (<40% load)
-        3. Migrate tasks from overloaded to underloaded processors
+        3. Plan the fewest moves that even out expected completion times
+        4. Move each planned batch from the source's queue tail in one step
+        
+        With domains, steps 1-4 run inside each domain, and tasks cross
+        domains only when domain average loads differ by more than the
+        domains' cross_domain_threshold.
         """
         if not self.monitor.detect_imbalance():
             return  # No need to rebalance
         
-        # Get overloaded and underloaded processors
-        overloaded = self.monitor.get_overloaded_processors(threshold=70.0)
-        underloaded = self.monitor.get_underloaded_processors(threshold=40.0)
-        
-        if not overloaded or not underloaded:
-            return  # Cannot rebalance
-        
-        migrations = 0
-        
-        # Migrate tasks from overloaded to underloaded processors
-        for overloaded_proc in overloaded:
-            if not underloaded:
-                break
+        if self.domains is not None:
+            migrations = self.domains.rebalance()
+        else:
+            # O(1) check from the monitor's running counts before scanning
+            if (self.monitor.count_overloaded(70.0) == 0
+                    or self.monitor.count_underloaded(40.0) == 0):
+                return  # Cannot rebalance
             
-            # Calculate how many tasks to migrate (half of queue)
-            queue_length = overloaded_proc.get_queue_length()
-            tasks_to_migrate = max(1, queue_length // 2)
-            
-            for _ in range(tasks_to_migrate):
-                if not underloaded:
-                    break
-                
-                # Get a task from overloaded processor
-                task = overloaded_proc.get_next_task()
-                if task is None:
-                    break
-                
-                # Find least loaded underloaded processor
-                target = min(underloaded, key=lambda p: p.get_current_load())
-                
-                # Migrate task
-                if target.add_task(task):
-                    task.assigned_processor = target
-                    migrations += 1
-                    self.migration_count += 1
-                    
-                    # Update underloaded list if target is no longer underloaded
-                    if target.get_current_load() > 40.0:
-                        underloaded = [p for p in underloaded if p != target]
+            # Plan all moves from one snapshot, then apply them pair by pair
+            plan = self.migration_planner.plan()
+            migrations = self.migration_planner.execute(plan)
+        
+        self.migration_count += migrations
         
         if migrations > 0:
             self.rebalance_count += 1
-            print(f"[REBALANCING] Migrated {migrations} tasks")
+            if self.verbose:
+                print(f"[REBALANCING] Migrated {migrations} tasks")
     
     def adaptive_threshold_adjustment(self):
         """
@@ -154,10 +470,18 @@ class LoadBalancer:
         Returns:
             Dictionary with statistics
         """
-        return {
+        stats = {
             'total_tasks_assigned': self.total_tasks_assigned,
             'rebalance_count': self.rebalance_count,
             'migration_count': self.migration_count,
-            'processor_count': len(self.processors)
+            'processor_count': len(self.processors),
+            'policy': self.policy.name
         }
+        if self.work_stealer is not None:
+            stats.update(self.work_stealer.get_statistics())
+        if self.overflow is not None:
+            stats.update(self.overflow.get_statistics())
+        if self.domains is not None:
+            stats.update(self.domains.get_statistics())
+        return stats
 
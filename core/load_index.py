@@ -0,0 +1,209 @@
+"""
+Load Index Module
+Keeps processors ordered by load so min/max lookups do not scan the list
+"""
+
+from threading import Lock
+from typing import List, Optional
+from .processor import Processor
+
+
+class IndexedHeap:
+    """
+    Binary min-heap whose entries can be re-prioritized in place
+    
+    Every entry is addressed by a key, and the heap remembers where each
+    key lives, so changing the priority of one entry costs O(log N)
+    instead of rebuilding the heap.
+    """
+    
+    def __init__(self):
+        """Initialize an empty heap"""
+        self._keys = []  # Heap-ordered list of keys
+        self._priority = {}  # key -> priority
+        self._position = {}  # key -> index in self._keys
+    
+    def __len__(self):
+        return len(self._keys)
+    
+    def __contains__(self, key):
+        return key in self._position
+    
+    def push(self, key, priority):
+        """
+        Insert a key, or update its priority if it is already present
+        
+        Args:
+            key: Hashable key addressing the entry
+            priority: Comparable priority (smallest is on top)
+        """
+        if key in self._position:
+            self.update(key, priority)
+            return
+        self._priority[key] = priority
+        self._position[key] = len(self._keys)
+        self._keys.append(key)
+        self._sift_up(len(self._keys) - 1)
+    
+    def update(self, key, priority):
+        """
+        Change the priority of an existing key
+        
+        Args:
+            key: Key of the entry to update
+            priority: New priority
+        """
+        old_priority = self._priority[key]
+        self._priority[key] = priority
+        index = self._position[key]
+        if priority < old_priority:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+    
+    def remove(self, key):
+        """Remove a key from the heap"""
+        index = self._position.pop(key)
+        del self._priority[key]
+        last = self._keys.pop()
+        if index < len(self._keys):
+            self._keys[index] = last
+            self._position[last] = index
+            self._sift_up(index)
+            self._sift_down(self._position[last])
+    
+    def peek(self):
+        """
+        Get the key with the smallest priority
+        
+        Returns:
+            Key on top of the heap, or None if the heap is empty
+        """
+        return self._keys[0] if self._keys else None
+    
+    def _sift_up(self, index):
+        keys = self._keys
+        priority = self._priority
+        position = self._position
+        key = keys[index]
+        key_priority = priority[key]
+        while index > 0:
+            parent = (index - 1) >> 1
+            parent_key = keys[parent]
+            if priority[parent_key] <= key_priority:
+                break
+            keys[index] = parent_key
+            position[parent_key] = index
+            index = parent
+        keys[index] = key
+        position[key] = index
+    
+    def _sift_down(self, index):
+        keys = self._keys
+        priority = self._priority
+        position = self._position
+        size = len(keys)
+        key = keys[index]
+        key_priority = priority[key]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            right = child + 1
+            if right < size and priority[keys[right]] < priority[keys[child]]:
+                child = right
+            child_key = keys[child]
+            if key_priority <= priority[child_key]:
+                break
+            keys[index] = child_key
+            position[child_key] = index
+            index = child
+        keys[index] = key
+        position[key] = index
+
+
+class LoadIndex:
+    """
+    Min/max index over processor loads
+    
+    Holds two addressable heaps (one ordered by load, one by negated load)
+    that are updated from Processor load listeners, so:
+    - Least/most loaded lookups cost O(1)
+    - Each load change costs O(log N)
+    - Lookups never take processor locks
+    
+    Ties are broken by position in the processor list, matching the
+    behaviour of a linear min()/max() scan.
+    
+    By default processors are ordered by current_load; pass a different
+    key (e.g. queue length) to index another per-processor value.
+    """
+    
+    def __init__(self, processors: List[Processor], key=None):
+        """
+        Initialize load index
+        
+        Args:
+            processors: List of processors to index
+            key: Function mapping a processor to the value to order by,
+                 called with the processor lock held (default: current_load)
+        """
+        self.key = key or (lambda processor: processor.current_load)
+        self.processors = list(processors)
+        self.lock = Lock()
+        self._min_heap = IndexedHeap()
+        self._max_heap = IndexedHeap()
+        self._loads = {}  # position -> last indexed load
+        self._positions = {}  # id(processor) -> position in the list
+        
+        for position, processor in enumerate(self.processors):
+            self._positions[id(processor)] = position
+            with processor.lock:
+                load = self.key(processor)
+            self._loads[position] = load
+            self._min_heap.push(position, (load, position))
+            self._max_heap.push(position, (-load, position))
+    
+    def update(self, processor: Processor):
+        """
+        Re-index a processor after its load changed
+        
+        Called from Processor._update_load with the processor lock held,
+        so it reads the key directly.
+        
+        Args:
+            processor: Processor whose load changed
+        """
+        position = self._positions[id(processor)]
+        load = self.key(processor)
+        with self.lock:
+            if self._loads[position] == load:
+                return
+            self._loads[position] = load
+            self._min_heap.update(position, (load, position))
+            self._max_heap.update(position, (-load, position))
+    
+    def get_least_loaded(self) -> Optional[Processor]:
+        """Get the processor with the lowest load"""
+        with self.lock:
+            position = self._min_heap.peek()
+        return None if position is None else self.processors[position]
+    
+    def get_most_loaded(self) -> Optional[Processor]:
+        """Get the processor with the highest load"""
+        with self.lock:
+            position = self._max_heap.peek()
+        return None if position is None else self.processors[position]
+    
+    def get_load_range(self):
+        """
+        Get the lowest and highest indexed load
+        
+        Returns:
+            Tuple (min_load, max_load), or (0.0, 0.0) if there are no processors
+        """
+        with self.lock:
+            if not self._loads:
+                return 0.0, 0.0
+            return (self._loads[self._min_heap.peek()],
+                    self._loads[self._max_heap.peek()])
@@ -0,0 +1,160 @@
+"""
+Load Models Module
+Pluggable ways of turning a processor's state into a load percentage
+"""
+
+
+class LoadModel:
+    """
+    Base class for load models
+    
+    A load model maps a processor's state to a load in [0, 100].
+    Processor._update_load calls compute() with the processor lock held
+    whenever the queue or running task changes, so it must be cheap and
+    must not take other locks. Processors with a full queue report 100%
+    without consulting the model.
+    """
+    
+    name = 'base'
+    
+    def compute(self, processor) -> float:
+        """
+        Compute a processor's load
+        
+        Args:
+            processor: Processor to evaluate (its lock is held)
+        
+        Returns:
+            Load percentage (0-100)
+        """
+        raise NotImplementedError
+
+
+class QueueHeuristicLoadModel(LoadModel):
+    """
+    The original queue-length heuristic
+    
+    Load = (Queue Factor × 50%) + (Processing Factor × 50%), where one or
+    two queued tasks count 25% each and longer queues count their share
+    of max_queue_size. The mapping is not monotonic (two queued tasks
+    give 50%, three give 15%) and ignores task sizes.
+    """
+    
+    name = 'queue_heuristic'
+    
+    def compute(self, processor) -> float:
+        # The queue counts in baseline-speed tasks (queue length / speed)
+        queue_length = len(processor.task_queue) / processor.speed
+        
+        # Queue factor: based on how full the queue is
+        # Use a more sensitive calculation for better visibility
+        if queue_length == 0:
+            queue_factor = 0
+        elif queue_length <= 2:
+            # For small queues, show more load (better visibility)
+            queue_factor = min(queue_length * 25, 50)  # 25% per task up to 50%
+        else:
+            # For larger queues, use percentage of max
+            queue_factor = min(queue_length / processor.max_queue_size, 1.0) * 50
+        
+        # Processing factor: 50% if processing, 0% if idle
+        processing_factor = 50 if processor.is_processing else 0
+        
+        # Total load (capped at 100%)
+        return min(queue_factor + processing_factor, 100.0)
+
+
+class OutstandingWorkLoadModel(LoadModel):
+    """
+    Load from the expected time to finish all outstanding work
+    
+    Outstanding work is the estimated cost of every queued task plus the
+    remaining cost of the running one; dividing by speed gives the
+    expected completion time. Load is that time as a share of the
+    horizon, so it grows monotonically with work and a faster processor
+    shows less load for the same queue.
+    """
+    
+    name = 'outstanding_work'
+    
+    def __init__(self, horizon=None):
+        """
+        Initialize model
+        
+        Args:
+            horizon: Expected completion time (seconds) that counts as 100%;
+                     None uses a full baseline-speed processor:
+                     (max_queue_size + 1) x default_task_cost
+        """
+        self.horizon = horizon
+    
+    def compute(self, processor) -> float:
+        horizon = self.horizon
+        if horizon is None:
+            horizon = (processor.max_queue_size + 1) * processor.default_task_cost
+        if horizon <= 0:
+            return 100.0 if processor.task_queue or processor.is_processing else 0.0
+        return min(processor.get_expected_completion_time() / horizon * 100.0, 100.0)
+
+
+class MeasuredLoadModel(LoadModel):
+    """
+    Blend of a base model's load and the measured utilization of a core
+    
+    Load = (1 - weight) x base load + weight x core utilization, where
+    utilization comes from a CoreUtilizationSampler (core/affinity.py)
+    for the core the processor's worker is pinned to. A core kept busy
+    by other processes therefore looks loaded even while its queue is
+    empty, and placement moves away from it.
+    """
+    
+    name = 'measured'
+    
+    def __init__(self, sampler, core, base: LoadModel = None, weight=0.5):
+        """
+        Initialize model
+        
+        Args:
+            sampler: CoreUtilizationSampler providing per-core utilization
+            core: Core the processor runs on
+            base: Model for the queue-based part (default: OutstandingWorkLoadModel)
+            weight: Share of the load taken from measured utilization (0-1)
+        """
+        self.sampler = sampler
+        self.core = core
+        self.base = base or OutstandingWorkLoadModel()
+        self.weight = weight
+    
+    def compute(self, processor) -> float:
+        measured = self.sampler.get_utilization(self.core)
+        load = (1.0 - self.weight) * self.base.compute(processor) + self.weight * measured
+        return min(load, 100.0)
+
+
+# Model name -> class, for selecting a load model by name (e.g. from main.py)
+LOAD_MODELS = {
+    model.name: model
+    for model in (OutstandingWorkLoadModel, QueueHeuristicLoadModel, MeasuredLoadModel)
+}
+
+
+def create_load_model(name: str, **kwargs) -> LoadModel:
+    """
+    Create a load model by name
+    
+    Args:
+        name: One of the keys of LOAD_MODELS
+        **kwargs: Model-specific options (e.g. horizon=10.0 for outstanding_work,
+                  sampler and core for measured)
+    
+    Returns:
+        New load model instance
+    """
+    if name not in LOAD_MODELS:
+        raise ValueError(f"Unknown load model: {name} "
+                         f"(choose from {', '.join(LOAD_MODELS)})")
+    if name == MeasuredLoadModel.name and ('sampler' not in kwargs or 'core' not in kwargs):
+        raise ValueError("The measured load model needs sampler and core arguments; "
+                         "PinnedWorkerPool installs it on every processor when given a "
+                         "CoreUtilizationSampler (PIN_WORKERS in main.py)")
+    return LOAD_MODELS[name](**kwargs)
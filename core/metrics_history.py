@@ -0,0 +1,264 @@
+"""
+Metrics History Module
+Preallocated ring buffers with multi-resolution downsampling for system metrics
+"""
+
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+
+
+class MetricsRingBuffer:
+    """
+    Fixed-size, array-backed ring buffer of timestamped rows
+    
+    Every row is written twice, at i and i + capacity, so the most
+    recent rows always form one contiguous slice. Reads therefore return
+    NumPy views (no copying) no matter where the write position is.
+    """
+    
+    def __init__(self, columns: int, capacity: int):
+        """
+        Initialize ring buffer
+        
+        Args:
+            columns: Number of values per row
+            capacity: Maximum number of rows kept
+        """
+        self.capacity = capacity
+        self.timestamps = np.zeros(2 * capacity, dtype=np.float64)
+        self.values = np.zeros((2 * capacity, columns), dtype=np.float64)
+        self.head = 0  # Next write position in [0, capacity)
+        self.size = 0
+    
+    def __len__(self):
+        return self.size
+    
+    def append(self, timestamp: float, row: Sequence[float]):
+        """
+        Add a row, overwriting the oldest one when full
+        
+        Args:
+            timestamp: Time of the row (must not decrease)
+            row: One value per column
+        """
+        head = self.head
+        self.timestamps[head] = self.timestamps[head + self.capacity] = timestamp
+        self.values[head] = self.values[head + self.capacity] = row
+        self.head = (head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+    
+    def window(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get all stored rows, oldest first
+        
+        Returns:
+            Tuple (timestamps, values) of views into the buffer
+        """
+        end = self.head + self.capacity if self.size == self.capacity else self.head
+        start = end - self.size
+        return self.timestamps[start:end], self.values[start:end]
+    
+    def latest(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get the most recent rows, oldest first
+        
+        Args:
+            count: Maximum number of rows
+        
+        Returns:
+            Tuple (timestamps, values) of views into the buffer
+        """
+        timestamps, values = self.window()
+        count = min(count, self.size)
+        return timestamps[self.size - count:], values[self.size - count:]
+    
+    def range(self, start_time: float, end_time: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get rows with start_time <= timestamp <= end_time
+        
+        Returns:
+            Tuple (timestamps, values) of views into the buffer
+        """
+        timestamps, values = self.window()
+        first = np.searchsorted(timestamps, start_time, side='left')
+        last = np.searchsorted(timestamps, end_time, side='right')
+        return timestamps[first:last], values[first:last]
+
+
+class DownsampledTier:
+    """
+    Fixed-resolution summary of a metrics stream
+    
+    Samples falling in the same resolution-wide time bucket are folded
+    into one row holding mean, min and max of every field. Completed
+    buckets go into a ring buffer; the open bucket is kept as running
+    aggregates.
+    """
+    
+    def __init__(self, fields: Sequence[str], resolution: float, capacity: int):
+        """
+        Initialize tier
+        
+        Args:
+            fields: Names of the metric fields
+            resolution: Bucket width (seconds)
+            capacity: Number of buckets retained
+        """
+        self.fields = list(fields)
+        self.resolution = resolution
+        self.buffer = MetricsRingBuffer(3 * len(self.fields), capacity)  # mean, min, max per field
+        
+        self._bucket = None  # Index of the open bucket
+        self._sum = np.zeros(len(self.fields))
+        self._min = np.zeros(len(self.fields))
+        self._max = np.zeros(len(self.fields))
+        self._count = 0
+    
+    @property
+    def retention(self) -> float:
+        """Seconds of history this tier can hold"""
+        return self.resolution * self.buffer.capacity
+    
+    def add(self, timestamp: float, row: np.ndarray):
+        """
+        Fold one sample into the tier
+        
+        Args:
+            timestamp: Time of the sample
+            row: One value per field
+        """
+        bucket = int(timestamp // self.resolution)
+        if bucket != self._bucket:
+            self.flush()
+            self._bucket = bucket
+            self._sum[:] = row
+            self._min[:] = row
+            self._max[:] = row
+            self._count = 1
+            return
+        self._sum += row
+        np.minimum(self._min, row, out=self._min)
+        np.maximum(self._max, row, out=self._max)
+        self._count += 1
+    
+    def flush(self):
+        """Write the open bucket (if any) to the ring buffer"""
+        if self._count == 0:
+            return
+        summary = np.concatenate((self._sum / self._count, self._min, self._max))
+        self.buffer.append(self._bucket * self.resolution, summary)
+        self._count = 0
+    
+    def columns(self, values: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Split rows from this tier's buffer into named column views
+        
+        Returns:
+            Dictionary mapping "<field>", "<field>_min" and "<field>_max" to views
+        """
+        count = len(self.fields)
+        result = {}
+        for i, field in enumerate(self.fields):
+            result[field] = values[:, i]
+            result[f"{field}_min"] = values[:, count + i]
+            result[f"{field}_max"] = values[:, 2 * count + i]
+        return result
+
+
+class TieredMetricsHistory:
+    """
+    Bounded-memory metrics history at several resolutions
+    
+    - Raw: the last raw_capacity samples exactly as recorded
+    - Tiers: 1 s / 1 min / 1 h buckets with mean, min and max by default,
+      retaining 1 hour, 7 days and 1 year respectively
+    
+    Memory is fixed at construction time; recording is O(fields) with no
+    per-sample allocation of Python dicts or lists.
+    """
+    
+    DEFAULT_TIERS = ((1.0, 3600), (60.0, 7 * 24 * 60), (3600.0, 365 * 24))
+    
+    def __init__(self, fields: Sequence[str], raw_capacity=1000, tiers=DEFAULT_TIERS):
+        """
+        Initialize history
+        
+        Args:
+            fields: Names of the metric fields to store
+            raw_capacity: Number of raw samples retained
+            tiers: (resolution_seconds, bucket_count) pairs, finest first
+        """
+        self.fields = list(fields)
+        self.raw = MetricsRingBuffer(len(self.fields), raw_capacity)
+        self.tiers = [DownsampledTier(self.fields, resolution, capacity)
+                      for resolution, capacity in tiers]
+        self._row = np.zeros(len(self.fields))
+    
+    def record(self, timestamp: float, sample: Dict):
+        """
+        Record one sample
+        
+        Args:
+            timestamp: Time of the sample
+            sample: Dictionary with a value for every field
+        """
+        row = self._row
+        for i, field in enumerate(self.fields):
+            row[i] = sample[field]
+        self.raw.append(timestamp, row)
+        for tier in self.tiers:
+            tier.add(timestamp, row)
+    
+    def latest(self, count: int) -> List[Dict]:
+        """
+        Get the most recent raw samples as dictionaries (copies)
+        
+        Args:
+            count: Maximum number of samples
+        
+        Returns:
+            List of dictionaries with the fields plus 'timestamp', oldest first
+        """
+        timestamps, values = self.raw.latest(count)
+        samples = []
+        for timestamp, row in zip(timestamps.tolist(), values.tolist()):
+            sample = dict(zip(self.fields, row))
+            sample['timestamp'] = timestamp
+            samples.append(sample)
+        return samples
+    
+    def query(self, start_time: float, end_time: float, resolution: float = 0.0
+              ) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Get a time range at the finest resolution that still covers it
+        
+        Raw samples are used if they reach back to start_time and no
+        coarser resolution was asked for; otherwise the finest tier with
+        resolution >= the requested one whose retention covers the range.
+        Tiers only report completed buckets.
+        
+        Args:
+            start_time: Start of the range
+            end_time: End of the range
+            resolution: Minimum bucket width wanted (0 allows raw samples)
+        
+        Returns:
+            Tuple (timestamps, columns) of views; downsampled tiers also
+            provide "<field>_min" and "<field>_max" columns
+        """
+        raw_timestamps, raw_values = self.raw.window()
+        if resolution <= 0.0 and len(self.raw) and raw_timestamps[0] <= start_time:
+            timestamps, values = self.raw.range(start_time, end_time)
+            return timestamps, {field: values[:, i] for i, field in enumerate(self.fields)}
+        
+        candidates = [tier for tier in self.tiers if tier.resolution >= resolution]
+        tier = candidates[-1] if candidates else self.tiers[-1]
+        for candidate in candidates:
+            tier_timestamps, _ = candidate.buffer.window()
+            if len(candidate.buffer) and tier_timestamps[0] <= start_time:
+                tier = candidate
+                break
+        
+        timestamps, values = tier.buffer.range(start_time, end_time)
+        return timestamps, tier.columns(values)
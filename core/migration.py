@@ -0,0 +1,188 @@
+"""
+Migration Planner Module
+Computes and applies minimal task transfer plans for rebalancing
+"""
+
+import heapq
+from typing import Dict, List, Optional, Tuple
+from .processor import Processor
+
+
+def transfer_tasks(source: Processor, target: Processor, count: int) -> List:
+    """
+    Move up to count tasks from the tail of source's queue to target
+    
+    Local processors are locked together in processor_id order, so the
+    move is atomic and concurrent moves cannot deadlock. A remote source
+    (a cluster proxy) must first get the tasks back from its agent; that
+    network round trip runs with no lock held, and tasks the target can
+    no longer take afterwards are handed back to the source.
+    
+    Args:
+        source: Processor to take tasks from
+        target: Processor to give them to
+        count: Maximum number of tasks to move
+    
+    Returns:
+        The tasks moved, in queue order
+    """
+    if not source.remote:
+        first, second = sorted((source, target), key=lambda p: p.processor_id)
+        with first.lock, second.lock:
+            count = min(count, target.max_queue_size - len(target.task_queue))
+            if count <= 0:
+                return []
+            tasks = source.steal_tasks(count)
+            target.add_tasks(tasks)
+    else:
+        with target.lock:
+            count = min(count, target.max_queue_size - len(target.task_queue))
+        if count <= 0:
+            return []
+        tasks = source.steal_tasks(count)  # Waits for the agent, so no locks held
+        added = target.add_tasks(tasks)
+        tasks, rest = tasks[:added], tasks[added:]
+        if rest:
+            # The target filled up during the round trip
+            returned = source.add_tasks(rest)
+            for task in rest[returned:]:
+                task.set_exception(RuntimeError(
+                    f"No room for the task on processor {source.processor_id} or {target.processor_id}"))
+    
+    now = target.clock()
+    for task in tasks:
+        task.assigned_processor = target
+        task.record_migration(now)
+    return tasks
+
+
+class MigrationPlanner:
+    """
+    Plans rebalancing moves from one load snapshot, then applies them in bulk
+    
+    Planning:
+    - Snapshot every overloaded (source) and underloaded (target)
+      processor: expected completion time, queue length, free slots and
+      average queued task cost
+    - Greedily pair the source that finishes last with the target that
+      finishes first (a max-heap and a min-heap) and move just enough
+      tasks to even out their completion times
+    - Repeat until no move shortens the latest finisher
+    
+    Applying (transfer_tasks):
+    - Each (source, target) pair is locked once, in processor_id order
+      (the one order every planner and stealer uses, whatever list it
+      was given), so concurrent migrations and steals cannot deadlock
+    - Tasks come off the source's tail in one batch (the newest tasks,
+      so older tasks keep their place) and join the target in one batch
+    """
+    
+    def __init__(self, processors: List[Processor], monitor,
+                 overload_threshold=70.0, underload_threshold=40.0):
+        """
+        Initialize migration planner
+        
+        Args:
+            processors: All processors
+            monitor: System monitor (finds over/underloaded processors)
+            overload_threshold: Load above which a processor gives work away (%)
+            underload_threshold: Load below which a processor takes work (%)
+        """
+        self.processors = processors
+        self.monitor = monitor
+        self.overload_threshold = overload_threshold
+        self.underload_threshold = underload_threshold
+        self._positions = {id(p): i for i, p in enumerate(processors)}
+    
+    def plan(self, sources: Optional[List[Processor]] = None,
+             targets: Optional[List[Processor]] = None) -> List[Tuple[Processor, Processor, int]]:
+        """
+        Compute a transfer plan from the current state
+        
+        Args:
+            sources: Processors that give work away (default: the monitor's
+                     processors above overload_threshold)
+            targets: Processors that take work (default: the monitor's
+                     processors below underload_threshold)
+        
+        Returns:
+            List of (source, target, task_count) transfers, one per pair
+        """
+        if sources is None:
+            sources = self.monitor.get_overloaded_processors(self.overload_threshold)
+        if targets is None:
+            targets = self.monitor.get_underloaded_processors(self.underload_threshold)
+        if not sources or not targets:
+            return []
+        
+        # Snapshot: position -> [queued tasks, average task cost] / free slots
+        source_heap = []
+        source_state = {}
+        for processor in sources:
+            with processor.lock:
+                queued = len(processor.task_queue)
+                if queued == 0:
+                    continue
+                position = self._positions[id(processor)]
+                source_state[position] = [queued, processor.queued_work / queued]
+                source_heap.append((-processor.get_expected_completion_time(), position, processor))
+        
+        target_heap = []
+        target_free = {}
+        for processor in targets:
+            with processor.lock:
+                free = processor.max_queue_size - len(processor.task_queue)
+                if free <= 0:
+                    continue
+                position = self._positions[id(processor)]
+                target_free[position] = free
+                target_heap.append((processor.get_expected_completion_time(), position, processor))
+        
+        heapq.heapify(source_heap)
+        heapq.heapify(target_heap)
+        
+        transfers: Dict[Tuple[int, int], int] = {}
+        while source_heap and target_heap:
+            neg_source_time, source_pos, source = heapq.heappop(source_heap)
+            target_time, target_pos, target = heapq.heappop(target_heap)
+            source_time = -neg_source_time
+            queued, cost = source_state[source_pos]
+            
+            # Tasks that even out the two completion times
+            per_task = cost / source.speed + cost / target.speed
+            gap = source_time - target_time
+            count = int(gap / per_task) if per_task > 0 else queued
+            count = min(count, queued, target_free[target_pos])
+            if count <= 0:
+                break  # The widest gap cannot be narrowed by a move
+            
+            key = (source_pos, target_pos)
+            transfers[key] = transfers.get(key, 0) + count
+            
+            source_state[source_pos][0] -= count
+            target_free[target_pos] -= count
+            if source_state[source_pos][0] > 0:
+                heapq.heappush(source_heap, (-(source_time - count * cost / source.speed), source_pos, source))
+            if target_free[target_pos] > 0:
+                heapq.heappush(target_heap, (target_time + count * cost / target.speed, target_pos, target))
+        
+        return [(self.processors[s], self.processors[t], count)
+                for (s, t), count in transfers.items()]
+    
+    def execute(self, plan: List[Tuple[Processor, Processor, int]]) -> int:
+        """
+        Apply a transfer plan
+        
+        Queues may have changed since planning, so each transfer moves at
+        most what the source still has and the target can still take.
+        
+        Args:
+            plan: Transfers from plan()
+        
+        Returns:
+            Number of tasks migrated
+        """
+        migrated = 0
+        for source, target, count in plan:
+            migrated += len(transfer_tasks(source, target, count))
+        return migrated
@@ -4,8 +4,13 @@ Monitors system state and detects when rebalancing is needed
 """
 
 import time
+from threading import Lock
 from typing import List, Dict
 from .processor import Processor
+from .load_index import LoadIndex
+from .state_table import ProcessorStateTable
+from .histogram import LatencyHistogram
+from .metrics_history import TieredMetricsHistory
 
 
 class SystemMonitor:
@@ -19,30 +24,176 @@ class SystemMonitor:
     - Identify overloaded and underloaded processors
     """
     
-    def __init__(self, processors: List[Processor], rebalance_threshold=0.3):
+    # Load thresholds with running counts, so the checks made by
+    # detect_imbalance and rebalance_loads are O(1)
+    OVERLOAD_ALERT_THRESHOLD = 80.0
+    TRACKED_OVERLOAD_THRESHOLDS = (70.0, OVERLOAD_ALERT_THRESHOLD)
+    TRACKED_UNDERLOAD_THRESHOLDS = (40.0,)
+    
+    # System state fields kept by record_metrics
+    HISTORY_FIELDS = ('average_load', 'max_load', 'min_load', 'load_variance',
+                      'total_queue_length')
+    
+    def __init__(self, processors: List[Processor], rebalance_threshold=0.3,
+                 use_state_table=False, history_capacity=1000, state_table=None,
+                 track_history=True, track_latency=True):
         """
         Initialize system monitor
         
         Args:
             processors: List of all processors to monitor
             rebalance_threshold: Load variance threshold for rebalancing (0.3 = 30%)
+            use_state_table: Mirror processor state into NumPy arrays and
+                             answer state snapshots and the threshold filters
+                             with vectorized operations
+            history_capacity: Number of raw metrics samples retained (older
+                              history is kept downsampled)
+            state_table: Existing state table to use instead of creating one
+                         (e.g. a SharedStateTable visible to worker processes);
+                         implies use_state_table. System state, threshold
+                         counts and filters then cover every active row,
+                         including rows other processes publish
+            track_history: Keep a metrics history for record_metrics (False
+                           saves its preallocated buffers, e.g. for monitors
+                           of processor subsets)
+            track_latency: Keep system-wide latency histograms (False
+                           computes get_latency_stats from the processors'
+                           own histograms on demand instead)
         """
         self.processors = processors
         self.rebalance_threshold = rebalance_threshold
-        self.metrics_history = []  # Store historical metrics
+        self.metrics_history = (TieredMetricsHistory(self.HISTORY_FIELDS, history_capacity)
+                                if track_history else None)
+        self.clock = time.time  # Timestamp source (the simulator installs its virtual clock)
+        self.lock = Lock()  # Guards the running aggregates
+        
+        # Running aggregates, updated by deltas from processor load listeners
+        self._positions = {}  # id(processor) -> position in the list
+        self._last_load = []  # Last seen load per processor
+        self._last_queue_length = []  # Last seen queue length per processor
+        self._load_sum = 0.0
+        self._queue_length_sum = 0
+        self._over_counts = {t: 0 for t in self.TRACKED_OVERLOAD_THRESHOLDS}
+        self._under_counts = {t: 0 for t in self.TRACKED_UNDERLOAD_THRESHOLDS}
+        
+        # Min/max index kept current by processor load listeners
+        self.load_index = LoadIndex(processors)
+        for position, processor in enumerate(processors):
+            with processor.lock:
+                self._positions[id(processor)] = position
+                # Start from an idle processor and fold in its real state
+                self._last_load.append(0.0)
+                self._last_queue_length.append(0)
+                for threshold in self._under_counts:
+                    self._under_counts[threshold] += 0.0 < threshold
+                self._apply_delta(position, processor.current_load, len(processor.task_queue))
+                processor.add_load_listener(self._on_load_update)
+        
+        # System-wide latency distributions, fed by processor completion listeners
+        self.latency_lock = Lock()
+        self.queue_wait_histogram = None
+        self.service_time_histogram = None
+        self.latency_histogram = None
+        if track_latency:
+            self.queue_wait_histogram = LatencyHistogram()
+            self.service_time_histogram = LatencyHistogram()
+            self.latency_histogram = LatencyHistogram()
+            for processor in processors:
+                processor.add_completion_listener(self._on_task_completed)
+        
+        # Queue-length index, built on first use by get_shortest_queue_processor
+        self.queue_index = None
+        
+        # Optional structure-of-arrays copy of processor state
+        self._owns_state_table = state_table is None and use_state_table
+        if self._owns_state_table:
+            state_table = ProcessorStateTable(processors)
+        self.state_table = state_table
+    
+    def _on_load_update(self, processor: Processor):
+        """Processor load listener - keeps the load index and aggregates current"""
+        self.load_index.update(processor)
+        if self.queue_index is not None:
+            self.queue_index.update(processor)
+        position = self._positions[id(processor)]
+        with self.lock:
+            self._apply_delta(position, processor.current_load, len(processor.task_queue))
+    
+    def _on_task_completed(self, processor: Processor, task):
+        """Processor completion listener - records system-wide latencies"""
+        if task.started_at is None:
+            return
+        with self.latency_lock:
+            self.service_time_histogram.record(task.finished_at - task.started_at)
+            if task.enqueued_at is not None:
+                self.queue_wait_histogram.record(task.started_at - task.enqueued_at)
+                self.latency_histogram.record(task.finished_at - task.enqueued_at)
+    
+    def get_latency_stats(self, processor: Processor = None) -> Dict:
+        """
+        Get queue wait, service time and end-to-end latency percentiles
+        
+        Args:
+            processor: Report a single processor instead of the whole system
+            
+        Returns:
+            Dictionary with 'queue_wait', 'service_time' and 'end_to_end'
+            summaries (count, mean, min, max, p50, p90, p99, p999 in seconds)
+        """
+        if processor is not None:
+            return processor.get_latency_stats()
+        if self.latency_histogram is None:
+            return self._merge_processor_latencies()
+        with self.latency_lock:
+            return {
+                'queue_wait': self.queue_wait_histogram.get_summary(),
+                'service_time': self.service_time_histogram.get_summary(),
+                'end_to_end': self.latency_histogram.get_summary()
+            }
+    
+    def _merge_processor_latencies(self) -> Dict:
+        """Combine the processors' own latency histograms (when not tracked here)"""
+        queue_wait, service_time, end_to_end = LatencyHistogram(), LatencyHistogram(), LatencyHistogram()
+        for processor in self.processors:
+            with processor.lock:
+                queue_wait.merge(processor.queue_wait_histogram)
+                service_time.merge(processor.service_time_histogram)
+                end_to_end.merge(processor.latency_histogram)
+        return {
+            'queue_wait': queue_wait.get_summary(),
+            'service_time': service_time.get_summary(),
+            'end_to_end': end_to_end.get_summary()
+        }
+    
+    def _apply_delta(self, position, load, queue_length):
+        """Fold one processor's new load and queue length into the running aggregates"""
+        old_load = self._last_load[position]
+        self._last_load[position] = load
+        self._load_sum += load - old_load
+        self._queue_length_sum += queue_length - self._last_queue_length[position]
+        self._last_queue_length[position] = queue_length
+        
+        for threshold in self._over_counts:
+            self._over_counts[threshold] += (load > threshold) - (old_load > threshold)
+        for threshold in self._under_counts:
+            self._under_counts[threshold] += (load < threshold) - (old_load < threshold)
     
     def get_system_state(self) -> Dict:
         """
         Get current state of the entire system
         
+        Built from the running aggregates and the load index, so this is
+        O(1) and takes no processor locks. With a state table it is
+        computed from the table's arrays instead.
+        
         Returns:
             Dictionary with system-wide metrics
         """
-        # Get metrics from all processors
-        processor_loads = [p.get_current_load() for p in self.processors]
-        queue_lengths = [p.get_queue_length() for p in self.processors]
+        if self.state_table is not None:
+            return self.state_table.get_system_state(self.clock())
         
-        if not processor_loads:
+        count = len(self._last_load)
+        if count == 0:
             return {
                 'average_load': 0.0,
                 'max_load': 0.0,
@@ -50,30 +201,70 @@ class SystemMonitor:
                 'load_variance': 0.0,
                 'total_queue_length': 0,
                 'processor_count': 0,
-                'timestamp': time.time()
+                'timestamp': self.clock()
             }
         
-        # Calculate metrics
-        average_load = sum(processor_loads) / len(processor_loads)
-        max_load = max(processor_loads)
-        min_load = min(processor_loads)
-        load_variance = max_load - min_load
-        total_queue_length = sum(queue_lengths)
+        with self.lock:
+            # Clamp float drift from the running sum
+            average_load = max(self._load_sum / count, 0.0)
+            min_load, max_load = self.load_index.get_load_range()
+            total_queue_length = self._queue_length_sum
         
         return {
             'average_load': average_load,
             'max_load': max_load,
             'min_load': min_load,
-            'load_variance': load_variance,
+            'load_variance': max_load - min_load,
             'total_queue_length': total_queue_length,
-            'processor_count': len(self.processors),
-            'timestamp': time.time()
+            'processor_count': count,
+            'timestamp': self.clock()
         }
     
+    def get_average_load(self) -> float:
+        """
+        Get the average processor load from the running aggregates (O(1))
+        
+        Returns:
+            Average load (%)
+        """
+        if self.state_table is not None:
+            return self.state_table.get_system_state(self.clock())['average_load']
+        count = len(self._last_load)
+        if count == 0:
+            return 0.0
+        with self.lock:
+            return max(self._load_sum / count, 0.0)
+    
+    def get_queue_lengths(self) -> List[int]:
+        """
+        Snapshot of every processor's queue length, in list order
+        
+        Copied from the running aggregates, so no processor locks are taken
+        
+        Returns:
+            List of queue lengths
+        """
+        with self.lock:
+            return list(self._last_queue_length)
+    
+    def get_loads(self) -> List[float]:
+        """
+        Snapshot of every processor's load, in list order
+        
+        Copied from the running aggregates, so no processor locks are taken
+        
+        Returns:
+            List of loads (%)
+        """
+        with self.lock:
+            return list(self._last_load)
+    
     def detect_imbalance(self) -> bool:
         """
         Detect if system load is imbalanced and needs rebalancing
         
+        O(1) - cheap enough to run after every assignment
+        
         Returns:
             True if rebalancing is needed, False otherwise
         """
@@ -86,66 +277,158 @@ class SystemMonitor:
             return True
         
         # Also check if any processor is overloaded (>80%)
-        for processor in self.processors:
-            if processor.get_current_load() > 80.0:
-                return True
+        return self.count_overloaded(self.OVERLOAD_ALERT_THRESHOLD) > 0
+    
+    def count_overloaded(self, threshold=70.0) -> int:
+        """
+        Count processors above the load threshold
         
-        return False
+        O(1) for tracked thresholds, a scan otherwise (vectorized over
+        the state table when there is one)
+        
+        Args:
+            threshold: Load threshold (default 70%)
+        """
+        if self.state_table is not None:
+            return int(self.state_table.rows_above(threshold).size)
+        if threshold in self._over_counts:
+            return self._over_counts[threshold]
+        return sum(1 for load in self._last_load if load > threshold)
+    
+    def count_underloaded(self, threshold=40.0) -> int:
+        """
+        Count processors below the load threshold
+        
+        O(1) for tracked thresholds, a scan otherwise (vectorized over
+        the state table when there is one)
+        
+        Args:
+            threshold: Load threshold (default 40%)
+        """
+        if self.state_table is not None:
+            return int(self.state_table.rows_below(threshold).size)
+        if threshold in self._under_counts:
+            return self._under_counts[threshold]
+        return sum(1 for load in self._last_load if load < threshold)
     
     def get_least_loaded_processor(self) -> Processor:
         """
         Get the processor with the lowest current load
         
+        Uses the load index, so this is O(1) and takes no processor locks
+        
         Returns:
             Processor with minimum load
         """
-        return min(self.processors, key=lambda p: p.get_current_load())
+        return self.load_index.get_least_loaded()
     
     def get_most_loaded_processor(self) -> Processor:
         """
         Get the processor with the highest current load
         
+        Uses the load index, so this is O(1) and takes no processor locks
+        
         Returns:
             Processor with maximum load
         """
-        return max(self.processors, key=lambda p: p.get_current_load())
+        return self.load_index.get_most_loaded()
+    
+    def get_shortest_queue_processor(self) -> Processor:
+        """
+        Get the processor with the fewest queued tasks
+        
+        The queue-length index is only maintained once this has been
+        called, so monitors that never need it pay nothing for it.
+        
+        Returns:
+            Processor with the shortest queue
+        """
+        if self.queue_index is None:
+            self.queue_index = LoadIndex(self.processors, key=lambda p: len(p.task_queue))
+            # Catch up on changes made while the index was being built
+            for processor in self.processors:
+                with processor.lock:
+                    self.queue_index.update(processor)
+        return self.queue_index.get_least_loaded()
     
     def get_overloaded_processors(self, threshold=70.0) -> List[Processor]:
         """
         Get list of processors that exceed the load threshold
         
+        With a state table, rows published by other processes are
+        included when a local handle is bound to them.
+        
         Args:
             threshold: Load threshold (default 70%)
             
         Returns:
             List of overloaded processors
         """
+        if self.state_table is not None:
+            return self.state_table.processors_at(self.state_table.rows_above(threshold))
+        if self.count_overloaded(threshold) == 0:
+            return []
         return [p for p in self.processors if p.get_current_load() > threshold]
     
     def get_underloaded_processors(self, threshold=40.0) -> List[Processor]:
         """
         Get list of processors below the load threshold
         
+        With a state table, rows published by other processes are
+        included when a local handle is bound to them.
+        
         Args:
             threshold: Load threshold (default 40%)
             
         Returns:
             List of underloaded processors
         """
+        if self.state_table is not None:
+            return self.state_table.processors_at(self.state_table.rows_below(threshold))
+        if self.count_underloaded(threshold) == 0:
+            return []
         return [p for p in self.processors if p.get_current_load() < threshold]
     
     def record_metrics(self):
         """Record current system state to history"""
+        if self.metrics_history is None:
+            return
         state = self.get_system_state()
-        self.metrics_history.append(state)
+        self.metrics_history.record(state['timestamp'], state)
+    
+    def get_metrics_history(self, count=100) -> List[Dict]:
+        """
+        Get the most recent recorded metrics
         
-        # Keep only last 100 records to prevent memory issues
-        if len(self.metrics_history) > 100:
-            self.metrics_history.pop(0)
+        Args:
+            count: Maximum number of records
+        
+        Returns:
+            List of system state dictionaries, oldest first
+        """
+        if self.metrics_history is None:
+            return []
+        return self.metrics_history.latest(count)
     
-    def get_metrics_history(self) -> List[Dict]:
-        """Get historical metrics"""
-        return self.metrics_history
+    def get_metrics_range(self, start_time: float, end_time: float, resolution=0.0):
+        """
+        Get recorded metrics for a time range without copying
+        
+        Recent ranges come from the raw samples; older ones from the
+        1 s / 1 min / 1 h downsampled tiers (which add "<field>_min" and
+        "<field>_max" columns).
+        
+        Args:
+            start_time: Start of the range
+            end_time: End of the range
+            resolution: Minimum bucket width wanted (seconds, 0 for raw)
+        
+        Returns:
+            Tuple (timestamps, columns) of NumPy views
+        """
+        if self.metrics_history is None:
+            raise RuntimeError("This monitor keeps no metrics history (track_history=False)")
+        return self.metrics_history.query(start_time, end_time, resolution)
     
     def get_all_metrics(self) -> List[Dict]:
         """
@@ -172,4 +455,19 @@ class SystemMonitor:
         else:
             # Normal load: default threshold
             self.rebalance_threshold = 0.3
+    
+    def detach(self):
+        """
+        Stop listening to the processors
+        
+        For a monitor that is discarded while its processors live on (e.g.
+        a fresh monitor per test over long-lived proxies); otherwise every
+        load update keeps feeding the old monitor's aggregates. The
+        monitor's lookups are stale afterwards.
+        """
+        for processor in self.processors:
+            processor.remove_load_listener(self._on_load_update)
+            processor.remove_completion_listener(self._on_task_completed)
+            if self._owns_state_table:
+                processor.remove_load_listener(self.state_table.write)
 
@@ -0,0 +1,211 @@
+"""
+Scheduling Policies Module
+Pluggable strategies for choosing which processor receives a new task
+"""
+
+import itertools
+import math
+import random
+from typing import List, Optional
+from .processor import Processor
+from .monitor import SystemMonitor
+from .domains import ProcessorDomains
+
+
+class SchedulingPolicy:
+    """
+    Base class for task placement policies
+    
+    A policy is bound to the processors and monitor once, then asked
+    for a target processor for every new task. Policies differ in how
+    much global state they read:
+    - least_loaded / join_shortest_queue: global minimum (index lookup)
+    - hierarchical: least loaded domain, then its least loaded processor
+    - power_of_d: d random samples, no global state
+    - round_robin / random: no load information at all
+    """
+    
+    name = 'base'
+    
+    def __init__(self):
+        self.processors = []
+        self.monitor = None
+    
+    def bind(self, processors: List[Processor], monitor: SystemMonitor):
+        """
+        Attach the policy to the processors it chooses from
+        
+        Args:
+            processors: List of all processors
+            monitor: System monitor for the processors
+        """
+        self.processors = processors
+        self.monitor = monitor
+    
+    def select(self, task) -> Optional[Processor]:
+        """
+        Choose the processor for a task
+        
+        Args:
+            task: Task being assigned
+        
+        Returns:
+            Target processor, or None if there is no processor
+        """
+        raise NotImplementedError
+
+
+class LeastLoadedPolicy(SchedulingPolicy):
+    """Least Loaded First - the processor with minimum load (O(1) via the load index)"""
+    
+    name = 'least_loaded'
+    
+    def select(self, task) -> Optional[Processor]:
+        return self.monitor.get_least_loaded_processor()
+
+
+class RoundRobinPolicy(SchedulingPolicy):
+    """Cycle through processors in order, ignoring load"""
+    
+    name = 'round_robin'
+    
+    def __init__(self):
+        super().__init__()
+        self._counter = itertools.count()  # next() is atomic under the GIL
+    
+    def select(self, task) -> Optional[Processor]:
+        if not self.processors:
+            return None
+        return self.processors[next(self._counter) % len(self.processors)]
+
+
+class RandomPolicy(SchedulingPolicy):
+    """Pick a processor uniformly at random"""
+    
+    name = 'random'
+    
+    def __init__(self, seed=None):
+        super().__init__()
+        self.random = random.Random(seed)
+    
+    def select(self, task) -> Optional[Processor]:
+        if not self.processors:
+            return None
+        return self.random.choice(self.processors)
+
+
+class PowerOfDChoicesPolicy(SchedulingPolicy):
+    """
+    Sample d processors at random and pick the least loaded of them
+    
+    With d=2 this keeps the maximum load close to least-loaded-first
+    while reading only two processors, and concurrent submitters no
+    longer herd onto the same global minimum.
+    """
+    
+    name = 'power_of_d'
+    
+    def __init__(self, d=2, seed=None):
+        super().__init__()
+        self.d = d
+        self.random = random.Random(seed)
+    
+    def select(self, task) -> Optional[Processor]:
+        if not self.processors:
+            return None
+        sample_size = min(self.d, len(self.processors))
+        candidates = self.random.sample(self.processors, sample_size)
+        return min(candidates, key=lambda p: p.get_current_load())
+
+
+class JoinShortestQueuePolicy(SchedulingPolicy):
+    """Join the processor with the fewest queued tasks (O(1) via a queue-length index)"""
+    
+    name = 'join_shortest_queue'
+    
+    def select(self, task) -> Optional[Processor]:
+        if not self.processors:
+            return None
+        return self.monitor.get_shortest_queue_processor()
+
+
+class LeastExpectedWorkPolicy(SchedulingPolicy):
+    """
+    Pick the processor that would start the task soonest
+    
+    Expected work is the estimated cost of the queued tasks plus what is
+    left of the running one, divided by the processor's speed. This is a
+    full scan, so it is the most expensive built-in policy.
+    """
+    
+    name = 'least_expected_work'
+    
+    def select(self, task) -> Optional[Processor]:
+        if not self.processors:
+            return None
+        return min(self.processors, key=lambda p: p.get_expected_completion_time())
+
+
+class HierarchicalPolicy(SchedulingPolicy):
+    """
+    Two-level placement: the least loaded domain, then its least loaded processor
+    
+    Both steps are index lookups (domain average loads, then the domain's
+    load index), so placement cost does not grow with the processor count.
+    """
+    
+    name = 'hierarchical'
+    
+    def __init__(self, domains: Optional[ProcessorDomains] = None, domain_size=None):
+        """
+        Initialize policy
+        
+        Args:
+            domains: Processor domains to place into (shared with the
+                     LoadBalancer for hierarchical rebalancing)
+            domain_size: Processors per domain when domains is None
+                         (default: about the square root of the processor count)
+        """
+        super().__init__()
+        self.domains = domains
+        self.domain_size = domain_size
+    
+    def bind(self, processors: List[Processor], monitor: SystemMonitor):
+        super().bind(processors, monitor)
+        if self.domains is None and processors:
+            domain_size = self.domain_size or max(math.isqrt(len(processors)), 1)
+            self.domains = ProcessorDomains.partition(processors, domain_size)
+    
+    def select(self, task) -> Optional[Processor]:
+        if self.domains is None:
+            return None
+        domain = self.domains.get_least_loaded_domain()
+        if domain is None:
+            return None
+        return domain.monitor.get_least_loaded_processor()
+
+
+# Policy name -> class, for selecting a policy by name (e.g. from main.py)
+POLICIES = {
+    policy.name: policy
+    for policy in (LeastLoadedPolicy, RoundRobinPolicy, RandomPolicy,
+                   PowerOfDChoicesPolicy, JoinShortestQueuePolicy,
+                   LeastExpectedWorkPolicy, HierarchicalPolicy)
+}
+
+
+def create_policy(name: str, **kwargs) -> SchedulingPolicy:
+    """
+    Create a scheduling policy by name
+    
+    Args:
+        name: One of the keys of POLICIES
+        **kwargs: Policy-specific options (e.g. d=3 for power_of_d)
+    
+    Returns:
+        New, unbound policy instance
+    """
+    if name not in POLICIES:
+        raise ValueError(f"Unknown scheduling policy: {name} "
+                         f"(choose from {', '.join(POLICIES)})")
+    return POLICIES[name](**kwargs)
@@ -5,7 +5,9 @@ Represents a single processor that can process tasks
 
 import time
 from collections import deque
-from threading import RLock  # Reentrant lock for nested calls
+from threading import RLock, Condition  # Reentrant lock for nested calls
+from .histogram import LatencyHistogram
+from .load_models import LoadModel, OutstandingWorkLoadModel
 
 
 class Processor:
@@ -17,26 +19,59 @@ class Processor:
     - Processes tasks one at a time
     - Tracks its current load (0-100%)
     - Maintains statistics about completed tasks
+    
+    Processors may differ: speed scales how fast tasks run (2.0 finishes
+    a task in half the time) and max_queue_size is the capacity.
+    
+    The processor tracks its outstanding work (estimated cost of queued
+    tasks plus what is left of the running one) and a load model turns
+    that into current_load. The default model uses the expected
+    completion time, so a faster processor looks less loaded with the
+    same queue and gets more work.
     """
     
-    def __init__(self, processor_id, max_queue_size=10):
+    def __init__(self, processor_id, max_queue_size=10, speed=1.0,
+                 load_model: LoadModel = None, default_task_cost=0.5):
         """
         Initialize a processor
         
         Args:
             processor_id: Unique identifier for this processor
-            max_queue_size: Maximum number of tasks in queue
+            max_queue_size: Maximum number of tasks in queue (capacity)
+            speed: Relative processing speed (1.0 = baseline)
+            load_model: How load is computed (default: OutstandingWorkLoadModel)
+            default_task_cost: Cost (seconds at speed 1.0) assumed for tasks
+                               without an estimated_cost or service_time
         """
+        if speed <= 0:
+            raise ValueError("speed must be positive")
         self.processor_id = processor_id
         self.max_queue_size = max_queue_size
+        self.speed = speed
+        self.load_model = load_model or OutstandingWorkLoadModel()
+        self.default_task_cost = default_task_cost
+        self.queued_work = 0.0  # Estimated cost of queued tasks (seconds at speed 1.0)
+        self._running_cost = 0.0  # Estimated cost of the running task
         self.task_queue = deque()  # Queue of tasks
         self.current_load = 0.0  # Current load percentage (0-100)
         self.is_processing = False  # Whether currently processing a task
+        self.current_task = None  # Task being processed, if any
+        self.executor = None  # Optional concurrent.futures executor for task callables
+        self.remote = False  # True if steal_tasks waits on another process (see migration.transfer_tasks)
         self.lock = RLock()  # Reentrant lock for nested calls (thread safety)
+        self.work_available = Condition(self.lock)  # Signalled when tasks are queued
+        self._load_listeners = []  # Callbacks notified after every load update
+        self._completion_listeners = []  # Callbacks notified when a task completes
+        self.clock = time.time  # Time source for task timestamps (the simulator swaps in virtual time)
         
         # Statistics
         self.total_tasks_completed = 0
         self.total_processing_time = 0.0
+        
+        # Latency distributions (seconds) of tasks completed here
+        self.queue_wait_histogram = LatencyHistogram()
+        self.service_time_histogram = LatencyHistogram()
+        self.latency_histogram = LatencyHistogram()  # End-to-end: enqueue to finish
     
     def add_task(self, task):
         """
@@ -50,11 +85,42 @@ class Processor:
         """
         with self.lock:
             if len(self.task_queue) < self.max_queue_size:
+                if task.enqueued_at is None:
+                    task.enqueued_at = self.clock()
                 self.task_queue.append(task)
+                self.queued_work += self.task_cost(task)
                 self._update_load()
+                self.work_available.notify()
                 return True
             return False
     
+    def add_tasks(self, tasks):
+        """
+        Add several tasks to this processor's queue with one load update
+        
+        One lock acquisition, one load update and one notify for the whole
+        batch, however many tasks it holds.
+        
+        Args:
+            tasks: List of Task objects to add, in order
+            
+        Returns:
+            Number of tasks added (a prefix of tasks; the rest did not fit)
+        """
+        with self.lock:
+            count = min(len(tasks), self.max_queue_size - len(self.task_queue))
+            if count <= 0:
+                return 0
+            now = self.clock()
+            for task in tasks[:count]:
+                if task.enqueued_at is None:
+                    task.enqueued_at = now
+                self.queued_work += self.task_cost(task)
+            self.task_queue.extend(tasks[:count])
+            self._update_load()
+            self.work_available.notify()
+            return count
+    
     def get_next_task(self):
         """
         Get and remove the next task from queue
@@ -65,64 +131,290 @@ class Processor:
         with self.lock:
             if self.task_queue:
                 task = self.task_queue.popleft()
+                self._remove_work((task,))
                 self._update_load()
                 return task
             return None
     
+    def drain_tasks(self, max_count=None):
+        """
+        Remove up to max_count tasks from the head of the queue with one load update
+        
+        Args:
+            max_count: Maximum number of tasks to take (None takes all)
+            
+        Returns:
+            List of tasks, oldest first
+        """
+        with self.lock:
+            count = len(self.task_queue) if max_count is None else min(max_count, len(self.task_queue))
+            if count <= 0:
+                return []
+            popleft = self.task_queue.popleft
+            tasks = [popleft() for _ in range(count)]
+            self._remove_work(tasks)
+            self._update_load()
+            return tasks
+    
+    def steal_tasks(self, max_count):
+        """
+        Remove up to max_count tasks from the tail of the queue with one load update
+        
+        The tail holds the newest tasks, which are the furthest from
+        running here, so they are the cheapest to hand to another processor.
+        
+        Args:
+            max_count: Maximum number of tasks to take
+            
+        Returns:
+            List of tasks, oldest first
+        """
+        with self.lock:
+            count = min(max_count, len(self.task_queue))
+            if count <= 0:
+                return []
+            pop = self.task_queue.pop
+            tasks = [pop() for _ in range(count)]
+            tasks.reverse()
+            self._remove_work(tasks)
+            self._update_load()
+            return tasks
+    
+    def remove_tasks(self, tasks):
+        """
+        Remove specific tasks from the queue with one load update
+        
+        Tasks that are no longer queued (already started or moved) are skipped.
+        
+        Args:
+            tasks: Tasks to remove
+            
+        Returns:
+            List of the removed tasks, in queue order
+        """
+        with self.lock:
+            wanted = {id(task) for task in tasks}
+            removed = [task for task in self.task_queue if id(task) in wanted]
+            if not removed:
+                return []
+            kept = [task for task in self.task_queue if id(task) not in wanted]
+            self.task_queue.clear()
+            self.task_queue.extend(kept)
+            self._remove_work(removed)
+            self._update_load()
+            return removed
+    
+    def wait_for_work(self, timeout=None):
+        """
+        Block until a task is queued, wake_workers is called or timeout expires
+        
+        Args:
+            timeout: Maximum seconds to wait (None waits until notified)
+            
+        Returns:
+            True if there is queued work
+        """
+        with self.lock:
+            if not self.task_queue:
+                self.work_available.wait(timeout)
+            return bool(self.task_queue)
+    
+    def wake_workers(self):
+        """Wake every thread blocked in wait_for_work (e.g. for shutdown)"""
+        with self.lock:
+            self.work_available.notify_all()
+    
     def process_task(self, processing_time=0.5):
         """
-        Process a task (simulated) - Optimized to reduce lock contention
+        Process a task - Optimized to reduce lock contention
+        
+        Tasks with a callable are executed for real, on this processor's
+        executor if one is attached (e.g. a dedicated worker process) or
+        in the calling thread otherwise. Tasks without one are simulated.
         
         Args:
-            processing_time: How long to process the task (seconds)
+            processing_time: How long to process a simulated task at speed 1.0
+                             (seconds), unless the task carries its own service_time
         """
-        task = self.get_next_task()
+        task = self.start_task()
         if task is None:
             return None
+        return self.run_task(task, processing_time)
+    
+    def run_task(self, task, processing_time=0.5):
+        """
+        Run a task already taken off the queue by start_task, then finish it
         
+        Lets a worker act on the freed queue slot (e.g. admit overflow
+        tasks) before the task runs rather than after.
+        
+        Args:
+            task: Task returned by start_task
+            processing_time: How long to process a simulated task at speed 1.0
+                             (seconds), unless the task carries its own service_time
+        
+        Returns:
+            The task
+        """
+        if task.func is None:
+            if task.service_time is not None:
+                processing_time = task.service_time
+            processing_time /= self.speed
+            # Simulate processing time (simplified - no frequent updates to reduce overhead)
+            time.sleep(processing_time)
+            self.finish_task(processing_time)
+            return task
+        
+        started = time.perf_counter()
+        try:
+            if self.executor is not None:
+                result = self.executor.submit(task.func, *task.args, **task.kwargs).result()
+            else:
+                result = task.execute()
+        except Exception as error:
+            self.finish_task(time.perf_counter() - started, error=error)
+        else:
+            self.finish_task(time.perf_counter() - started, result=result)
+        return task
+    
+    def start_task(self):
+        """
+        Take the next task from the queue and mark the processor as busy
+        
+        Split out of process_task so that drivers which do not sleep
+        (such as the discrete-event simulator) can start and finish
+        tasks at virtual times.
+        
+        Returns:
+            Task object or None if queue is empty
+        """
         with self.lock:
+            if not self.task_queue:
+                return None
+            task = self.task_queue.popleft()
+            self._remove_work((task,))
+            task.started_at = self.clock()
             self.is_processing = True
+            self.current_task = task
+            self._running_cost = self.task_cost(task)
             self._update_load()
+            return task
+    
+    def finish_task(self, processing_time, result=None, error=None, task=None):
+        """
+        Mark the running task as completed and record its processing time
         
-        # Simulate processing time (simplified - no frequent updates to reduce overhead)
-        time.sleep(processing_time)
+        The task's done callbacks run after the lock is released.
         
+        Args:
+            processing_time: How long the task took (seconds)
+            result: Value to complete the task with
+            error: Exception to fail the task with instead
+            task: Task to complete instead of the running one (a different
+                  running task is left running)
+        """
         with self.lock:
-            self.is_processing = False
+            if task is None or task is self.current_task:
+                task = self.current_task
+                self.current_task = None
+                self.is_processing = False
+                self._running_cost = 0.0
             self.total_tasks_completed += 1
             self.total_processing_time += processing_time
             self._update_load()
+            
+            if task is not None:
+                task.finished_at = self.clock()
+                self._record_latency(task)
+                for callback in self._completion_listeners:
+                    callback(self, task)
         
-        return task
+        if task is None:
+            return
+        if error is not None:
+            task.set_exception(error)
+        else:
+            task.set_result(result)
+    
+    def _record_latency(self, task):
+        """Record a completed task's queue wait, service time and end-to-end latency"""
+        if task.started_at is None:
+            return
+        self.service_time_histogram.record(task.finished_at - task.started_at)
+        if task.enqueued_at is not None:
+            self.queue_wait_histogram.record(task.started_at - task.enqueued_at)
+            self.latency_histogram.record(task.finished_at - task.enqueued_at)
+    
+    def add_completion_listener(self, callback):
+        """
+        Register a callback to run when a task completes on this processor
+        
+        Runs with the processor lock held, after the task's finished_at
+        timestamp is set and before its done callbacks.
+        
+        Args:
+            callback: Function called as callback(processor, task)
+        """
+        with self.lock:
+            self._completion_listeners.append(callback)
+    
+    def remove_completion_listener(self, callback):
+        """Unregister a callback added with add_completion_listener"""
+        with self.lock:
+            if callback in self._completion_listeners:
+                self._completion_listeners.remove(callback)
+    
+    def get_latency_stats(self):
+        """
+        Get latency percentiles for tasks completed on this processor
+        
+        Returns:
+            Dictionary with 'queue_wait', 'service_time' and 'end_to_end'
+            summaries (count, mean, min, max, p50, p90, p99, p999 in seconds)
+        """
+        with self.lock:
+            return {
+                'queue_wait': self.queue_wait_histogram.get_summary(),
+                'service_time': self.service_time_histogram.get_summary(),
+                'end_to_end': self.latency_histogram.get_summary()
+            }
     
     def _update_load(self):
         """
-        Update the current load based on queue length and processing status
+        Update the current load using this processor's load model
+        
+        A full queue counts as 100% whatever the model says: the processor
+        cannot take another task, so least-loaded placement must not pick it.
         
-        Load = (Queue Factor × 50%) + (Processing Factor × 50%)
-        More accurate calculation that shows load even with few tasks
         Uses RLock so it can be called from within locked sections
         """
         with self.lock:  # RLock allows nested calls
-            queue_length = len(self.task_queue)
-            is_processing = self.is_processing
-            
-            # Queue factor: based on how full the queue is
-            # Use a more sensitive calculation for better visibility
-            if queue_length == 0:
-                queue_factor = 0
-            elif queue_length <= 2:
-                # For small queues, show more load (better visibility)
-                queue_factor = min(queue_length * 25, 50)  # 25% per task up to 50%
+            if len(self.task_queue) >= self.max_queue_size:
+                self.current_load = 100.0
             else:
-                # For larger queues, use percentage of max
-                queue_factor = min(queue_length / self.max_queue_size, 1.0) * 50
+                self.current_load = self.load_model.compute(self)
             
-            # Processing factor: 50% if processing, 0% if idle
-            processing_factor = 50 if is_processing else 0
-            
-            # Total load (capped at 100%)
-            self.current_load = min(queue_factor + processing_factor, 100.0)
+            for callback in self._load_listeners:
+                callback(self)
+    
+    def add_load_listener(self, callback):
+        """
+        Register a callback to run after every load update
+        
+        The callback receives this processor and runs with its lock held,
+        so it must be quick and must not take other processors' locks.
+        
+        Args:
+            callback: Function called as callback(processor)
+        """
+        with self.lock:
+            self._load_listeners.append(callback)
+    
+    def remove_load_listener(self, callback):
+        """Unregister a callback added with add_load_listener"""
+        with self.lock:
+            if callback in self._load_listeners:
+                self._load_listeners.remove(callback)
     
     def get_current_load(self):
         """Get current load percentage"""
@@ -134,6 +426,50 @@ class Processor:
         with self.lock:
             return len(self.task_queue)
     
+    def task_cost(self, task):
+        """
+        Estimated cost of a task (seconds at speed 1.0)
+        
+        Uses the task's estimated_cost, else its service_time, else
+        default_task_cost.
+        """
+        if task.estimated_cost is not None:
+            return task.estimated_cost
+        if task.service_time is not None:
+            return task.service_time
+        return self.default_task_cost
+    
+    def _remove_work(self, tasks):
+        """Take tasks that left the queue out of queued_work (lock held)"""
+        if self.task_queue:
+            self.queued_work -= sum(self.task_cost(task) for task in tasks)
+        else:
+            self.queued_work = 0.0  # Reset float drift whenever the queue empties
+    
+    def get_outstanding_work(self):
+        """
+        Estimated work left on this processor
+        
+        Returns:
+            Cost of the queued tasks plus the remaining cost of the running
+            task, in seconds at speed 1.0
+        """
+        with self.lock:
+            remaining = 0.0
+            if self.current_task is not None and self.current_task.started_at is not None:
+                elapsed = self.clock() - self.current_task.started_at
+                remaining = max(self._running_cost - elapsed * self.speed, 0.0)
+            return self.queued_work + remaining
+    
+    def get_expected_completion_time(self):
+        """
+        Expected time until this processor finishes all outstanding work
+        
+        Returns:
+            Outstanding work / speed, in seconds
+        """
+        return self.get_outstanding_work() / self.speed
+    
     def get_metrics(self):
         """
         Get current processor metrics
@@ -150,6 +486,8 @@ class Processor:
                 'current_load': self.current_load,
                 'queue_length': len(self.task_queue),
                 'is_processing': self.is_processing,
+                'speed': self.speed,
+                'outstanding_work': self.get_outstanding_work(),
                 'total_tasks_completed': self.total_tasks_completed,
                 'average_processing_time': avg_time
             }
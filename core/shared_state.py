@@ -0,0 +1,283 @@
+"""
+Shared State Module
+Processor state table in a multiprocessing.shared_memory block
+"""
+
+import struct
+import sys
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional
+import numpy as np
+from .processor import Processor
+from .state_table import ProcessorStateTable
+
+
+# Serializes the resource_tracker.register swap in _attach_untracked with
+# every shared memory block this module creates or attaches, so no other
+# thread's registration is swallowed while the swap is in place
+_tracker_lock = threading.Lock()
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block without registering it for cleanup
+    
+    Only the creator may unlink the block. Before Python 3.13 attaching
+    registers the block with the resource tracker, which then unlinks it
+    when this process exits (or, when the tracker is shared with the
+    creator, complains about the double unregistration). The swap of
+    resource_tracker.register is process-wide, hence _tracker_lock.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    with _tracker_lock:
+        register = resource_tracker.register
+        resource_tracker.register = lambda name, rtype: None if rtype == "shared_memory" else register(name, rtype)
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+class SharedStateTable(ProcessorStateTable):
+    """
+    ProcessorStateTable whose arrays live in shared memory
+    
+    Any process that opens the block by name sees the same arrays, so
+    worker processes can publish their processor's state with plain
+    stores and the monitor and balancer read it zero-copy, without
+    pipes, queues or manager round-trips.
+    
+    Binary layout (little-endian, every column 8-byte aligned):
+    - Header (16 bytes): b"LBST", version (u16), field count (u16),
+      row count (u32), reserved (u32)
+    - Columns of row-count entries, in this order:
+      sequence (u64), load (f64), queue_length (i64), is_processing (i8),
+      tasks_completed (i64), processing_time (f64), active (bool)
+    
+    Each row has a sequence counter used as a seqlock: writers make it
+    odd while updating the row and even again afterwards, so read_row
+    can return a consistent copy of a row while another process writes
+    it. Vectorized queries read the columns directly.
+    
+    One process (usually the one running SystemMonitor) creates the
+    block and unlinks it when done; the others open() it by name. Rows
+    of processors in this process are mirrored by load listeners
+    (attach); rows that another process publishes can be bound to a
+    local handle for that processor (bind, e.g. a cluster
+    RemoteProcessor), so the monitor's threshold filters return it.
+    """
+    
+    MAGIC = b"LBST"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHHII")
+    COLUMNS = (
+        ('sequence', np.uint64),
+        ('load', np.float64),
+        ('queue_length', np.int64),
+        ('is_processing', np.int8),
+        ('tasks_completed', np.int64),
+        ('processing_time', np.float64),
+        ('active', np.bool_),
+    )
+    
+    def __init__(self, processors: List[Processor], name: Optional[str] = None, size: Optional[int] = None):
+        """
+        Create a shared block and attach every processor to it
+        
+        Args:
+            processors: Processors in this process; processor_id is the row index
+            name: Name of the shared memory block (None picks a unique one)
+            size: Number of rows (defaults to the highest processor_id + 1);
+                  reserve rows here for processors that live in other processes
+        """
+        rows = max((p.processor_id for p in processors), default=-1) + 1
+        if size is not None:
+            rows = max(rows, size)
+        self.owner = True
+        with _tracker_lock:  # Must register even while another thread attaches
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=self.block_size(rows))
+        self.shm.buf[:self.HEADER.size] = self.HEADER.pack(self.MAGIC, self.VERSION, len(self.COLUMNS), rows, 0)
+        
+        self.processors = [None] * rows
+        self._allocate(rows)
+        self._dense = False
+        for processor in processors:
+            self.attach(processor)
+    
+    @classmethod
+    def open(cls, name: str) -> 'SharedStateTable':
+        """
+        Open a block created by another process
+        
+        The returned table has no processor objects; use write_row to
+        publish state and the query methods to read it.
+        
+        Args:
+            name: Name of the shared memory block
+        
+        Returns:
+            Table backed by the existing block
+        """
+        table = cls.__new__(cls)
+        table.owner = False
+        table.shm = _attach_untracked(name)
+        
+        magic, version, field_count, rows, _ = cls.HEADER.unpack_from(table.shm.buf, 0)
+        if magic != cls.MAGIC or version != cls.VERSION or field_count != len(cls.COLUMNS):
+            table.shm.close()
+            raise ValueError(f"Shared memory block {name} is not a version {cls.VERSION} state table")
+        table.processors = [None] * rows
+        table._allocate(rows)
+        table._dense = False  # Other processes may activate rows at any time
+        return table
+    
+    @classmethod
+    def _offsets(cls, rows: int) -> Dict[str, int]:
+        """Byte offset of every column for a table with the given row count"""
+        offsets = {}
+        offset = cls.HEADER.size
+        for column, dtype in cls.COLUMNS:
+            offsets[column] = offset
+            offset += -(-rows * np.dtype(dtype).itemsize // 8) * 8  # Round up to 8 bytes
+        offsets['_end'] = offset
+        return offsets
+    
+    @classmethod
+    def block_size(cls, rows: int) -> int:
+        """Bytes needed for a table with the given row count"""
+        return cls._offsets(rows)['_end']
+    
+    @property
+    def name(self) -> str:
+        """Name other processes pass to open()"""
+        return self.shm.name
+    
+    def _allocate(self, size: int):
+        """Map every column onto the shared block"""
+        offsets = self._offsets(size)
+        for column, dtype in self.COLUMNS:
+            setattr(self, column, np.ndarray(size, dtype=dtype, buffer=self.shm.buf, offset=offsets[column]))
+    
+    def bind(self, processor: Processor):
+        """
+        Register the local handle of a processor whose row another process publishes
+        
+        Unlike attach, no listener is installed: the row keeps whatever
+        the publishing process writes, and processors_at maps it to
+        this handle.
+        
+        Args:
+            processor: Local handle; processor_id is the row index
+        """
+        self.processors[processor.processor_id] = processor
+    
+    def _begin_write(self, row: int) -> int:
+        """Mark a row as being written; returns the odd sequence number"""
+        # Forcing the number odd (rather than adding one) lets a new writer
+        # take over a row whose previous writer died in the middle of an update
+        sequence = int(self.sequence[row]) | 1
+        self.sequence[row] = sequence
+        return sequence
+    
+    def write(self, processor: Processor):
+        """
+        Copy a processor's state into its row
+        
+        Runs as a load listener, with the processor lock held.
+        
+        Args:
+            processor: Processor whose state changed
+        """
+        row = processor.processor_id
+        sequence = self._begin_write(row)
+        super().write(processor)
+        self.active[row] = True
+        self.sequence[row] = sequence + 1
+    
+    def write_row(self, row: int, load: float, queue_length: int, is_processing: bool,
+                  tasks_completed: int, processing_time: float):
+        """
+        Publish one processor's state (e.g. from a worker process)
+        
+        Each row must have a single writer at a time; a new writer may
+        take over a row whose previous writer has died.
+        
+        Args:
+            row: Row (processor_id) to write
+            load: Current load percentage (0-100)
+            queue_length: Number of queued tasks
+            is_processing: Whether a task is running
+            tasks_completed: Total tasks completed
+            processing_time: Total processing time (seconds)
+        """
+        sequence = self._begin_write(row)
+        self.load[row] = load
+        self.queue_length[row] = queue_length
+        self.is_processing[row] = is_processing
+        self.tasks_completed[row] = tasks_completed
+        self.processing_time[row] = processing_time
+        self.active[row] = True
+        self.sequence[row] = sequence + 1
+    
+    def read_row(self, row: int, timeout=1.0) -> Dict:
+        """
+        Read a consistent copy of one row
+        
+        Retries while a writer is in the middle of updating the row.
+        
+        Args:
+            row: Row (processor_id) to read
+            timeout: Maximum seconds to retry
+        
+        Returns:
+            Dictionary with one entry per field
+        
+        Raises:
+            TimeoutError: The row stayed mid-update (e.g. its writer died)
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            before = int(self.sequence[row])
+            if before % 2 == 0:
+                values = {field: getattr(self, field)[row].item() for field in self.FIELDS}
+                if int(self.sequence[row]) == before:
+                    return values
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Row {row} of state table {self.name} is still being written")
+            time.sleep(0)
+    
+    def processors_at(self, rows: np.ndarray) -> List[Processor]:
+        """Map row indices to processor objects, skipping rows with no local handle"""
+        processors = self.processors
+        return [processors[row] for row in rows.tolist() if processors[row] is not None]
+    
+    def snapshot(self) -> Dict[str, np.ndarray]:
+        """
+        Get every field as a zero-copy view of the shared block
+        
+        Rows may be updated while the views are read; use read_row or
+        copy the arrays if a consistent point-in-time copy is needed.
+        
+        Returns:
+            Dictionary mapping field name (plus 'active') to array views
+        """
+        views = {field: getattr(self, field) for field in self.FIELDS}
+        views['active'] = self.active
+        return views
+    
+    def close(self):
+        """Release this process's mapping (the creator also destroys the block)"""
+        for column, _ in self.COLUMNS:
+            setattr(self, column, None)  # Drop views so the buffer can be released
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,263 @@
+"""
+Simulation Module
+Headless discrete-event engine that drives the load balancer on a virtual clock
+"""
+
+import heapq
+import itertools
+from typing import Iterable, Optional, Tuple, List, Dict
+from .processor import Processor
+from .monitor import SystemMonitor
+from .load_balancer import LoadBalancer, Task
+
+
+# Event kinds - the value also orders events scheduled for the same instant:
+# completions free capacity before new arrivals look for a processor
+COMPLETION = 0
+ARRIVAL = 1
+REBALANCE = 2
+STEAL = 3
+
+
+class Simulator:
+    """
+    Discrete-event simulator for the load balancing system
+    
+    Instead of sleeping for each task, the simulator keeps a heap of
+    future events ordered by virtual time and jumps the clock straight
+    from one event to the next:
+    - ARRIVAL: a task is handed to the load balancer
+    - COMPLETION: a processor finishes its running task and starts the next one
+      (stealing from a peer first if the balancer has a work stealer)
+    - STEAL: an idle processor retries stealing while work is queued elsewhere
+    - REBALANCE: the periodic imbalance check that the GUI loop normally runs
+    
+    Processors, monitor and load balancer are the regular objects, so
+    policies tuned here behave the same way in the GUI.
+    """
+    
+    def __init__(self, processors: List[Processor], monitor: SystemMonitor,
+                 load_balancer: LoadBalancer, processing_time=0.5,
+                 rebalance_interval=2.0, steal_retry_interval=None):
+        """
+        Initialize simulator
+        
+        Args:
+            processors: List of processors to drive
+            monitor: System monitor for the processors
+            load_balancer: Load balancer that places arriving tasks
+            processing_time: Virtual time each task takes at speed 1.0 (seconds)
+            rebalance_interval: Virtual time between rebalance checks (None disables)
+            steal_retry_interval: Virtual time an idle processor waits before
+                                  trying to steal again (defaults to processing_time)
+        """
+        self.processors = processors
+        self.monitor = monitor
+        self.load_balancer = load_balancer
+        self.processing_time = processing_time
+        self.rebalance_interval = rebalance_interval
+        self.steal_retry_interval = steal_retry_interval or processing_time
+        
+        self.now = 0.0  # Virtual clock (seconds)
+        self._events = []  # Heap of (time, kind, sequence, payload)
+        self._sequence = itertools.count()  # Tie breaker for equal times
+        self._arrivals = None  # Lazy iterator of (time, task) pairs
+        self._rebalance_scheduled = False
+        self._steal_scheduled = set()  # id() of processors with a pending STEAL event
+        
+        # Timestamp tasks, metrics and queueing delay in virtual time
+        for processor in processors:
+            processor.clock = self.clock
+        if load_balancer.overflow is not None:
+            load_balancer.overflow.clock = self.clock
+        monitor.clock = self.clock
+        
+        # Rebalances are counted in the statistics instead of printed
+        load_balancer.verbose = False
+        
+        # Statistics
+        self.events_processed = 0
+        self.tasks_arrived = 0
+        self.tasks_completed = 0
+        self.tasks_rejected = 0
+    
+    def clock(self) -> float:
+        """Current virtual time (installed as the processors' clock)"""
+        return self.now
+    
+    def schedule(self, time, kind, payload=None):
+        """
+        Push an event onto the event heap
+        
+        Args:
+            time: Virtual time of the event
+            kind: COMPLETION, ARRIVAL, REBALANCE or STEAL
+            payload: (processor, service_time) for completions, Task for arrivals
+        """
+        heapq.heappush(self._events, (time, kind, next(self._sequence), payload))
+    
+    def schedule_arrival(self, time, task: Task):
+        """Schedule a single task to arrive at the given virtual time"""
+        self.schedule(time, ARRIVAL, task)
+    
+    def add_arrivals(self, arrivals: Iterable[Tuple[float, Task]]):
+        """
+        Feed a stream of (arrival_time, task) pairs sorted by time
+        
+        The stream is consumed lazily - only the next arrival sits in the
+        event heap - so traces with millions of tasks use constant memory.
+        
+        Args:
+            arrivals: Iterable of (arrival_time, task) in non-decreasing time order
+        """
+        self._arrivals = iter(arrivals)
+        self._pull_arrival()
+    
+    def _pull_arrival(self):
+        """Move the next arrival from the stream into the event heap"""
+        if self._arrivals is None:
+            return
+        try:
+            time, task = next(self._arrivals)
+        except StopIteration:
+            self._arrivals = None
+            return
+        self.schedule(time, ARRIVAL, task)
+    
+    def service_time(self, task: Task, processor: Processor) -> float:
+        """
+        Virtual time the given processor needs for the given task
+        
+        Uses the task's own service_time (e.g. from a workload generator
+        or trace) when set, scaled by the processor's speed. Override to
+        model other service time effects.
+        """
+        if task.service_time is not None:
+            return task.service_time / processor.speed
+        return self.processing_time / processor.speed
+    
+    def _start_next(self, processor: Processor):
+        """Start the next queued task on an idle processor and schedule its completion"""
+        task = processor.start_task()
+        if task is None and self.load_balancer.work_stealer is not None:
+            if self.load_balancer.steal_for(processor):
+                task = processor.start_task()
+            else:
+                self._schedule_steal(processor)
+        if task is not None:
+            service_time = self.service_time(task, processor)
+            self.schedule(self.now + service_time, COMPLETION, (processor, service_time))
+            
+            # A queue slot just freed up - admit tasks waiting for capacity
+            for _, target in self.load_balancer.drain_overflow():
+                if not target.is_processing:
+                    self._start_next(target)
+    
+    def _schedule_steal(self, processor: Processor):
+        """Retry stealing later, but only while there is queued work to steal"""
+        if id(processor) in self._steal_scheduled:
+            return
+        if self.monitor.get_system_state()['total_queue_length'] == 0:
+            return
+        self._steal_scheduled.add(id(processor))
+        self.schedule(self.now + self.steal_retry_interval, STEAL, processor)
+    
+    def _handle_steal(self, processor: Processor):
+        self._steal_scheduled.discard(id(processor))
+        if not processor.is_processing:
+            self._start_next(processor)
+    
+    def _start_idle_processors(self):
+        """Start every idle processor that has queued work (e.g. after migrations)"""
+        for processor in self.processors:
+            if not processor.is_processing and processor.get_queue_length() > 0:
+                self._start_next(processor)
+    
+    def _handle_arrival(self, task: Task):
+        self.tasks_arrived += 1
+        if self.load_balancer.try_submit(task):
+            processor = task.assigned_processor
+            if processor is not None and not processor.is_processing:
+                self._start_next(processor)
+        else:
+            self.tasks_rejected += 1
+        self._pull_arrival()
+    
+    def _handle_completion(self, processor: Processor, service_time: float):
+        processor.finish_task(service_time)
+        self.tasks_completed += 1
+        self._start_next(processor)
+    
+    def _handle_rebalance(self):
+        self._rebalance_scheduled = False
+        if self.monitor.detect_imbalance():
+            self.load_balancer.adaptive_threshold_adjustment()
+            self.load_balancer.rebalance_loads()
+            self._start_idle_processors()
+        self.monitor.record_metrics()
+        
+        # Only keep ticking while there is other work, otherwise the
+        # simulation would never run out of events
+        if self._events:
+            self._schedule_rebalance()
+    
+    def _schedule_rebalance(self):
+        if self.rebalance_interval and not self._rebalance_scheduled:
+            self.schedule(self.now + self.rebalance_interval, REBALANCE)
+            self._rebalance_scheduled = True
+    
+    def run(self, until: Optional[float] = None, max_events: Optional[int] = None) -> Dict:
+        """
+        Run the simulation
+        
+        Args:
+            until: Stop before the first event later than this virtual time
+            max_events: Stop after processing this many events
+        
+        Returns:
+            Dictionary with simulation statistics
+        """
+        self._schedule_rebalance()
+        events = self._events
+        processed = 0
+        
+        while events:
+            if until is not None and events[0][0] > until:
+                self.now = until
+                break
+            if max_events is not None and processed >= max_events:
+                break
+            
+            time, kind, _, payload = heapq.heappop(events)
+            self.now = time
+            processed += 1
+            
+            if kind == COMPLETION:
+                self._handle_completion(*payload)
+            elif kind == ARRIVAL:
+                self._handle_arrival(payload)
+            elif kind == STEAL:
+                self._handle_steal(payload)
+            else:
+                self._handle_rebalance()
+        
+        self.events_processed += processed
+        return self.get_statistics()
+    
+    def get_statistics(self) -> Dict:
+        """
+        Get simulation statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        stats = {
+            'virtual_time': self.now,
+            'events_processed': self.events_processed,
+            'tasks_arrived': self.tasks_arrived,
+            'tasks_completed': self.tasks_completed,
+            'tasks_rejected': self.tasks_rejected,
+            'pending_events': len(self._events)
+        }
+        stats.update(self.load_balancer.get_statistics())
+        return stats
@@ -0,0 +1,139 @@
+"""
+State Table Module
+Structure-of-arrays copy of processor state for vectorized monitoring
+"""
+
+from typing import List, Dict
+import numpy as np
+from .processor import Processor
+
+
+class ProcessorStateTable:
+    """
+    Array-backed table of processor state, one NumPy array per field
+    
+    Row i holds the state of the processor with processor_id i. Each
+    processor writes its row from a load listener, so the table is
+    always current, and system-wide queries become vectorized array
+    operations instead of per-processor Python calls and lock acquisitions.
+    
+    Fields:
+    - load: Current load percentage (0-100)
+    - queue_length: Number of queued tasks
+    - is_processing: 1 while a task is running, else 0
+    - tasks_completed: Total tasks completed
+    - processing_time: Total processing time (seconds)
+    """
+    
+    FIELDS = ('load', 'queue_length', 'is_processing', 'tasks_completed', 'processing_time')
+    
+    def __init__(self, processors: List[Processor]):
+        """
+        Initialize the table and attach every processor to it
+        
+        Args:
+            processors: List of processors; processor_id is used as row index
+        """
+        size = max((p.processor_id for p in processors), default=-1) + 1
+        self.processors = [None] * size  # Row -> processor
+        self._allocate(size)
+        self._dense = False  # True when every row has a processor (no masking needed)
+        for processor in processors:
+            self.attach(processor)
+    
+    def _allocate(self, size: int):
+        """
+        Create the field arrays (subclasses may place them elsewhere)
+        
+        Args:
+            size: Number of rows
+        """
+        self.load = np.zeros(size, dtype=np.float64)
+        self.queue_length = np.zeros(size, dtype=np.int64)
+        self.is_processing = np.zeros(size, dtype=np.int8)
+        self.tasks_completed = np.zeros(size, dtype=np.int64)
+        self.processing_time = np.zeros(size, dtype=np.float64)
+        
+        # Rows with no processor are masked out of every query
+        self.active = np.zeros(size, dtype=bool)
+    
+    def attach(self, processor: Processor):
+        """
+        Start mirroring a processor's state into its row
+        
+        Args:
+            processor: Processor to attach
+        """
+        row = processor.processor_id
+        self.processors[row] = processor
+        self.active[row] = True
+        self._dense = bool(self.active.all())
+        processor.add_load_listener(self.write)
+        with processor.lock:
+            self.write(processor)
+    
+    def write(self, processor: Processor):
+        """
+        Copy a processor's state into its row
+        
+        Runs as a load listener, with the processor lock held.
+        
+        Args:
+            processor: Processor whose state changed
+        """
+        row = processor.processor_id
+        self.load[row] = processor.current_load
+        self.queue_length[row] = len(processor.task_queue)
+        self.is_processing[row] = processor.is_processing
+        self.tasks_completed[row] = processor.total_tasks_completed
+        self.processing_time[row] = processor.total_processing_time
+    
+    def get_system_state(self, timestamp: float) -> Dict:
+        """
+        Compute system-wide metrics with vectorized operations
+        
+        Args:
+            timestamp: Time of the snapshot (the monitor's clock)
+        
+        Returns:
+            Dictionary with the same keys as SystemMonitor.get_system_state
+        """
+        loads = self.load if self._dense else self.load[self.active]
+        queue_lengths = self.queue_length if self._dense else self.queue_length[self.active]
+        if loads.size == 0:
+            return {
+                'average_load': 0.0,
+                'max_load': 0.0,
+                'min_load': 0.0,
+                'load_variance': 0.0,
+                'total_queue_length': 0,
+                'processor_count': 0,
+                'timestamp': timestamp
+            }
+        
+        max_load = float(loads.max())
+        min_load = float(loads.min())
+        return {
+            'average_load': float(loads.mean()),
+            'max_load': max_load,
+            'min_load': min_load,
+            'load_variance': max_load - min_load,
+            'total_queue_length': int(queue_lengths.sum()),
+            'processor_count': int(loads.size),
+            'timestamp': timestamp
+        }
+    
+    def rows_above(self, threshold: float) -> np.ndarray:
+        """Get row indices of processors with load above threshold"""
+        above = self.load > threshold
+        return np.flatnonzero(above if self._dense else above & self.active)
+    
+    def rows_below(self, threshold: float) -> np.ndarray:
+        """Get row indices of processors with load below threshold"""
+        below = self.load < threshold
+        return np.flatnonzero(below if self._dense else below & self.active)
+    
+    def processors_at(self, rows: np.ndarray) -> List[Processor]:
+        """Map row indices back to processor objects"""
+        processors = self.processors
+        return [processors[row] for row in rows.tolist()]
@@ -0,0 +1,131 @@
+"""
+Work Stealing Module
+Lets idle processors pull queued tasks from busy peers
+"""
+
+import random
+from typing import List, Optional
+from .processor import Processor
+from .monitor import SystemMonitor
+from .migration import transfer_tasks
+
+
+class WorkStealer:
+    """
+    Decentralized alternative to periodic rebalancing
+    
+    When a processor runs out of work it steals a batch of tasks from
+    the tail of a busy peer's queue instead of waiting for the next
+    LoadBalancer.rebalance_loads pass.
+    
+    Victim selection:
+    - "random": probe a few random peers and rob the first with queued work
+    - "load": rob the most loaded processor (O(1) via the monitor's load index)
+    """
+    
+    VICTIM_POLICIES = ('random', 'load')
+    
+    def __init__(self, processors: List[Processor], monitor: SystemMonitor,
+                 victim_policy='random', steal_fraction=0.5, max_batch=None,
+                 probes=3, seed=None):
+        """
+        Initialize work stealer
+        
+        Args:
+            processors: List of all processors
+            monitor: System monitor (used by the "load" victim policy)
+            victim_policy: "random" or "load"
+            steal_fraction: Fraction of the victim's queue to take (at least 1 task)
+            max_batch: Upper bound on tasks taken per steal (None = no bound)
+            probes: Number of random peers to try per steal ("random" policy)
+            seed: Seed for the random victim choice
+        """
+        if victim_policy not in self.VICTIM_POLICIES:
+            raise ValueError(f"Unknown victim policy: {victim_policy}")
+        
+        self.processors = processors
+        self.monitor = monitor
+        self.victim_policy = victim_policy
+        self.steal_fraction = steal_fraction
+        self.max_batch = max_batch
+        self.probes = probes
+        self.random = random.Random(seed)
+        
+        # Statistics
+        self.steal_attempts = 0
+        self.successful_steals = 0
+        self.tasks_stolen = 0
+    
+    def _select_victim(self, thief: Processor) -> Optional[Processor]:
+        """
+        Pick a peer to steal from
+        
+        Args:
+            thief: Processor looking for work
+        
+        Returns:
+            Victim processor with queued tasks, or None
+        """
+        if self.victim_policy == 'load':
+            victim = self.monitor.get_most_loaded_processor()
+            if victim is thief or victim.get_queue_length() == 0:
+                return None
+            return victim
+        
+        if len(self.processors) < 2:
+            return None
+        for _ in range(self.probes):
+            victim = self.random.choice(self.processors)
+            if victim is not thief and victim.get_queue_length() > 0:
+                return victim
+        return None
+    
+    def steal(self, thief: Processor) -> int:
+        """
+        Move a batch of tasks from a busy peer to an idle processor
+        
+        The batch size comes from a snapshot of both queues; the move
+        itself goes through transfer_tasks like a migration, so both queues
+        are locked together (in processor_id order) and the batch is taken
+        from the victim's tail, leaving its oldest tasks in place.
+        
+        Args:
+            thief: Processor looking for work
+        
+        Returns:
+            Number of tasks stolen
+        """
+        self.steal_attempts += 1
+        victim = self._select_victim(thief)
+        if victim is None:
+            return 0
+        
+        available = victim.get_queue_length()
+        free = thief.max_queue_size - thief.get_queue_length()
+        count = min(max(1, int(available * self.steal_fraction)), available, free)
+        if self.max_batch is not None:
+            count = min(count, self.max_batch)
+        if count <= 0:
+            return 0
+        
+        # One batch out of the victim and one batch into the thief
+        tasks = transfer_tasks(victim, thief, count)
+        if not tasks:
+            return 0
+        
+        self.successful_steals += 1
+        self.tasks_stolen += len(tasks)
+        return len(tasks)
+    
+    def get_statistics(self) -> dict:
+        """
+        Get work stealing statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'steal_attempts': self.steal_attempts,
+            'successful_steals': self.successful_steals,
+            'tasks_stolen': self.tasks_stolen
+        }
@@ -0,0 +1,90 @@
+"""
+Workers Module
+Long-lived, event-driven worker threads that run processor queues
+"""
+
+import threading
+from typing import List
+from .processor import Processor
+
+
+class WorkerPool:
+    """
+    One long-lived worker thread per processor
+    
+    Each worker processes its processor's queue and then blocks on the
+    processor's work_available condition, which add_task/add_tasks
+    signal. A new task therefore starts as soon as it is queued, with no
+    polling interval and no thread created per burst.
+    
+    As soon as a worker takes a task off its queue it drains the load
+    balancer's overflow queue into the freed slot, and when its queue is
+    empty it tries to steal from a peer (if the balancer has a work
+    stealer) before going to sleep.
+    """
+    
+    def __init__(self, processors: List[Processor], load_balancer,
+                 processing_time=0.5, steal_interval=0.05):
+        """
+        Initialize worker pool
+        
+        Args:
+            processors: Processors to run
+            load_balancer: Load balancer (for overflow draining and stealing)
+            processing_time: Processing time for simulated tasks (seconds)
+            steal_interval: How often an idle worker retries stealing (seconds);
+                            only used when work stealing is enabled
+        """
+        self.processors = processors
+        self.load_balancer = load_balancer
+        self.processing_time = processing_time
+        self.steal_interval = steal_interval
+        self.running = False
+        self.threads = []
+    
+    def start(self):
+        """Start one worker thread per processor"""
+        if self.running:
+            return
+        self.running = True
+        self.threads = [
+            threading.Thread(target=self._run, args=(processor,), daemon=True,
+                             name=f"processor-{processor.processor_id}")
+            for processor in self.processors
+        ]
+        for thread in self.threads:
+            thread.start()
+    
+    def stop(self, timeout=None):
+        """
+        Stop the workers after their current task
+        
+        Args:
+            timeout: Maximum seconds to wait for each thread
+        """
+        self.running = False
+        for processor in self.processors:
+            processor.wake_workers()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+    
+    def _run(self, processor: Processor):
+        """Worker loop for one processor"""
+        while self.running:
+            try:
+                task = processor.start_task()
+                if task is not None:
+                    # A slot freed up - admit tasks waiting in the overflow queue
+                    # now, not after this task finishes
+                    self.load_balancer.drain_overflow()
+                    processor.run_task(task, self.processing_time)
+                    continue
+                
+                # Queue empty: pull work from a busy peer, otherwise sleep until notified
+                if self.load_balancer.steal_for(processor):
+                    continue
+                timeout = self.steal_interval if self.load_balancer.work_stealer else None
+                processor.wait_for_work(timeout)
+            except Exception as e:
+                print(f"Error processing task on Processor {processor.processor_id}: {e}")
@@ -0,0 +1,402 @@
+"""
+Workload Module
+Synthetic arrival generators, trace record/replay and a real-time driver
+"""
+
+import csv
+import math
+import random
+import struct
+import threading
+import time
+from typing import Iterable, Iterator, Optional, Tuple
+from .load_balancer import LoadBalancer, Task
+
+
+class ExponentialServiceTime:
+    """Exponentially distributed service times (memoryless, M/M/c style)"""
+    
+    def __init__(self, mean=0.5):
+        """
+        Args:
+            mean: Mean service time (seconds)
+        """
+        self.mean = mean
+    
+    def __call__(self, rng: random.Random) -> float:
+        return rng.expovariate(1.0 / self.mean)
+
+
+class ParetoServiceTime:
+    """
+    Heavy-tailed (Pareto) service times
+    
+    Most tasks are short, a few are very long. With alpha <= 2 the
+    variance is infinite, which is what makes such workloads hard to
+    balance by queue length alone.
+    """
+    
+    def __init__(self, mean=0.5, alpha=1.5):
+        """
+        Args:
+            mean: Mean service time (seconds)
+            alpha: Tail index (must be > 1; smaller means heavier tail)
+        """
+        if alpha <= 1.0:
+            raise ValueError("alpha must be greater than 1 for a finite mean")
+        self.mean = mean
+        self.alpha = alpha
+        self.scale = mean * (alpha - 1.0) / alpha  # Minimum service time
+    
+    def __call__(self, rng: random.Random) -> float:
+        return self.scale * rng.paretovariate(self.alpha)
+
+
+class WorkloadGenerator:
+    """
+    Base class for synthetic workloads
+    
+    A workload is an iterable of (arrival_time, task) pairs in
+    non-decreasing time order, which is what Simulator.add_arrivals and
+    WorkloadDriver consume. Subclasses provide the arrival process by
+    implementing arrival_times(); every task gets a service_time drawn
+    from the service time distribution.
+    """
+    
+    def __init__(self, service_time=0.5, seed=None, start_id=0):
+        """
+        Initialize generator
+        
+        Args:
+            service_time: Fixed service time (seconds), or a callable taking
+                          a random.Random and returning one (e.g. ParetoServiceTime)
+            seed: Seed for reproducible workloads
+            start_id: Task id of the first task
+        """
+        self.service_time = service_time
+        self.seed = seed
+        self.start_id = start_id
+    
+    def arrival_times(self, rng: random.Random) -> Iterator[float]:
+        """Endless iterator of arrival times (seconds from 0)"""
+        raise NotImplementedError
+    
+    def generate(self, duration: Optional[float] = None, count: Optional[int] = None
+                 ) -> Iterator[Tuple[float, Task]]:
+        """
+        Generate (arrival_time, task) pairs lazily
+        
+        Args:
+            duration: Stop at this arrival time (seconds)
+            count: Stop after this many tasks
+        
+        Returns:
+            Iterator of (arrival_time, task) pairs
+        """
+        if duration is None and count is None:
+            raise ValueError("give a duration or a count (the workload is endless)")
+        rng = random.Random(self.seed)
+        service_time = self.service_time
+        task_id = self.start_id
+        for arrival_time in self.arrival_times(rng):
+            if duration is not None and arrival_time > duration:
+                return
+            if count is not None and task_id - self.start_id >= count:
+                return
+            size = service_time(rng) if callable(service_time) else service_time
+            yield arrival_time, Task(task_id, service_time=size)
+            task_id += 1
+
+
+class PoissonArrivals(WorkloadGenerator):
+    """Poisson arrivals: independent, exponentially spaced, at a constant rate"""
+    
+    def __init__(self, rate: float, **kwargs):
+        """
+        Args:
+            rate: Mean arrivals per second
+            **kwargs: service_time, seed, start_id (see WorkloadGenerator)
+        """
+        super().__init__(**kwargs)
+        self.rate = rate
+    
+    def arrival_times(self, rng):
+        now = 0.0
+        while True:
+            now += rng.expovariate(self.rate)
+            yield now
+
+
+class MMPPArrivals(WorkloadGenerator):
+    """
+    Bursty arrivals from a Markov-modulated Poisson process
+    
+    The process moves between states (e.g. "quiet" and "burst"), staying
+    in each for an exponentially distributed time, and generates Poisson
+    arrivals at that state's rate. The next state is chosen uniformly
+    among the others.
+    """
+    
+    def __init__(self, rates=(2.0, 20.0), mean_durations=(10.0, 2.0), **kwargs):
+        """
+        Args:
+            rates: Arrival rate per state (arrivals per second)
+            mean_durations: Mean time spent in each state (seconds)
+            **kwargs: service_time, seed, start_id (see WorkloadGenerator)
+        """
+        super().__init__(**kwargs)
+        if len(rates) != len(mean_durations) or len(rates) < 1:
+            raise ValueError("need one mean duration per rate")
+        self.rates = tuple(rates)
+        self.mean_durations = tuple(mean_durations)
+    
+    def arrival_times(self, rng):
+        now = 0.0
+        state = 0
+        while True:
+            state_end = now + rng.expovariate(1.0 / self.mean_durations[state])
+            rate = self.rates[state]
+            while rate > 0:
+                arrival = now + rng.expovariate(rate)
+                if arrival > state_end:
+                    break
+                now = arrival
+                yield now
+            now = state_end
+            if len(self.rates) > 1:
+                state = rng.choice([s for s in range(len(self.rates)) if s != state])
+
+
+class DiurnalArrivals(WorkloadGenerator):
+    """
+    Arrivals whose rate follows a daily (sinusoidal) cycle
+    
+    rate(t) = mean_rate * (1 + amplitude * sin(2 pi (t / period + phase))),
+    sampled exactly by thinning a Poisson process at the peak rate.
+    """
+    
+    def __init__(self, mean_rate: float, amplitude=0.8, period=86400.0, phase=0.0, **kwargs):
+        """
+        Args:
+            mean_rate: Average arrivals per second over a period
+            amplitude: Relative swing around the mean, in [0, 1]
+            period: Length of one cycle (seconds); shrink it to compress a day
+            phase: Offset into the cycle, as a fraction of the period
+            **kwargs: service_time, seed, start_id (see WorkloadGenerator)
+        """
+        super().__init__(**kwargs)
+        if not 0.0 <= amplitude <= 1.0:
+            raise ValueError("amplitude must be between 0 and 1")
+        self.mean_rate = mean_rate
+        self.amplitude = amplitude
+        self.period = period
+        self.phase = phase
+    
+    def rate_at(self, t: float) -> float:
+        """Arrival rate at time t (arrivals per second)"""
+        return self.mean_rate * (1.0 + self.amplitude * math.sin(2.0 * math.pi * (t / self.period + self.phase)))
+    
+    def arrival_times(self, rng):
+        peak_rate = self.mean_rate * (1.0 + self.amplitude)
+        now = 0.0
+        while True:
+            now += rng.expovariate(peak_rate)
+            if rng.random() * peak_rate <= self.rate_at(now):
+                yield now
+
+
+class TraceReplay:
+    """
+    Replays a recorded trace of (arrival_time, service_time) records
+    
+    Two formats are supported:
+    - CSV with "arrival_time" and "service_time" columns (seconds),
+      optionally a "task_id" column
+    - Binary: an 8-byte header (b"LBTR", version, reserved) followed by
+      little-endian float64 pairs, 16 bytes per task
+    
+    Records are read lazily, so traces larger than memory can be replayed.
+    Arrival times are shifted so the first task arrives at 0.
+    """
+    
+    MAGIC = b"LBTR"
+    VERSION = 1
+    HEADER = struct.Struct("<4sHH")
+    RECORD = struct.Struct("<dd")
+    
+    def __init__(self, path: str, start_id=0):
+        """
+        Args:
+            path: Trace file; ".csv" files are read as CSV, others as binary
+            start_id: Task id of the first task (CSV task_id columns win)
+        """
+        self.path = path
+        self.start_id = start_id
+    
+    def __iter__(self) -> Iterator[Tuple[float, Task]]:
+        records = self._read_csv() if self.path.endswith(".csv") else self._read_binary()
+        origin = None
+        for task_id, (record_id, arrival_time, service_time) in enumerate(records, self.start_id):
+            if origin is None:
+                origin = arrival_time
+            if record_id is not None:
+                task_id = record_id
+            yield arrival_time - origin, Task(task_id, service_time=service_time)
+    
+    def _read_csv(self):
+        with open(self.path, newline="") as f:
+            for row in csv.DictReader(f):
+                task_id = row.get("task_id")
+                yield (int(task_id) if task_id not in (None, "") else None,
+                       float(row["arrival_time"]), float(row["service_time"]))
+    
+    def _read_binary(self):
+        with open(self.path, "rb") as f:
+            magic, version, _ = self.HEADER.unpack(f.read(self.HEADER.size))
+            if magic != self.MAGIC or version != self.VERSION:
+                raise ValueError(f"{self.path} is not a version {self.VERSION} trace file")
+            chunk_size = self.RECORD.size * 4096
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    return
+                for arrival_time, service_time in self.RECORD.iter_unpack(chunk):
+                    yield None, arrival_time, service_time
+    
+    @classmethod
+    def record(cls, workload: Iterable[Tuple[float, Task]], path: str, default_service_time=0.5) -> int:
+        """
+        Write a workload to a trace file (format chosen by extension as above)
+        
+        Args:
+            workload: Iterable of (arrival_time, task) pairs
+            path: Output file
+            default_service_time: Used for tasks without a service_time
+        
+        Returns:
+            Number of tasks written
+        """
+        count = 0
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["task_id", "arrival_time", "service_time"])
+                for arrival_time, task in workload:
+                    service_time = task.service_time if task.service_time is not None else default_service_time
+                    writer.writerow([task.task_id, repr(arrival_time), repr(service_time)])
+                    count += 1
+            return count
+        
+        with open(path, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, 0))
+            for arrival_time, task in workload:
+                service_time = task.service_time if task.service_time is not None else default_service_time
+                f.write(cls.RECORD.pack(arrival_time, service_time))
+                count += 1
+        return count
+
+
+class WorkloadDriver:
+    """
+    Feeds a workload into a live load balancer in real time
+    
+    Each task is submitted when its arrival time (divided by speed) has
+    passed on the wall clock, so a trace can be replayed as recorded,
+    compressed or stretched. Submission goes through try_submit, so the
+    overflow queue is used when configured; tasks that find every queue
+    full are counted as rejected, which is how saturation shows up.
+    
+    If submission falls behind schedule the driver catches up as fast as
+    it can instead of dropping tasks; the worst lag is reported.
+    """
+    
+    def __init__(self, load_balancer: LoadBalancer, workload: Iterable[Tuple[float, Task]], speed=1.0):
+        """
+        Initialize driver
+        
+        Args:
+            load_balancer: Load balancer to submit to
+            workload: Iterable of (arrival_time, task) pairs in time order
+            speed: Replay speed (2.0 = twice as fast as the workload's clock)
+        """
+        self.load_balancer = load_balancer
+        self.workload = workload
+        self.speed = speed
+        self.running = False
+        self.thread = None
+        self._stop = threading.Event()
+        
+        # Statistics
+        self.tasks_submitted = 0
+        self.tasks_rejected = 0
+        self.max_lag = 0.0  # Worst delay behind schedule (seconds)
+    
+    def run(self, duration: Optional[float] = None):
+        """
+        Replay the workload in the calling thread
+        
+        Args:
+            duration: Stop after this many wall-clock seconds
+        """
+        self.running = True
+        self._stop.clear()
+        self._replay(duration)
+    
+    def _replay(self, duration: Optional[float]):
+        """Submit tasks on schedule until the workload ends, duration passes or stop() is called"""
+        start = time.monotonic()
+        try:
+            for arrival_time, task in self.workload:
+                due = start + arrival_time / self.speed
+                if duration is not None and due - start > duration:
+                    break
+                delay = due - time.monotonic()
+                if delay > 0:
+                    if self._stop.wait(delay):
+                        break
+                else:
+                    if self._stop.is_set():
+                        break
+                    self.max_lag = max(self.max_lag, -delay)
+                
+                if self.load_balancer.try_submit(task):
+                    self.tasks_submitted += 1
+                else:
+                    self.tasks_rejected += 1
+        finally:
+            self.running = False
+    
+    def start(self, duration: Optional[float] = None):
+        """Replay the workload in a background thread"""
+        if self.running:
+            return
+        self.running = True
+        self._stop.clear()  # Before the thread exists, so an early stop() is not lost
+        self.thread = threading.Thread(target=self._replay, args=(duration,), daemon=True,
+                                       name="workload-driver")
+        self.thread.start()
+    
+    def stop(self, timeout=None):
+        """
+        Stop the replay
+        
+        Args:
+            timeout: Maximum seconds to wait for the background thread
+        """
+        self._stop.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+    
+    def get_statistics(self) -> dict:
+        """
+        Get replay statistics
+        
+        Returns:
+            Dictionary with statistics
+        """
+        return {
+            'workload_submitted': self.tasks_submitted,
+            'workload_rejected': self.tasks_rejected,
+            'workload_max_lag': self.max_lag
+        }
@@ -9,14 +9,17 @@ import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
 from collections import deque
+import math
 import threading
 import time
+import numpy as np
 from typing import List
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from core.monitor import SystemMonitor
+from core.workers import WorkerPool
 
 
 class LoadBalancerGUI:
@@ -29,9 +32,18 @@ class LoadBalancerGUI:
     - Load over time graph
     - System metrics display
     - Button to add processes dynamically
+    
+    Rendering is incremental: artists are created once, updated in place
+    and blitted, and above BAR_LIMIT processors the per-processor charts
+    become heatmaps so frame time stays flat as processors are added.
     """
     
-    def __init__(self, monitor: SystemMonitor, load_balancer, processors: List):
+    # Above these processor counts the per-processor views are simplified
+    LABEL_LIMIT = 16  # Value labels and per-processor ticks on the bar charts
+    BAR_LIMIT = 64  # Bar charts; larger systems are drawn as load/queue heatmaps
+    HISTORY_WINDOW = 30.0  # Seconds visible in the time-series plots
+    
+    def __init__(self, monitor: SystemMonitor, load_balancer, processors: List, workers=None):
         """
         Initialize GUI
         
@@ -39,6 +51,8 @@ class LoadBalancerGUI:
             monitor: System monitor instance
             load_balancer: Load balancer instance
             processors: List of processors
+            workers: Worker pool that runs the processors (default: a
+                     WorkerPool; e.g. a PinnedWorkerPool for core pinning)
         """
         self.monitor = monitor
         self.load_balancer = load_balancer
@@ -61,6 +75,10 @@ class LoadBalancerGUI:
         # Setup GUI
         self._setup_gui()
         
+        # Long-lived worker per processor, woken as soon as tasks are queued
+        self.workers = workers or WorkerPool(processors, load_balancer, processing_time=0.5)
+        self.workers.start()
+        
         # Start update thread
         self.running = True
         self.update_thread = threading.Thread(target=self._update_loop, daemon=True)
@@ -121,7 +139,10 @@ class LoadBalancerGUI:
         self.canvas = FigureCanvasTkAgg(self.fig, main_frame)
         self.canvas.get_tk_widget().grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-        # Initial plot
+        # Artists are created once; _update_plots changes their data and blits them
+        self._setup_plots()
+        self.canvas.mpl_connect('resize_event', self._on_resize)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
         self._update_plots()
     
     def _add_process(self):
@@ -131,31 +152,171 @@ class LoadBalancerGUI:
         task = Task(self.task_counter)
         self.task_counter += 1
         
-        if self.load_balancer.assign_task(task):
-            print(f"Task {task.task_id} assigned to Processor {task.assigned_processor.processor_id}")
+        if self.load_balancer.try_submit(task):
+            if task.assigned_processor is not None:
+                print(f"Task {task.task_id} assigned to Processor {task.assigned_processor.processor_id}")
+            else:
+                print(f"Task {task.task_id} queued until a processor has room")
         else:
             print(f"Failed to assign Task {task.task_id}")
     
     def _add_multiple_processes(self):
         """Add multiple processes at once"""
-        for _ in range(5):
-            self._add_process()
-            time.sleep(0.1)  # Small delay between tasks
+        from core.load_balancer import Task
+        
+        tasks = [Task(self.task_counter + i) for i in range(5)]
+        self.task_counter += len(tasks)
+        
+        placements, rejected = self.load_balancer.assign_tasks(tasks)
+        for task, processor in placements:
+            print(f"Task {task.task_id} assigned to Processor {processor.processor_id}")
+        for task in rejected:
+            print(f"Failed to assign Task {task.task_id}")
+    
+    def _setup_plots(self):
+        """Create axes decorations and the artists that every frame updates"""
+        count = len(self.processors)
+        self.processor_ids = [p.processor_id for p in self.processors]
+        self.heatmap_mode = count > self.BAR_LIMIT
+        self.start_time = None
+        self.queue_ylim = 5
+        self.load_bars = []
+        self.queue_bars = []
+        self.load_texts = []
+        self.queue_texts = []
+        self._last_loads = None
+        self._last_queue_lengths = None
+        self._backgrounds = None  # Static pixels per axes, captured after each full draw
+        
+        self.ax1.set_title('Current Processor Load (%)', fontsize=12, fontweight='bold')
+        self.ax2.set_title('Task Queue Lengths', fontsize=12, fontweight='bold')
+        
+        if count == 0:
+            # No processors, show empty graphs
+            for ax in (self.ax1, self.ax2):
+                ax.text(0.5, 0.5, 'No Processors', ha='center', va='center',
+                        transform=ax.transAxes, fontsize=14)
+            self.ax1.set_ylim(0, 100)
+            self.ax2.set_ylim(0, 10)
+        elif self.heatmap_mode:
+            # One cell per processor (row-major by position); spare cells stay blank
+            columns = int(math.ceil(math.sqrt(count)))
+            rows = int(math.ceil(count / columns))
+            self.grid_cells = np.full(rows * columns, np.nan)
+            blank = self.grid_cells.reshape(rows, columns)
+            max_queue = max(p.max_queue_size for p in self.processors)
+            self.load_image = self.ax1.imshow(blank, cmap='RdYlGn_r', vmin=0, vmax=100,
+                                              aspect='auto', interpolation='nearest', animated=True)
+            self.queue_image = self.ax2.imshow(blank, cmap='Blues', vmin=0, vmax=max_queue,
+                                               aspect='auto', interpolation='nearest', animated=True)
+            self.fig.colorbar(self.load_image, ax=self.ax1, label='Load (%)')
+            self.fig.colorbar(self.queue_image, ax=self.ax2, label='Queue Length')
+            for ax in (self.ax1, self.ax2):
+                ax.set_xlabel(f'{count} Processors ({columns} per row)')
+                ax.set_xticks([])
+                ax.set_yticks([])
+        else:
+            # Minimum height 0.1 keeps empty bars visible
+            self.load_bars = self.ax1.bar(self.processor_ids, [0.1] * count, color='green', alpha=0.8,
+                                          edgecolor='black', linewidth=1.5, width=0.7)
+            self.queue_bars = self.ax2.bar(self.processor_ids, [0.1] * count, color='blue', alpha=0.8,
+                                           edgecolor='black', linewidth=1.5, width=0.7)
+            self.ax1.set_ylabel('Load (%)')
+            self.ax1.set_ylim(0, 100)
+            self.ax1.grid(True, alpha=0.3, axis='y', linestyle='--')
+            self.ax2.set_ylabel('Queue Length')
+            self.ax2.set_ylim(0, self.queue_ylim)
+            self.ax2.grid(True, alpha=0.3, linestyle='--')
+            for ax in (self.ax1, self.ax2):
+                ax.set_xlabel('Processor ID')
+                if count <= self.LABEL_LIMIT:
+                    ax.set_xticks(self.processor_ids)
+            for bar in list(self.load_bars) + list(self.queue_bars):
+                bar.set_animated(True)
+            
+            # Value labels on bars, only while they fit
+            if count <= self.LABEL_LIMIT:
+                label_style = dict(ha='center', va='bottom', fontsize=10, fontweight='bold', animated=True,
+                                   bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.7))
+                self.load_texts = [self.ax1.text(proc_id, 5, '0.0%', **label_style)
+                                   for proc_id in self.processor_ids]
+                self.queue_texts = [self.ax2.text(proc_id, 0.5, '0', **label_style)
+                                    for proc_id in self.processor_ids]
+        
+        # Time series, drawn over a window that scrolls in steps
+        self.avg_line, = self.ax3.plot([], [], 'b-', linewidth=2, label='Average Load', animated=True)
+        self.ax3.set_title('Average System Load Over Time', fontsize=12, fontweight='bold')
+        self.ax3.set_xlabel('Time (seconds)')
+        self.ax3.set_ylabel('Load (%)')
+        self.ax3.set_ylim(0, 100)
+        self.ax3.legend()
+        self.ax3.grid(True, alpha=0.3)
+        
+        self.variance_line, = self.ax4.plot([], [], 'r-', linewidth=2, label='Load Variance', animated=True)
+        self.threshold_shown = self.monitor.rebalance_threshold * 100
+        self.threshold_line = self.ax4.axhline(y=self.threshold_shown, color='g', linestyle='--', linewidth=2,
+                                               label=f'Threshold ({self.threshold_shown:.0f}%)')
+        self.ax4.set_title('Load Variance Over Time', fontsize=12, fontweight='bold')
+        self.ax4.set_xlabel('Time (seconds)')
+        self.ax4.set_ylabel('Variance (%)')
+        self.ax4.set_ylim(0, 100)
+        self.ax4.legend()
+        self.ax4.grid(True, alpha=0.3)
+        
+        for ax in (self.ax3, self.ax4):
+            ax.set_xlim(0, self.HISTORY_WINDOW)
+        
+        # Artists redrawn on every frame, per axes
+        if self.heatmap_mode:
+            self.animated = {self.ax1: [self.load_image], self.ax2: [self.queue_image]}
+        else:
+            self.animated = {self.ax1: list(self.load_bars) + self.load_texts,
+                             self.ax2: list(self.queue_bars) + self.queue_texts}
+        self.animated[self.ax3] = [self.avg_line]
+        self.animated[self.ax4] = [self.variance_line]
+        
+        self.fig.tight_layout()
+    
+    def _on_resize(self, event):
+        """Re-run the layout when the window size changes"""
+        self.fig.tight_layout()
+    
+    def _on_draw(self, event):
+        """Capture the static background after a full draw and paint the animated artists on it"""
+        self._backgrounds = {ax: self.canvas.copy_from_bbox(ax.bbox) for ax in self.animated}
+        for ax, artists in self.animated.items():
+            for artist in artists:
+                ax.draw_artist(artist)
+        self.canvas.blit(self.fig.bbox)
+    
+    def _blit(self, changed_axes):
+        """
+        Redraw only the animated artists of the given axes
+        
+        Args:
+            changed_axes: Axes whose artists were updated
+        """
+        for ax in changed_axes:
+            self.canvas.restore_region(self._backgrounds[ax])
+            for artist in self.animated[ax]:
+                ax.draw_artist(artist)
+            self.canvas.blit(ax.bbox)
     
     def _update_plots(self):
         """Update all plots with current data"""
         try:
-            # Get current system state
+            # Get current system state (snapshots, no processor locks)
             state = self.monitor.get_system_state()
-            metrics = self.monitor.get_all_metrics()
+            loads = self.monitor.get_loads()
+            queue_lengths = self.monitor.get_queue_lengths()
             
             # Debug: Print metrics to console (can be removed later)
-            if len(metrics) > 0:
-                debug_info = ", ".join([f"P{m['processor_id']}: L={m['current_load']:.1f}%, Q={m['queue_length']}" 
-                                      for m in metrics])
+            if loads and not self.heatmap_mode:
                 # Only print occasionally to avoid spam
                 if hasattr(self, '_last_debug_print'):
                     if time.time() - self._last_debug_print > 2.0:  # Print every 2 seconds
+                        debug_info = ", ".join([f"P{proc_id}: L={load:.1f}%, Q={q_len}" for proc_id, load, q_len
+                                                in zip(self.processor_ids, loads, queue_lengths)])
                         print(f"[DEBUG] Metrics: {debug_info}")
                         self._last_debug_print = time.time()
                 else:
@@ -163,130 +324,86 @@ class LoadBalancerGUI:
             
             # Update history
             current_time = time.time()
-            if not self.time_history:
+            if self.start_time is None:
                 self.start_time = current_time
             self.time_history.append(current_time)
             self.avg_load_history.append(state['average_load'])
             self.variance_history.append(state['load_variance'])
             
-            for metric in metrics:
-                proc_id = metric['processor_id']
+            for proc_id, load in zip(self.processor_ids, loads):
                 if proc_id not in self.load_history:
                     self.load_history[proc_id] = deque(maxlen=50)
-                self.load_history[proc_id].append(metric['current_load'])
+                self.load_history[proc_id].append(load)
         except Exception as e:
             print(f"Error getting metrics: {e}")
             import traceback
             traceback.print_exc()
             return
         
-        # Clear all axes
-        try:
-            self.ax1.clear()
-            self.ax2.clear()
-            self.ax3.clear()
-            self.ax4.clear()
-        except Exception as e:
-            print(f"Error clearing axes: {e}")
-            return
+        changed_axes = [self.ax3, self.ax4]
+        full_redraw = self._backgrounds is None
         
-        # Get processor IDs once for both plots
-        if not metrics:
-            processor_ids = []
-        else:
-            processor_ids = [m['processor_id'] for m in metrics]
-        
-        # Plot 1: Current Processor Loads - Always show data
-        if not metrics or not processor_ids:
-            # No processors, show empty graph
-            self.ax1.text(0.5, 0.5, 'No Processors', ha='center', va='center', 
-                         transform=self.ax1.transAxes, fontsize=14)
-            self.ax1.set_title('Current Processor Load (%)', fontsize=12, fontweight='bold')
-            self.ax1.set_xlabel('Processor ID')
-            self.ax1.set_ylabel('Load (%)')
-            self.ax1.set_ylim(0, 100)
-        else:
-            current_loads = [max(m['current_load'], 0.1) for m in metrics]  # Minimum 0.1% for visibility
-            colors = ['green' if load < 50 else 'orange' if load < 80 else 'red' 
-                     for load in current_loads]
-            
-            # Always show bars with minimum height for visibility
-            bars = self.ax1.bar(processor_ids, current_loads, color=colors, alpha=0.8, 
-                               edgecolor='black', linewidth=1.5, width=0.7)
-            self.ax1.set_title('Current Processor Load (%)', fontsize=12, fontweight='bold')
-            self.ax1.set_xlabel('Processor ID')
-            self.ax1.set_ylabel('Load (%)')
-            self.ax1.set_ylim(0, 100)
-            self.ax1.grid(True, alpha=0.3, axis='y', linestyle='--')
-            self.ax1.set_xticks(processor_ids)
-            
-            # Add value labels on bars (always show with actual values)
-            for proc_id, load, orig_load in zip(processor_ids, current_loads, [m['current_load'] for m in metrics]):
-                label_y = max(load + 3, 5)  # At least 5 pixels high for visibility
-                # Show actual load value (even if 0)
-                self.ax1.text(proc_id, label_y, f'{orig_load:.1f}%', 
-                             ha='center', va='bottom', fontsize=10, fontweight='bold',
-                             bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.7))
-        
-        # Plot 2: Queue Lengths - Always show data
-        if not metrics or not processor_ids:
-            # No processors, show empty graph
-            self.ax2.text(0.5, 0.5, 'No Processors', ha='center', va='center', 
-                         transform=self.ax2.transAxes, fontsize=14)
-            self.ax2.set_title('Task Queue Lengths', fontsize=12, fontweight='bold')
-            self.ax2.set_xlabel('Processor ID')
-            self.ax2.set_ylabel('Queue Length')
-            self.ax2.set_ylim(0, 10)
-        else:
-            queue_lengths = [m['queue_length'] for m in metrics]
-            # Use minimum height for visibility (0.1 for empty queues)
-            display_lengths = [max(q_len, 0.1) for q_len in queue_lengths]
-            max_queue = max(queue_lengths) if queue_lengths else 0
-            y_max = max(5, max_queue + 2)  # Ensure minimum range for visibility (at least 5)
-            self.ax2.bar(processor_ids, display_lengths, color='blue', alpha=0.8, 
-                        edgecolor='black', linewidth=1.5, width=0.7)
-            self.ax2.set_title('Task Queue Lengths', fontsize=12, fontweight='bold')
-            self.ax2.set_xlabel('Processor ID')
-            self.ax2.set_ylabel('Queue Length')
-            self.ax2.set_ylim(0, y_max)
-            self.ax2.grid(True, alpha=0.3, linestyle='--')
-            self.ax2.set_xticks(processor_ids)
-            
-            # Add value labels on bars (always show with actual values)
-            for proc_id, q_len in zip(processor_ids, queue_lengths):
-                label_y = max(q_len + 0.3, 0.5)  # At least 0.5 for visibility
-                # Show actual queue length (even if 0)
-                self.ax2.text(proc_id, label_y, str(q_len), 
-                             ha='center', va='bottom', fontsize=10, fontweight='bold',
-                             bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.7))
-        
-        # Plot 3: Average Load Over Time
-        if len(self.time_history) > 1:
-            time_diffs = [(t - self.start_time) for t in self.time_history]
-            self.ax3.plot(time_diffs, list(self.avg_load_history), 'b-', linewidth=2, label='Average Load')
-            self.ax3.set_title('Average System Load Over Time', fontsize=12, fontweight='bold')
-            self.ax3.set_xlabel('Time (seconds)')
-            self.ax3.set_ylabel('Load (%)')
-            self.ax3.set_ylim(0, 100)
-            self.ax3.legend()
-            self.ax3.grid(True, alpha=0.3)
-        
-        # Plot 4: Load Variance Over Time
-        if len(self.time_history) > 1:
-            time_diffs = [(t - self.start_time) for t in self.time_history]
-            self.ax4.plot(time_diffs, list(self.variance_history), 'r-', linewidth=2, label='Load Variance')
-            threshold = self.monitor.rebalance_threshold * 100
-            self.ax4.axhline(y=threshold, color='g', linestyle='--', linewidth=2, label=f'Threshold ({threshold:.0f}%)')
-            self.ax4.set_title('Load Variance Over Time', fontsize=12, fontweight='bold')
-            self.ax4.set_xlabel('Time (seconds)')
-            self.ax4.set_ylabel('Variance (%)')
+        # Plots 1 and 2: only touched when some processor changed
+        if loads and loads != self._last_loads:
+            self._last_loads = loads
+            changed_axes.append(self.ax1)
+            if self.heatmap_mode:
+                self.grid_cells[:len(loads)] = loads
+                self.load_image.set_data(self.grid_cells.reshape(self.load_image.get_array().shape))
+            else:
+                for i, load in enumerate(loads):
+                    bar = self.load_bars[i]
+                    bar.set_height(max(load, 0.1))  # Minimum 0.1% for visibility
+                    bar.set_facecolor('green' if load < 50 else 'orange' if load < 80 else 'red')
+                    if self.load_texts:
+                        label = self.load_texts[i]
+                        label.set_y(max(load + 3, 5))  # At least 5 high for visibility
+                        label.set_text(f'{load:.1f}%')
+        
+        if queue_lengths and queue_lengths != self._last_queue_lengths:
+            self._last_queue_lengths = queue_lengths
+            changed_axes.append(self.ax2)
+            if self.heatmap_mode:
+                self.grid_cells[:len(queue_lengths)] = queue_lengths
+                self.queue_image.set_data(self.grid_cells.reshape(self.queue_image.get_array().shape))
+            else:
+                # Grow the y range right away, shrink it only once it is mostly empty
+                max_queue = max(queue_lengths)
+                if max_queue + 2 > self.queue_ylim or max(5, 2 * (max_queue + 2)) < self.queue_ylim:
+                    self.queue_ylim = max(5, max_queue + 2)
+                    self.ax2.set_ylim(0, self.queue_ylim)
+                    full_redraw = True
+                for i, q_len in enumerate(queue_lengths):
+                    self.queue_bars[i].set_height(max(q_len, 0.1))
+                    if self.queue_texts:
+                        label = self.queue_texts[i]
+                        label.set_y(max(q_len + 0.3, 0.5))  # At least 0.5 for visibility
+                        label.set_text(str(q_len))
+        
+        # Plots 3 and 4: scroll the time window once the data reaches its end
+        time_diffs = [(t - self.start_time) for t in self.time_history]
+        if time_diffs[-1] > self.ax3.get_xlim()[1]:
+            left = time_diffs[-1] - 0.75 * self.HISTORY_WINDOW
+            for ax in (self.ax3, self.ax4):
+                ax.set_xlim(left, left + self.HISTORY_WINDOW)
+            full_redraw = True
+        self.avg_line.set_data(time_diffs, self.avg_load_history)
+        self.variance_line.set_data(time_diffs, self.variance_history)
+        
+        threshold = self.monitor.rebalance_threshold * 100
+        if threshold != self.threshold_shown:
+            self.threshold_shown = threshold
+            self.threshold_line.set_ydata([threshold, threshold])
+            self.threshold_line.set_label(f'Threshold ({threshold:.0f}%)')
             self.ax4.legend()
-            self.ax4.grid(True, alpha=0.3)
+            full_redraw = True
         
         try:
-            self.fig.tight_layout()
-            # Use draw_idle for non-blocking updates
-            self.canvas.draw_idle()
+            if full_redraw:
+                # Axes changed: redraw everything, _on_draw re-captures the backgrounds
+                self.canvas.draw()
+            else:
+                self._blit(changed_axes)
         except Exception as e:
             print(f"Error drawing canvas: {e}")
         
@@ -304,39 +421,16 @@ class LoadBalancerGUI:
             print(f"Error updating metrics label: {e}")
     
     def _update_loop(self):
-        """Background thread to update plots and process tasks - Optimized to prevent hanging"""
+        """Background thread to rebalance and refresh plots (tasks run on the worker pool)"""
         last_rebalance = time.time()
         last_plot_update = time.time()
         rebalance_interval = 2.0  # Check every 2 seconds
         plot_update_interval = 0.5  # Update plots every 0.5 seconds (reduced for performance)
         
-        # Keep track of processing threads to ensure continuous processing
-        processing_threads = {}
-        
         while self.running:
             try:
                 current_time = time.time()
                 
-                # Process tasks on all processors continuously
-                for processor in self.processors:
-                    if processor.get_queue_length() > 0:
-                        # Check if processor is already processing (get minimal info)
-                        proc_id = processor.processor_id
-                        metrics = processor.get_metrics()
-                        
-                        # Only start a new processing thread if not already processing
-                        if not metrics['is_processing']:
-                            # Check if we already have a thread for this processor
-                            if proc_id not in processing_threads or not processing_threads[proc_id].is_alive():
-                                # Start processing in a separate thread
-                                thread = threading.Thread(
-                                    target=self._process_continuously,
-                                    args=(processor,),
-                                    daemon=True
-                                )
-                                thread.start()
-                                processing_threads[proc_id] = thread
-                
                 # Periodic rebalancing
                 if current_time - last_rebalance >= rebalance_interval:
                     if self.monitor.detect_imbalance():
@@ -357,26 +451,6 @@ class LoadBalancerGUI:
                 print(f"Error in update loop: {e}")
                 time.sleep(0.5)  # Wait a bit before retrying
     
-    def _process_continuously(self, processor):
-        """Continuously process tasks on a processor until queue is empty - Optimized"""
-        while self.running:
-            try:
-                queue_length = processor.get_queue_length()
-                if queue_length > 0:
-                    # Check if already processing (get minimal metrics)
-                    metrics = processor.get_metrics()
-                    if not metrics['is_processing']:
-                        # Process task
-                        processor.process_task(processing_time=0.5)
-                    else:
-                        time.sleep(0.1)  # Wait if already processing
-                else:
-                    # Queue empty, exit this thread (new one will be created if needed)
-                    break
-            except Exception as e:
-                print(f"Error processing task on Processor {processor.processor_id}: {e}")
-                break  # Exit thread on error, will be recreated if needed
-    
     def run(self):
         """Start the GUI main loop"""
         print("\n" + "="*60)
@@ -386,5 +460,6 @@ class LoadBalancerGUI:
         print("="*60 + "\n")
         self.root.mainloop()
         self.running = False
+        self.workers.stop(timeout=1.0)
         print("\n[GUI Closed] Shutting down...")
 
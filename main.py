@@ -11,10 +11,14 @@ Usage:
     python main.py
 
 Then click "Add Process" to add processes and watch them get distributed!
+Set HEADLESS = True to run without a window, fed by a synthetic workload
+and observed through the metrics endpoint.
 """
 
+import math
 import sys
 import os
+import time
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -22,7 +26,47 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from core.processor import Processor
 from core.monitor import SystemMonitor
 from core.load_balancer import LoadBalancer
-from gui.visualizer import LoadBalancerGUI
+from core.work_stealing import WorkStealer
+from core.policies import create_policy, HierarchicalPolicy
+from core.domains import ProcessorDomains
+from core.affinity import CoreUtilizationSampler, PinnedWorkerPool
+from core.load_models import create_load_model
+from core.workers import WorkerPool
+from core.workload import PoissonArrivals, WorkloadDriver
+from core.exporter import MetricsExporter
+
+
+def run_headless(monitor, load_balancer, processors, workers, arrival_rate):
+    """
+    Run without a GUI until interrupted (Ctrl+C)
+    
+    Args:
+        monitor: System monitor
+        load_balancer: Load balancer
+        processors: List of processors
+        workers: Worker pool to use (None creates a WorkerPool)
+        arrival_rate: Poisson arrivals per second submitted to the balancer
+    """
+    workers = workers or WorkerPool(processors, load_balancer, processing_time=0.5)
+    workers.start()
+    driver = None
+    if arrival_rate > 0:
+        driver = WorkloadDriver(load_balancer, PoissonArrivals(arrival_rate).generate(duration=math.inf))
+        driver.start()
+    
+    try:
+        while True:
+            time.sleep(2.0)  # Same cadence as the GUI's rebalancing loop
+            if monitor.detect_imbalance():
+                load_balancer.adaptive_threshold_adjustment()
+                load_balancer.rebalance_loads()
+            monitor.record_metrics()
+    except KeyboardInterrupt:
+        print("\n[Interrupted] Shutting down...")
+    finally:
+        if driver is not None:
+            driver.stop(timeout=1.0)
+        workers.stop(timeout=1.0)
 
 
 def main():
@@ -42,10 +86,26 @@ def main():
     
     # Configuration
     NUM_PROCESSORS = 4  # Number of processors
+    PROCESSOR_SPEEDS = [1.0] * NUM_PROCESSORS  # Relative speeds, e.g. [2.0, 1.0, 1.0, 0.5]
+    # Load model: outstanding_work or queue_heuristic (the original formula);
+    # the measured model is only available through PIN_WORKERS below
+    LOAD_MODEL = "outstanding_work"
+    WORK_STEALING = False  # Let idle processors steal from busy peers
+    # Scheduling policy: least_loaded, round_robin, random, power_of_d,
+    # join_shortest_queue or least_expected_work
+    SCHEDULING_POLICY = "least_loaded"
+    OVERFLOW_QUEUE_SIZE = 100  # Tasks held centrally while every processor is full
+    DOMAIN_SIZE = 0  # Processors per domain for two-level balancing (0 = flat)
+    PIN_WORKERS = False  # Pin each processor's worker to a core and blend in measured utilization (Linux)
+    HEADLESS = False  # Run without the GUI (stop with Ctrl+C)
+    HEADLESS_ARRIVAL_RATE = 4.0  # Tasks per second submitted in headless mode
+    METRICS_PORT = 0  # OpenMetrics/Prometheus endpoint at http://host:port/metrics (0 = off)
+    METRICS_HOST = "127.0.0.1"  # Interface for the endpoint ("0.0.0.0" lets other hosts scrape)
     
     # Create processors
     print(f"Creating {NUM_PROCESSORS} processors...")
-    processors = [Processor(i) for i in range(NUM_PROCESSORS)]
+    processors = [Processor(i, speed=speed, load_model=create_load_model(LOAD_MODEL))
+                  for i, speed in enumerate(PROCESSOR_SPEEDS)]
     
     # Create system monitor
     print("Setting up system monitor...")
@@ -53,26 +113,66 @@ def main():
     
     # Create load balancer
     print("Initializing load balancer...")
-    load_balancer = LoadBalancer(processors, monitor)
+    work_stealer = WorkStealer(processors, monitor) if WORK_STEALING else None
+    domains = ProcessorDomains.partition(processors, DOMAIN_SIZE) if DOMAIN_SIZE else None
+    policy = HierarchicalPolicy(domains) if domains else create_policy(SCHEDULING_POLICY)
+    load_balancer = LoadBalancer(processors, monitor, work_stealer=work_stealer,
+                                 policy=policy, overflow_queue_size=OVERFLOW_QUEUE_SIZE,
+                                 domains=domains)
+    
+    # Pinned workers: one core per processor, loads fed by /proc/stat samples
+    workers = None
+    if PIN_WORKERS:
+        workers = PinnedWorkerPool(processors, load_balancer, processing_time=0.5,
+                                   sampler=CoreUtilizationSampler(interval=1.0))
     
     # Print initial state
     print("\nSystem initialized!")
     print(f"Processors: {NUM_PROCESSORS}")
     print(f"Rebalance threshold: {monitor.rebalance_threshold * 100}%")
-    print("\n" + "="*60)
-    print("Starting GUI...")
-    print("="*60)
-    print("\nInstructions:")
-    print("  - Click 'Add Process' to add 1 process")
-    print("  - Click 'Add 5 Processes' to add multiple processes at once")
-    print("  - Tasks will process continuously until queue is empty")
-    print("  - Watch the graphs update in real-time")
-    print("  - Close the window to exit")
-    print("\n")
+    print(f"Scheduling policy: {policy.name}")
+    if domains:
+        print(f"Domains: {len(domains.domains)} of up to {DOMAIN_SIZE} processors")
+    print(f"Load model: {LOAD_MODEL}")
+    if workers:
+        print(f"Workers pinned to cores: {workers.cores}")
+    
+    # Metrics endpoint, served from a snapshot refreshed every second
+    exporter = None
+    if METRICS_PORT:
+        exporter = MetricsExporter(monitor, load_balancer, host=METRICS_HOST, port=METRICS_PORT)
+        try:
+            exporter.start()
+            print(f"Metrics: http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+        except OSError as e:
+            print(f"Metrics endpoint disabled: cannot listen on {METRICS_HOST}:{METRICS_PORT} ({e})")
+            exporter = None
     
-    # Create and run GUI
-    gui = LoadBalancerGUI(monitor, load_balancer, processors)
-    gui.run()
+    try:
+        if HEADLESS:
+            print("\n" + "="*60)
+            print(f"Running headless ({HEADLESS_ARRIVAL_RATE} tasks/s). Press Ctrl+C to stop.")
+            print("="*60 + "\n")
+            run_headless(monitor, load_balancer, processors, workers, HEADLESS_ARRIVAL_RATE)
+        else:
+            print("\n" + "="*60)
+            print("Starting GUI...")
+            print("="*60)
+            print("\nInstructions:")
+            print("  - Click 'Add Process' to add 1 process")
+            print("  - Click 'Add 5 Processes' to add multiple processes at once")
+            print("  - Tasks will process continuously until queue is empty")
+            print("  - Watch the graphs update in real-time")
+            print("  - Close the window to exit")
+            print("\n")
+            
+            # Create and run GUI (imported here so headless hosts need no Tk)
+            from gui.visualizer import LoadBalancerGUI
+            gui = LoadBalancerGUI(monitor, load_balancer, processors, workers=workers)
+            gui.run()
+    finally:
+        if exporter is not None:
+            exporter.stop()
     
     # Print final statistics
     print("\n" + "="*60)
@@ -0,0 +1,129 @@
+"""
+Tests: Admission Queue
+
+Checks the bounded overflow queue on its own (FIFO order, push_front,
+backpressure, wait statistics) and as used by LoadBalancer.try_submit
+and drain_overflow.
+
+Usage:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.admission import AdmissionQueue
+from core.load_balancer import LoadBalancer, Task
+from core.monitor import SystemMonitor
+from core.processor import Processor
+
+
+class FakeClock:
+    """Manually advanced time source"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class AdmissionQueueTest(unittest.TestCase):
+    """The queue on its own"""
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        self.queue = AdmissionQueue(maxsize=5, clock=self.clock)
+    
+    def test_fifo_order(self):
+        tasks = [Task(i) for i in range(5)]
+        for task in tasks:
+            self.assertTrue(self.queue.try_put(task))
+        popped = self.queue.pop_batch(3) + self.queue.pop_batch(10)
+        self.assertEqual([task for task, _ in popped], tasks)
+        self.assertEqual(len(self.queue), 0)
+        self.assertEqual(self.queue.pop_batch(1), [])
+    
+    def test_push_front_keeps_order(self):
+        tasks = [Task(i) for i in range(5)]
+        for task in tasks:
+            self.queue.try_put(task)
+        batch = self.queue.pop_batch(3)
+        self.queue.push_front(batch[1:])  # First entry placed, the rest returned
+        remaining = self.queue.pop_batch(10)
+        self.assertEqual([task for task, _ in remaining], tasks[1:])
+    
+    def test_full_queue_rejects(self):
+        for i in range(5):
+            self.assertTrue(self.queue.try_put(Task(i)))
+        self.assertFalse(self.queue.try_put(Task('extra')))
+        self.assertFalse(self.queue.put(Task('late'), timeout=0.01))
+        stats = self.queue.get_statistics()
+        self.assertEqual(stats['overflow_depth'], 5)
+        self.assertEqual(stats['overflow_enqueued'], 5)
+        self.assertEqual(stats['overflow_rejected'], 2)
+    
+    def test_blocked_put_wakes_on_admission(self):
+        for i in range(5):
+            self.queue.try_put(Task(i))
+        results = []
+        submitter = threading.Thread(target=lambda: results.append(self.queue.put(Task('blocked'), timeout=5)))
+        submitter.start()
+        
+        self.queue.record_admitted(self.queue.pop_batch(1))
+        submitter.join(timeout=5)
+        self.assertEqual(results, [True])
+        self.assertEqual(len(self.queue), 5)
+    
+    def test_wait_statistics(self):
+        first, second = Task(1), Task(2)
+        self.queue.try_put(first)
+        self.clock.now = 1.0
+        self.queue.try_put(second)
+        self.assertEqual(first.enqueued_at, 0.0)
+        
+        self.clock.now = 3.0
+        self.queue.record_admitted(self.queue.pop_batch(2))
+        stats = self.queue.get_statistics()
+        self.assertAlmostEqual(stats['average_queueing_delay'], 2.5)
+        self.assertAlmostEqual(stats['max_queueing_delay'], 3.0)
+
+
+class OverflowBalancerTest(unittest.TestCase):
+    """Overflow handling in the load balancer"""
+    
+    def setUp(self):
+        self.processors = [Processor(i, max_queue_size=2) for i in range(2)]
+        self.balancer = LoadBalancer(self.processors, SystemMonitor(self.processors),
+                                     overflow_queue_size=3)
+    
+    def test_overflow_drains_in_order(self):
+        tasks = [Task(i) for i in range(8)]
+        accepted = [self.balancer.try_submit(task) for task in tasks]
+        self.assertEqual(accepted, [True] * 7 + [False])
+        self.assertEqual(len(self.balancer.overflow), 3)
+        
+        # Freeing one slot admits the oldest waiting task only
+        self.processors[1].start_task()
+        placements = self.balancer.drain_overflow()
+        self.assertEqual(placements, [(tasks[4], self.processors[1])])
+        self.assertEqual([task for task, _ in self.balancer.overflow.pop_batch(10)], tasks[5:7])
+    
+    def test_new_task_does_not_overtake(self):
+        for i in range(5):
+            self.balancer.try_submit(Task(i))
+        self.processors[0].start_task()
+        late = Task('late')
+        self.assertTrue(self.balancer.try_submit(late))
+        # The waiting task took the freed slot; the new one queued behind
+        self.assertEqual(self.balancer.overflow.pop_batch(10)[0][0], late)
+
+
+if __name__ == "__main__":
+    unittest.main()
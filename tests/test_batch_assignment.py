@@ -0,0 +1,126 @@
+"""
+Tests: Batch Assignment
+
+Checks the water-filling placement behind LoadBalancer.assign_tasks:
+every task is placed or rejected exactly once, shares respect capacity,
+and queues end up level relative to processor speed.
+
+Usage:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.load_balancer import LoadBalancer, Task
+from core.monitor import SystemMonitor
+from core.processor import Processor
+
+
+def make_balancer(processors):
+    return LoadBalancer(processors, SystemMonitor(processors))
+
+
+class WaterFillTest(unittest.TestCase):
+    """Shares computed by _water_fill from completion times"""
+    
+    def setUp(self):
+        self.balancer = make_balancer([Processor(i) for i in range(4)])
+    
+    def fill_queues(self, queue_lengths, count, slot=0.5):
+        """Water-fill queues of equal-cost tasks on baseline-speed processors"""
+        return self.balancer._water_fill([q * slot for q in queue_lengths], [slot] * len(queue_lengths),
+                                         [10 - q for q in queue_lengths], count)
+    
+    def test_shares_sum_to_count(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            completion_times = [rng.uniform(0.0, 5.0) for _ in range(4)]
+            slot_times = [rng.uniform(0.05, 1.0) for _ in range(4)]
+            free_slots = [rng.randint(0, 10) for _ in range(4)]
+            count = rng.randint(0, 45)
+            shares = self.balancer._water_fill(completion_times, slot_times, free_slots, count)
+            self.assertEqual(sum(shares), min(count, sum(free_slots)))
+            for share, free in zip(shares, free_slots):
+                self.assertGreaterEqual(share, 0)
+                self.assertLessEqual(share, free)
+    
+    def test_shortest_queues_filled_first(self):
+        shares = self.fill_queues([5, 0, 2, 7], 6)
+        self.assertEqual(shares, [0, 4, 2, 0])  # Levels 5, 4, 4, 7
+        shares = self.fill_queues([5, 0, 2, 7], 9)
+        # Level 5 takes 8, the last task breaks the tie by position
+        self.assertEqual([q + s for q, s in zip([5, 0, 2, 7], shares)], [6, 5, 5, 7])
+    
+    def test_completion_time_not_queue_length(self):
+        # One long task outweighs five short ones
+        shares = self.balancer._water_fill([2.0, 0.5, 0.0, 0.0], [0.5] * 4, [9, 5, 10, 10], 8)
+        self.assertEqual(shares, [0, 2, 3, 3])
+    
+    def test_faster_processor_takes_more(self):
+        shares = self.balancer._water_fill([0.0, 0.0], [0.25, 0.5], [20, 10], 12)
+        self.assertEqual(shares, [8, 4])
+
+
+class AssignTasksTest(unittest.TestCase):
+    """assign_tasks placements and rejections"""
+    
+    def test_balanced_placement(self):
+        processors = [Processor(i) for i in range(4)]
+        balancer = make_balancer(processors)
+        tasks = [Task(i) for i in range(18)]
+        placements, rejected = balancer.assign_tasks(tasks)
+        
+        self.assertEqual(len(placements), 18)
+        self.assertEqual(rejected, [])
+        self.assertEqual(sorted(len(p.task_queue) for p in processors), [4, 4, 5, 5])
+        self.assertTrue(all(task.assigned_processor is processor for task, processor in placements))
+        self.assertEqual(balancer.total_tasks_assigned, 18)
+    
+    def test_overflowing_batch_is_rejected_once(self):
+        processors = [Processor(i, max_queue_size=3) for i in range(3)]
+        balancer = make_balancer(processors)
+        processors[0].add_task(Task('existing'))
+        tasks = [Task(i) for i in range(12)]
+        placements, rejected = balancer.assign_tasks(tasks)
+        
+        self.assertEqual(len(placements), 8)
+        self.assertEqual(len(rejected), 4)
+        placed = {id(task) for task, _ in placements}
+        self.assertFalse(placed & {id(task) for task in rejected})
+        self.assertEqual(len(placed) + len(rejected), len(tasks))
+        self.assertTrue(all(len(p.task_queue) == 3 for p in processors))
+    
+    def test_batch_follows_expected_completion_time(self):
+        processors = [Processor(i) for i in range(2)]
+        balancer = make_balancer(processors)
+        processors[0].add_task(Task('big', estimated_cost=4.0))
+        processors[1].add_tasks([Task(i, estimated_cost=0.5) for i in range(4)])
+        placements, rejected = balancer.assign_tasks([Task(i, estimated_cost=0.5) for i in range(6)])
+        
+        # 4 s vs 2 s of work: the longer queue finishes first and catches up,
+        # then the last two tasks split evenly
+        self.assertEqual(rejected, [])
+        self.assertEqual([len(p.task_queue) for p in processors], [2, 9])
+    
+    def test_free_slots_cap_the_share(self):
+        processors = [Processor(0, max_queue_size=3), Processor(1)]
+        balancer = make_balancer(processors)
+        processors[1].add_task(Task('big', estimated_cost=4.0))
+        placements, rejected = balancer.assign_tasks([Task(i) for i in range(6)])
+        self.assertEqual(rejected, [])
+        self.assertEqual([len(p.task_queue) for p in processors], [3, 4])
+    
+    def test_empty_batch(self):
+        balancer = make_balancer([Processor(i) for i in range(2)])
+        self.assertEqual(balancer.assign_tasks([]), ([], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
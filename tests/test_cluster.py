@@ -0,0 +1,253 @@
+"""
+Tests: Cluster Mode
+
+Runs a coordinator with several processor agents on localhost and checks
+dispatch, completion, migration by revoke, stealing from a
+RemoteProcessor and the handling of a lost agent.
+
+Usage:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.cluster import ClusterCoordinator, RemoteProcessor
+from core.monitor import SystemMonitor
+from core.load_balancer import LoadBalancer, Task
+from core.processor import Processor
+
+
+def wait_until(condition, timeout=10.0):
+    """Poll condition until it holds or timeout seconds pass"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class TrackedTasks:
+    """Tasks whose completions are counted, to catch lost or duplicated runs"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.completions = {}  # task_id -> number of times the task completed
+    
+    def make(self, task_id, *args, **kwargs) -> Task:
+        task = Task(task_id, *args, **kwargs)
+        task.add_done_callback(self._on_done)
+        return task
+    
+    def _on_done(self, task: Task):
+        with self.lock:
+            self.completions[task.task_id] = self.completions.get(task.task_id, 0) + 1
+    
+    def count(self) -> int:
+        with self.lock:
+            return len(self.completions)
+
+
+class ClusterTest(unittest.TestCase):
+    """Three agents with two processors each, shared by the tests below"""
+    
+    AGENTS = 3
+    PROCESSORS_PER_AGENT = 2
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.coordinator = ClusterCoordinator()
+        cls.coordinator.start()
+        cls.coordinator.launch_local_agents(cls.AGENTS, processors_per_agent=cls.PROCESSORS_PER_AGENT,
+                                            max_queue_size=20, processing_time=0.05)
+        cls.processors = cls.coordinator.wait_for_agents(cls.AGENTS, timeout=30)
+        cls.listener_counts = [len(p._load_listeners) for p in cls.processors]
+    
+    @classmethod
+    def tearDownClass(cls):
+        cls.coordinator.shutdown()
+    
+    def setUp(self):
+        self.monitor = SystemMonitor(self.processors)
+        self.load_balancer = LoadBalancer(self.processors, self.monitor)
+        self.tasks = TrackedTasks()
+    
+    def tearDown(self):
+        # The proxies outlive this test's monitor; stop feeding it
+        self.monitor.detach()
+        self.assertEqual([len(p._load_listeners) for p in self.processors], self.listener_counts)
+    
+    def wait_idle(self):
+        """Wait until every proxy has drained its mirror"""
+        self.assertTrue(wait_until(lambda: all(not p.task_queue and p.current_task is None
+                                               for p in self.processors)))
+    
+    def test_agents_joined(self):
+        self.assertEqual(len(self.processors), self.AGENTS * self.PROCESSORS_PER_AGENT)
+        self.assertEqual([p.processor_id for p in self.processors], list(range(len(self.processors))))
+        self.assertTrue(all(isinstance(p, RemoteProcessor) and p.online for p in self.processors))
+    
+    def test_dispatch_and_completion(self):
+        tasks = [self.tasks.make(i, os.getpid) if i % 2 else self.tasks.make(i, service_time=0.02)
+                 for i in range(30)]
+        placed, rejected = self.load_balancer.assign_tasks(tasks)
+        self.assertEqual((len(placed), len(rejected)), (30, 0))
+        
+        self.assertTrue(wait_until(lambda: self.tasks.count() == 30))
+        self.wait_idle()
+        self.assertTrue(all(count == 1 for count in self.tasks.completions.values()))
+        self.assertTrue(all(task.error is None for task in tasks))
+        
+        # Callables ran in the agent processes, not here
+        agent_pids = {process.pid for process in self.coordinator.agent_processes}
+        pids = {task.result for task in tasks if task.func is not None}
+        self.assertTrue(pids <= agent_pids)
+        self.assertNotIn(os.getpid(), pids)
+        self.assertGreater(len(pids), 1)
+        
+        # Results and timings came back for every task
+        self.assertTrue(all(task.started_at is not None and task.finished_at is not None for task in tasks))
+        self.assertEqual(self.monitor.get_system_state()['total_queue_length'], 0)
+    
+    def test_migration_by_revoke(self):
+        source = self.processors[0]
+        tasks = [self.tasks.make(i, service_time=0.5) for i in range(20)]
+        self.assertEqual(source.add_tasks(tasks), 20)
+        self.assertTrue(wait_until(lambda: source.current_task is not None))
+        self.assertGreater(self.monitor.count_overloaded(70.0), 0)
+        
+        self.load_balancer.rebalance_loads()
+        migrated = sum(task.migration_count for task in tasks)
+        self.assertGreater(migrated, 0)
+        self.assertLess(len(source.task_queue), 19)
+        
+        # Every task ran exactly once, wherever it ended up
+        self.assertTrue(wait_until(lambda: self.tasks.count() == 20))
+        self.wait_idle()
+        self.assertTrue(all(count == 1 for count in self.tasks.completions.values()))
+    
+    def test_revoke_runs_without_processor_locks(self):
+        source, target = self.processors[3], self.processors[4]
+        tasks = [self.tasks.make(i, service_time=0.2) for i in range(10)]
+        self.assertEqual(source.add_tasks(tasks), 10)
+        self.assertTrue(wait_until(lambda: source.current_task is not None))
+        
+        # Another thread must be able to take both locks while the agent answers
+        free_during_revoke = []
+        connection = source.connection
+        
+        def probe():
+            for processor in (source, target):
+                acquired = processor.lock.acquire(timeout=0.5)
+                if acquired:
+                    processor.lock.release()
+                free_during_revoke.append(acquired)
+        
+        def revoke(processor, candidates):
+            prober = threading.Thread(target=probe)
+            prober.start()
+            prober.join()
+            return type(connection).revoke(connection, processor, candidates)
+        
+        connection.revoke = revoke
+        try:
+            migrated = self.load_balancer.migration_planner.execute([(source, target, 4)])
+        finally:
+            del connection.revoke
+        self.assertEqual(free_during_revoke, [True, True])
+        self.assertGreater(migrated, 0)
+        
+        self.assertTrue(wait_until(lambda: self.tasks.count() == 10))
+        self.wait_idle()
+        self.assertTrue(all(count == 1 for count in self.tasks.completions.values()))
+    
+    def test_steal_tasks(self):
+        victim, thief = self.processors[1], self.processors[2]
+        tasks = [self.tasks.make(i, service_time=0.1) for i in range(10)]
+        self.assertEqual(victim.add_tasks(tasks), 10)
+        self.assertTrue(wait_until(lambda: victim.current_task is not None))
+        
+        stolen = victim.steal_tasks(4)
+        self.assertEqual(len(stolen), 4)
+        self.assertEqual(stolen, tasks[-4:])  # Taken from the tail, in queue order
+        self.assertTrue(all(task not in victim.task_queue for task in stolen))
+        self.assertEqual(thief.add_tasks(stolen), 4)
+        
+        self.assertTrue(wait_until(lambda: self.tasks.count() == 10))
+        self.wait_idle()
+        self.assertTrue(all(count == 1 for count in self.tasks.completions.values()))
+        self.assertGreaterEqual(thief.total_tasks_completed, 4)
+
+
+class OutOfOrderEventsTest(unittest.TestCase):
+    """Mirror bookkeeping for events applied without a network"""
+    
+    def test_completion_leaves_next_running_task_alone(self):
+        proxy = RemoteProcessor(0, connection=None, index=0)
+        first, second = Task(1, service_time=0.1), Task(2, service_time=0.1)
+        Processor.add_tasks(proxy, [first, second])  # Fill the mirror without dispatching
+        
+        proxy._on_started(first)
+        proxy._on_started(second)
+        proxy._on_completed(first, 0.1, None, None)
+        
+        self.assertTrue(first.done)
+        self.assertIs(proxy.current_task, second)
+        self.assertTrue(proxy.is_processing)
+        self.assertGreater(proxy.current_load, 0.0)
+        
+        proxy._on_completed(second, 0.1, None, None)
+        self.assertIsNone(proxy.current_task)
+        self.assertFalse(proxy.is_processing)
+        self.assertEqual(proxy.total_tasks_completed, 2)
+
+
+class LostAgentTest(unittest.TestCase):
+    """An agent that dies with work queued"""
+    
+    def test_tasks_on_lost_agent_fail(self):
+        coordinator = ClusterCoordinator(heartbeat_timeout=0.5)
+        coordinator.start()
+        try:
+            coordinator.launch_local_agents(2, processing_time=0.05)
+            lost, survivor = coordinator.wait_for_agents(2, timeout=30)
+            
+            # Find the agent process hosting the proxy by asking it
+            probe = Task('pid', os.getpid)
+            self.assertTrue(lost.add_task(probe))
+            self.assertTrue(wait_until(lambda: probe.done))
+            agent = next(p for p in coordinator.agent_processes if p.pid == probe.result)
+            
+            tasks = [Task(i, service_time=1.0) for i in range(5)]
+            self.assertEqual(lost.add_tasks(tasks), 5)
+            self.assertTrue(wait_until(lambda: lost.current_task is not None))
+            agent.kill()
+            self.assertTrue(wait_until(lambda: not lost.online))
+            
+            # Queued and running tasks fail instead of hanging
+            self.assertTrue(all(task.done for task in tasks))
+            self.assertTrue(all(isinstance(task.error, ConnectionError) for task in tasks))
+            self.assertFalse(lost.task_queue)
+            self.assertIsNone(lost.current_task)
+            self.assertEqual(lost.current_load, 100.0)  # Placement avoids it
+            self.assertFalse(lost.add_task(Task('late')))
+            
+            # The other agent keeps working
+            self.assertTrue(survivor.online)
+            task = Task('after', service_time=0.01)
+            self.assertTrue(survivor.add_task(task))
+            self.assertTrue(wait_until(lambda: task.done))
+            self.assertIsNone(task.error)
+        finally:
+            coordinator.shutdown()
+
+if __name__ == "__main__":
+    unittest.main()
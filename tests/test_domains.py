@@ -0,0 +1,97 @@
+"""
+Tests: Processor Domains
+
+Checks the domain load heaps and the two-level rebalancing done by
+ProcessorDomains.rebalance: local moves first, cross-domain moves only
+when domain averages diverge.
+
+Usage:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.domains import ProcessorDomains
+from core.load_balancer import LoadBalancer, Task
+from core.monitor import SystemMonitor
+from core.processor import Processor
+
+
+def fill(processor, count):
+    processor.add_tasks([Task((processor.processor_id, i)) for i in range(count)])
+
+
+class DomainsTest(unittest.TestCase):
+    """Two domains of two processors each"""
+    
+    def setUp(self):
+        self.processors = [Processor(i) for i in range(4)]
+        self.domains = ProcessorDomains.partition(self.processors, 2)
+        self.first, self.second = self.domains.domains
+    
+    def queue_lengths(self):
+        return [len(p.task_queue) for p in self.processors]
+    
+    def test_partition(self):
+        self.assertEqual([d.processors for d in self.domains.domains],
+                         [self.processors[:2], self.processors[2:]])
+        self.assertIs(self.domains.domain_of(self.processors[3]), self.second)
+        with self.assertRaises(ValueError):
+            ProcessorDomains.partition(self.processors, 0)
+    
+    def test_domain_heaps_follow_loads(self):
+        fill(self.processors[3], 4)
+        self.assertIs(self.domains.get_most_loaded_domain(), self.second)
+        self.assertIs(self.domains.get_least_loaded_domain(), self.first)
+        fill(self.processors[0], 6)
+        self.assertIs(self.domains.get_most_loaded_domain(), self.first)
+        loads = self.domains.get_domain_loads()
+        self.assertAlmostEqual(loads['domain0'], self.first.get_average_load())
+        self.assertAlmostEqual(loads['domain1'], self.second.get_average_load())
+    
+    def test_rebalance_stays_inside_domain(self):
+        fill(self.processors[0], 10)
+        fill(self.processors[2], 5)
+        fill(self.processors[3], 5)
+        
+        migrated = self.domains.rebalance()
+        self.assertGreater(migrated, 0)
+        self.assertEqual(self.queue_lengths(), [5, 5, 5, 5])
+        stats = self.domains.get_statistics()
+        self.assertEqual(stats['intra_domain_migrations'], migrated)
+        self.assertEqual(stats['cross_domain_migrations'], 0)
+    
+    def test_rebalance_crosses_diverged_domains(self):
+        fill(self.processors[0], 10)
+        fill(self.processors[1], 10)
+        
+        migrated = self.domains.rebalance()
+        stats = self.domains.get_statistics()
+        self.assertEqual(stats['intra_domain_migrations'], 0)  # Both full: nothing to even out locally
+        self.assertEqual(stats['cross_domain_migrations'], migrated)
+        self.assertGreater(migrated, 0)
+        self.assertEqual(sum(self.queue_lengths()), 20)
+        self.assertGreater(min(self.queue_lengths()[2:]), 0)
+    
+    def test_no_crossing_below_threshold(self):
+        fill(self.processors[0], 3)
+        fill(self.processors[1], 3)  # Domain average about 27%, the other idle
+        self.assertEqual(self.domains.rebalance(), 0)
+        self.assertEqual(self.queue_lengths(), [3, 3, 0, 0])
+    
+    def test_balancer_with_domains(self):
+        monitor = SystemMonitor(self.processors)
+        balancer = LoadBalancer(self.processors, monitor, domains=self.domains)
+        for i in range(8):
+            self.assertTrue(balancer.assign_task(Task(i)))
+        self.assertEqual(self.queue_lengths(), [2, 2, 2, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
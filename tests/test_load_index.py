@@ -0,0 +1,139 @@
+"""
+Tests: Load Index
+
+Checks the addressable heap and the min/max processor index that the
+monitor keeps up to date from load listeners.
+
+Usage:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.load_balancer import Task
+from core.load_index import IndexedHeap, LoadIndex
+from core.monitor import SystemMonitor
+from core.processor import Processor
+
+
+class IndexedHeapTest(unittest.TestCase):
+    """Push, update and remove against a plain dict of priorities"""
+    
+    def test_peek_follows_updates(self):
+        heap = IndexedHeap()
+        for key, priority in enumerate([5, 3, 8, 1]):
+            heap.push(key, priority)
+        self.assertEqual(heap.peek(), 3)
+        
+        heap.update(3, 9)  # The top sinks
+        self.assertEqual(heap.peek(), 1)
+        heap.update(2, 0)  # A leaf rises to the top
+        self.assertEqual(heap.peek(), 2)
+        heap.push(1, 10)  # Pushing a present key updates it
+        self.assertEqual(len(heap), 4)
+        self.assertEqual(heap.peek(), 2)
+    
+    def test_random_updates_and_removals(self):
+        rng = random.Random(7)
+        heap = IndexedHeap()
+        priorities = {}
+        for key in range(50):
+            priorities[key] = rng.random()
+            heap.push(key, priorities[key])
+        
+        for step in range(500):
+            key = rng.choice(list(priorities))
+            if step % 10 == 0 and len(priorities) > 1:
+                heap.remove(key)
+                del priorities[key]
+                self.assertNotIn(key, heap)
+            else:
+                priorities[key] = rng.random()
+                heap.update(key, priorities[key])
+            self.assertEqual(heap.peek(), min(priorities, key=priorities.get))
+        self.assertEqual(len(heap), len(priorities))
+    
+    def test_empty_heap(self):
+        heap = IndexedHeap()
+        self.assertIsNone(heap.peek())
+        heap.push('only', 1)
+        heap.remove('only')
+        self.assertIsNone(heap.peek())
+
+
+class LoadIndexTest(unittest.TestCase):
+    """Least/most loaded lookups after processor load changes"""
+    
+    def setUp(self):
+        self.processors = [Processor(i) for i in range(4)]
+        self.index = LoadIndex(self.processors)
+        for processor in self.processors:
+            processor.add_load_listener(self.index.update)
+    
+    def assert_matches_scan(self):
+        loads = [p.current_load for p in self.processors]
+        least = min(self.processors, key=lambda p: p.current_load)
+        most = max(self.processors, key=lambda p: p.current_load)
+        self.assertIs(self.index.get_least_loaded(), least)
+        self.assertIs(self.index.get_most_loaded(), most)
+        self.assertEqual(self.index.get_load_range(), (min(loads), max(loads)))
+    
+    def test_ties_break_by_position(self):
+        self.assertIs(self.index.get_least_loaded(), self.processors[0])
+        self.assertIs(self.index.get_most_loaded(), self.processors[0])
+        self.assertEqual(self.index.get_load_range(), (0.0, 0.0))
+    
+    def test_min_max_after_updates(self):
+        self.processors[2].add_tasks([Task(i) for i in range(3)])
+        self.processors[1].add_task(Task('a'))
+        self.assert_matches_scan()
+        self.assertIs(self.index.get_most_loaded(), self.processors[2])
+        self.assertIs(self.index.get_least_loaded(), self.processors[0])
+        
+        # Draining the most loaded processor moves it to the bottom
+        self.processors[2].drain_tasks()
+        self.processors[0].add_task(Task('b'))
+        self.processors[3].add_task(Task('c'))
+        self.assert_matches_scan()
+        self.assertIs(self.index.get_least_loaded(), self.processors[2])
+    
+    def test_random_load_changes(self):
+        rng = random.Random(11)
+        for step in range(300):
+            processor = rng.choice(self.processors)
+            if processor.task_queue and rng.random() < 0.5:
+                processor.steal_tasks(1)
+            else:
+                processor.add_task(Task(step, service_time=rng.uniform(0.1, 1.0)))
+            self.assert_matches_scan()
+    
+    def test_custom_key(self):
+        queue_index = LoadIndex(self.processors, key=lambda p: len(p.task_queue))
+        for processor in self.processors:
+            processor.add_load_listener(queue_index.update)
+        self.processors[3].add_tasks([Task(i) for i in range(2)])
+        self.assertIs(queue_index.get_most_loaded(), self.processors[3])
+        self.assertEqual(queue_index.get_load_range(), (0, 2))
+
+
+class MonitorIndexTest(unittest.TestCase):
+    """SystemMonitor answers min/max lookups from its index"""
+    
+    def test_monitor_lookups(self):
+        processors = [Processor(i) for i in range(3)]
+        monitor = SystemMonitor(processors)
+        processors[0].add_tasks([Task(i) for i in range(4)])
+        processors[2].add_task(Task('x'))
+        self.assertIs(monitor.get_most_loaded_processor(), processors[0])
+        self.assertIs(monitor.get_least_loaded_processor(), processors[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
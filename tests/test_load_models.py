@@ -0,0 +1,107 @@
+"""
+Tests: Load Models
+
+Checks the work-based load model and that a processor with a full queue
+never wins least-loaded placement, however cheap its queued work is.
+
+Usage:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.load_balancer import LoadBalancer, Task
+from core.load_models import OutstandingWorkLoadModel, QueueHeuristicLoadModel, create_load_model
+from core.monitor import SystemMonitor
+from core.processor import Processor
+
+
+class OutstandingWorkModelTest(unittest.TestCase):
+    """Load from expected completion time"""
+    
+    def test_load_grows_with_work(self):
+        processor = Processor(0)  # Horizon: 11 x 0.5 s
+        loads = []
+        for i in range(9):
+            processor.add_task(Task(i))
+            loads.append(processor.current_load)
+        self.assertEqual(loads, sorted(loads))
+        self.assertAlmostEqual(loads[0], 0.5 / 5.5 * 100.0)
+    
+    def test_faster_processor_shows_less_load(self):
+        slow, fast = Processor(0), Processor(1, speed=2.0)
+        for processor in (slow, fast):
+            processor.add_tasks([Task(i) for i in range(4)])
+        self.assertAlmostEqual(fast.current_load, slow.current_load / 2)
+    
+    def test_fixed_horizon(self):
+        processor = Processor(0, load_model=OutstandingWorkLoadModel(horizon=2.0))
+        processor.add_task(Task(0, estimated_cost=1.0))
+        self.assertAlmostEqual(processor.current_load, 50.0)
+        processor.add_task(Task(1, estimated_cost=3.0))
+        self.assertEqual(processor.current_load, 100.0)
+
+
+class CreateLoadModelTest(unittest.TestCase):
+    """Selecting models by name"""
+    
+    def test_known_names(self):
+        self.assertIsInstance(create_load_model('outstanding_work', horizon=3.0), OutstandingWorkLoadModel)
+        self.assertIsInstance(create_load_model('queue_heuristic'), QueueHeuristicLoadModel)
+    
+    def test_unknown_name(self):
+        with self.assertRaises(ValueError):
+            create_load_model('nonsense')
+    
+    def test_measured_needs_sampler_and_core(self):
+        with self.assertRaisesRegex(ValueError, 'PIN_WORKERS'):
+            create_load_model('measured')
+
+
+class FullQueueTest(unittest.TestCase):
+    """A full queue reports 100% so placement moves on"""
+    
+    def test_full_queue_is_fully_loaded(self):
+        for model in (OutstandingWorkLoadModel(), QueueHeuristicLoadModel()):
+            processor = Processor(0, max_queue_size=3, load_model=model)
+            processor.add_tasks([Task(i, estimated_cost=0.01) for i in range(3)])
+            self.assertEqual(processor.current_load, 100.0)
+            processor.steal_tasks(1)
+            self.assertLess(processor.current_load, 100.0)
+    
+    def test_fast_small_processor_fills_then_overflows_to_peer(self):
+        processors = [Processor(0, max_queue_size=2, speed=4), Processor(1)]
+        balancer = LoadBalancer(processors, SystemMonitor(processors))
+        accepted = [balancer.assign_task(Task(i)) for i in range(8)]
+        self.assertEqual(accepted, [True] * 8)
+        self.assertEqual([len(p.task_queue) for p in processors], [2, 6])
+    
+    def test_cheap_tasks_fill_then_overflow_to_peer(self):
+        processors = [Processor(0), Processor(1)]
+        balancer = LoadBalancer(processors, SystemMonitor(processors))
+        processors[1].add_task(Task('big', estimated_cost=2.0))
+        accepted = [balancer.assign_task(Task(i, estimated_cost=0.01)) for i in range(15)]
+        self.assertEqual(accepted, [True] * 15)
+        self.assertEqual([len(p.task_queue) for p in processors], [10, 6])
+    
+    def test_overflow_drains_past_full_processor(self):
+        processors = [Processor(0, max_queue_size=2, speed=4), Processor(1, max_queue_size=2)]
+        balancer = LoadBalancer(processors, SystemMonitor(processors), overflow_queue_size=4)
+        tasks = [Task(i) for i in range(6)]
+        self.assertTrue(all(balancer.try_submit(task) for task in tasks))
+        self.assertEqual(len(balancer.overflow), 2)
+        
+        # A slot frees on the slow processor; the full fast one must not block the drain
+        processors[1].start_task()
+        placements = balancer.drain_overflow()
+        self.assertEqual(placements, [(tasks[4], processors[1])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Tests: Metrics History
+
+Checks the ring buffer wraparound, the downsampled tiers and the
+resolution chosen by TieredMetricsHistory.query.
+
+Usage:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.metrics_history import MetricsRingBuffer, TieredMetricsHistory
+
+
+class RingBufferTest(unittest.TestCase):
+    """MetricsRingBuffer before and after it wraps"""
+    
+    def test_partial_fill(self):
+        buffer = MetricsRingBuffer(columns=2, capacity=4)
+        for t in range(3):
+            buffer.append(float(t), [t, -t])
+        timestamps, values = buffer.window()
+        self.assertEqual(timestamps.tolist(), [0.0, 1.0, 2.0])
+        self.assertEqual(values[:, 1].tolist(), [0.0, -1.0, -2.0])
+    
+    def test_wraparound_keeps_latest_in_order(self):
+        buffer = MetricsRingBuffer(columns=1, capacity=4)
+        for t in range(11):
+            buffer.append(float(t), [t * 10])
+            timestamps, values = buffer.window()
+            expected = list(range(max(0, t - 3), t + 1))
+            self.assertEqual(timestamps.tolist(), [float(x) for x in expected])
+            self.assertEqual(values[:, 0].tolist(), [x * 10.0 for x in expected])
+        self.assertEqual(len(buffer), 4)
+    
+    def test_latest_and_range_after_wrap(self):
+        buffer = MetricsRingBuffer(columns=1, capacity=5)
+        for t in range(12):
+            buffer.append(float(t), [t])
+        timestamps, _ = buffer.latest(2)
+        self.assertEqual(timestamps.tolist(), [10.0, 11.0])
+        timestamps, _ = buffer.latest(100)
+        self.assertEqual(timestamps.tolist(), [7.0, 8.0, 9.0, 10.0, 11.0])
+        timestamps, values = buffer.range(8.0, 10.0)
+        self.assertEqual(values[:, 0].tolist(), [8.0, 9.0, 10.0])
+        self.assertEqual(buffer.range(0.0, 5.0)[0].size, 0)  # Overwritten
+
+
+class TieredHistoryTest(unittest.TestCase):
+    """Raw samples plus 1 s and 10 s tiers"""
+    
+    def setUp(self):
+        self.history = TieredMetricsHistory(('load', 'queue'), raw_capacity=8,
+                                            tiers=((1.0, 100), (10.0, 100)))
+        # Four samples per second for 30 seconds, load rising with time
+        for i in range(120):
+            t = i * 0.25
+            self.history.record(t, {'load': t, 'queue': i % 4})
+    
+    def test_latest_samples(self):
+        samples = self.history.latest(3)
+        self.assertEqual([s['timestamp'] for s in samples], [29.25, 29.5, 29.75])
+        self.assertEqual(samples[-1]['queue'], 3.0)
+    
+    def test_recent_range_uses_raw_samples(self):
+        timestamps, columns = self.history.query(28.0, 30.0)
+        self.assertEqual(timestamps[0], 28.0)
+        self.assertEqual(len(timestamps), 8)
+        self.assertNotIn('load_min', columns)
+    
+    def test_older_range_uses_finest_tier(self):
+        timestamps, columns = self.history.query(5.0, 8.0)
+        self.assertEqual(timestamps.tolist(), [5.0, 6.0, 7.0, 8.0])
+        # Bucket [5, 6) holds 5.0, 5.25, 5.5, 5.75
+        self.assertAlmostEqual(columns['load'][0], 5.375)
+        self.assertEqual(columns['load_min'][0], 5.0)
+        self.assertEqual(columns['load_max'][0], 5.75)
+        self.assertEqual(columns['queue_max'][0], 3.0)
+    
+    def test_coarser_resolution_requested(self):
+        timestamps, columns = self.history.query(0.0, 30.0, resolution=5.0)
+        self.assertEqual(timestamps.tolist(), [0.0, 10.0])  # The open [20, 30) bucket is not reported
+        self.assertAlmostEqual(columns['load'][1], 14.875)
+    
+    def test_tier_wraparound(self):
+        history = TieredMetricsHistory(('load',), raw_capacity=2, tiers=((1.0, 5),))
+        for t in range(20):
+            history.record(float(t), {'load': t})
+        timestamps, columns = history.query(0.0, 20.0)
+        self.assertEqual(timestamps.tolist(), [14.0, 15.0, 16.0, 17.0, 18.0])
+        self.assertEqual(columns['load'].tolist(), [14.0, 15.0, 16.0, 17.0, 18.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests: Migration Planner
+
+Checks the transfer plans MigrationPlanner.plan computes from a load
+snapshot and how execute applies them.
+
+Usage:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.load_balancer import Task
+from core.migration import MigrationPlanner
+from core.monitor import SystemMonitor
+from core.processor import Processor
+
+
+def fill(processor, count, cost=0.5):
+    tasks = [Task((processor.processor_id, i), estimated_cost=cost) for i in range(count)]
+    processor.add_tasks(tasks)
+    return tasks
+
+
+class MigrationPlanTest(unittest.TestCase):
+    """Plans computed from explicit sources and targets"""
+    
+    def make(self, *specs):
+        processors = [Processor(i, max_queue_size=10, **spec) for i, spec in enumerate(specs)]
+        return processors, MigrationPlanner(processors, SystemMonitor(processors))
+    
+    def test_even_split_between_two(self):
+        (source, target), planner = self.make({}, {})
+        fill(source, 8)
+        plan = planner.plan([source], [target])
+        self.assertEqual(plan, [(source, target, 4)])
+    
+    def test_one_move_per_pair(self):
+        (source, a, b), planner = self.make({}, {}, {})
+        fill(source, 9)
+        plan = planner.plan([source], [a, b])
+        counts = {target.processor_id: count for _, target, count in plan}
+        self.assertEqual(len(plan), len(counts))  # Pairs are merged
+        self.assertEqual(sum(counts.values()), 6)  # Three queues of 3
+        self.assertEqual(set(counts), {1, 2})
+    
+    def test_faster_target_takes_more(self):
+        (source, target), planner = self.make({}, {'speed': 3.0})
+        fill(source, 8)
+        plan = planner.plan([source], [target])
+        # 8 - n tasks at 0.5 s vs n tasks at 0.5 / 3 s even out at n = 6
+        self.assertEqual(plan, [(source, target, 6)])
+    
+    def test_target_free_slots_cap_the_move(self):
+        (source, target), planner = self.make({}, {})
+        fill(source, 10)
+        fill(target, 8, cost=0.01)  # Cheap tasks: short completion time, 2 free slots
+        plan = planner.plan([source], [target])
+        self.assertEqual(plan, [(source, target, 2)])
+    
+    def test_no_move_when_balanced(self):
+        (source, target), planner = self.make({}, {})
+        fill(source, 3)
+        fill(target, 2)
+        self.assertEqual(planner.plan([source], [target]), [])
+        self.assertEqual(planner.plan([], [target]), [])
+    
+    def test_default_sources_and_targets(self):
+        (busy, idle, middle), planner = self.make({}, {}, {})
+        fill(busy, 10)
+        fill(middle, 5)  # Neither over- nor underloaded
+        plan = planner.plan()
+        self.assertEqual([(s, t) for s, t, _ in plan], [(busy, idle)])
+
+
+class MigrationExecuteTest(unittest.TestCase):
+    """Applying plans"""
+    
+    def test_moves_tail_tasks_in_order(self):
+        processors = [Processor(i) for i in range(2)]
+        planner = MigrationPlanner(processors, SystemMonitor(processors))
+        tasks = fill(processors[0], 8)
+        migrated = planner.execute(planner.plan([processors[0]], [processors[1]]))
+        
+        self.assertEqual(migrated, 4)
+        self.assertEqual(list(processors[0].task_queue), tasks[:4])
+        self.assertEqual(list(processors[1].task_queue), tasks[4:])
+        self.assertTrue(all(task.assigned_processor is processors[1] and task.migration_count == 1
+                            for task in tasks[4:]))
+    
+    def test_stale_plan_is_clamped(self):
+        processors = [Processor(i, max_queue_size=5) for i in range(2)]
+        planner = MigrationPlanner(processors, SystemMonitor(processors))
+        fill(processors[0], 5)
+        fill(processors[1], 4)  # Only one slot left since "planning"
+        self.assertEqual(planner.execute([(processors[0], processors[1], 3)]), 1)
+        self.assertEqual(len(processors[1].task_queue), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Tests: System Monitor Aggregates
+
+Checks that the running load/queue sums and threshold counts the monitor
+keeps from load listeners agree with a full recomputation.
+
+Usage:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import random
+import sys
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.load_balancer import Task
+from core.monitor import SystemMonitor
+from core.processor import Processor
+
+
+class MonitorAggregatesTest(unittest.TestCase):
+    """Running aggregates against a scan of the processors"""
+    
+    def setUp(self):
+        self.processors = [Processor(i, max_queue_size=8) for i in range(6)]
+        self.monitor = SystemMonitor(self.processors)
+    
+    def assert_matches_scan(self):
+        loads = [p.current_load for p in self.processors]
+        queue_lengths = [len(p.task_queue) for p in self.processors]
+        state = self.monitor.get_system_state()
+        
+        self.assertAlmostEqual(state['average_load'], sum(loads) / len(loads))
+        self.assertEqual(state['max_load'], max(loads))
+        self.assertEqual(state['min_load'], min(loads))
+        self.assertAlmostEqual(state['load_variance'], max(loads) - min(loads))
+        self.assertEqual(state['total_queue_length'], sum(queue_lengths))
+        self.assertEqual(state['processor_count'], len(self.processors))
+        self.assertEqual(self.monitor.get_loads(), loads)
+        self.assertEqual(self.monitor.get_queue_lengths(), queue_lengths)
+        
+        # Tracked thresholds use the running counts, others scan
+        for threshold in (70.0, 80.0, 50.0):
+            self.assertEqual(self.monitor.count_overloaded(threshold),
+                             sum(1 for load in loads if load > threshold))
+        for threshold in (40.0, 20.0):
+            self.assertEqual(self.monitor.count_underloaded(threshold),
+                             sum(1 for load in loads if load < threshold))
+    
+    def test_idle_system(self):
+        self.assert_matches_scan()
+        self.assertEqual(self.monitor.count_underloaded(40.0), len(self.processors))
+        self.assertEqual(self.monitor.count_overloaded(70.0), 0)
+        self.assertFalse(self.monitor.detect_imbalance())
+    
+    def test_threshold_counts(self):
+        self.processors[0].add_tasks([Task(i) for i in range(8)])  # Full queue
+        self.processors[1].add_tasks([Task(i) for i in range(7)])
+        self.processors[2].add_tasks([Task(i) for i in range(3)])
+        self.assert_matches_scan()
+        self.assertEqual(self.monitor.count_overloaded(80.0), 1)
+        self.assertEqual(self.monitor.count_overloaded(70.0), 2)
+        self.assertEqual(self.monitor.count_underloaded(40.0), 4)
+        self.assertTrue(self.monitor.detect_imbalance())
+        
+        # Counts drop again as the queues drain
+        self.processors[0].drain_tasks()
+        self.processors[1].steal_tasks(5)
+        self.assert_matches_scan()
+        self.assertEqual(self.monitor.count_overloaded(70.0), 0)
+    
+    def test_random_operations(self):
+        rng = random.Random(3)
+        for step in range(400):
+            processor = rng.choice(self.processors)
+            action = rng.random()
+            if action < 0.5:
+                processor.add_task(Task(step, service_time=rng.uniform(0.1, 1.0)))
+            elif action < 0.7 and processor.task_queue and processor.current_task is None:
+                task = processor.start_task()
+                processor.finish_task(task.service_time, task=task)
+            else:
+                processor.steal_tasks(rng.randint(1, 3))
+            self.assert_matches_scan()
+    
+    def test_existing_state_is_folded_in(self):
+        processors = [Processor(i) for i in range(3)]
+        processors[1].add_tasks([Task(i) for i in range(5)])
+        monitor = SystemMonitor(processors)
+        self.assertEqual(monitor.get_system_state()['total_queue_length'], 5)
+        self.assertEqual(monitor.get_loads(), [p.current_load for p in processors])
+        self.assertEqual(monitor.count_underloaded(40.0),
+                         sum(1 for p in processors if p.current_load < 40.0))
+
+
+class StateTableMonitorTest(MonitorAggregatesTest):
+    """The same checks answered from the NumPy state table"""
+    
+    def setUp(self):
+        self.processors = [Processor(i, max_queue_size=8) for i in range(6)]
+        self.monitor = SystemMonitor(self.processors, use_state_table=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Tests: Worker Pool
+
+Checks that event-driven workers run queued tasks and admit overflow
+tasks as soon as a queue slot frees up.
+
+Usage:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import time
+import unittest
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.load_balancer import LoadBalancer, Task
+from core.monitor import SystemMonitor
+from core.processor import Processor
+from core.workers import WorkerPool
+
+
+def wait_until(condition, timeout=5.0):
+    """Poll condition until it holds or timeout seconds pass"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class WorkerPoolTest(unittest.TestCase):
+    """One processor with a single queue slot and an overflow queue"""
+    
+    def setUp(self):
+        self.processor = Processor(0, max_queue_size=1)
+        self.balancer = LoadBalancer([self.processor], SystemMonitor([self.processor]),
+                                     overflow_queue_size=5)
+        self.pool = WorkerPool([self.processor], self.balancer)
+    
+    def tearDown(self):
+        self.pool.stop(timeout=5)
+    
+    def test_overflow_admitted_when_task_starts(self):
+        tasks = [Task(i, service_time=0.5) for i in range(3)]
+        self.assertTrue(all(self.balancer.try_submit(task) for task in tasks))
+        self.assertEqual(len(self.balancer.overflow), 2)
+        self.pool.start()
+        
+        # The slot freed by starting task 0 is refilled while task 0 still runs
+        self.assertTrue(wait_until(lambda: tasks[0].started_at is not None))
+        self.assertTrue(wait_until(lambda: tasks[1].assigned_processor is self.processor, timeout=0.3))
+        self.assertFalse(tasks[0].done)
+        self.assertEqual(len(self.balancer.overflow), 1)
+        
+        self.assertTrue(wait_until(lambda: all(task.done for task in tasks)))
+        self.assertEqual(self.processor.total_tasks_completed, 3)
+    
+    def test_callables_run_on_worker(self):
+        task = Task('sum', sum, args=([1, 2, 3],))
+        self.pool.start()
+        self.assertTrue(self.balancer.try_submit(task))
+        self.assertTrue(wait_until(lambda: task.done))
+        self.assertEqual(task.result, 6)
+        self.assertIsNone(task.error)
+
+
+if __name__ == "__main__":
+    unittest.main()